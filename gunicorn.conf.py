@@ -0,0 +1,75 @@
+# gunicorn.conf.py
+# Gunicorn 설정 및 워커 라이프사이클 훅
+# 사용법: gunicorn -c gunicorn.conf.py run:app
+#
+# 모델 로딩 방식 (EMOTION_MODEL_LOADING, 기본값은 EMOTION_MODEL_DIR 설정 여부에 따라 정해집니다)
+# - background (EMOTION_MODEL_DIR이 있을 때 기본): 워커가 뜨자마자 요청을 받고, 모델은 워커 안의 백그라운드 스레드에서
+#   로드 + 워밍업합니다. 준비 전에는 /api/predict 계열만 503을 돌려줍니다 (src/model_loader.py).
+#   가중치는 mmap 아티팩트의 파일 페이지 캐시로 워커 간에 공유됩니다.
+#   EMOTION_MODEL_DIR 없이(Hub 모델) 이 방식을 쓰면 워커마다 가중치를 한 벌씩 들고 있게 되므로 시작 시 경고를 남깁니다.
+# - preload (EMOTION_MODEL_DIR이 없을 때 기본): 마스터가 모델을 다 로드한 뒤 fork합니다.
+#   Hub에서 받은 가중치도 노드당 한 벌이지만 워커가 늦게 뜹니다.
+#   - when_ready   (마스터, fork 전): 로딩을 기다린 뒤 가중치를 공유 메모리로 옮기고 gc.freeze()로 기존 객체를 GC 대상에서 뺍니다.
+#   - post_worker_init (워커, 요청 수락 전): 워밍업 forward pass를 실행합니다.
+# post_fork (워커, 공통): 워커마다 intra-op 스레드 수를 설정합니다.
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '7860')}"
+workers = int(os.environ.get('GUNICORN_WORKERS', '2'))
+# gthread 워커: SSE 스트리밍 응답이나 느린 Gemini 호출이 워커 전체를 점유하지 않도록 워커당 스레드를 둡니다.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+MODEL_DIR = os.environ.get('EMOTION_MODEL_DIR')
+MODEL_LOADING = os.environ.get('EMOTION_MODEL_LOADING', 'background' if MODEL_DIR else 'preload').lower()
+preload_app = MODEL_LOADING == 'preload'
+# 워밍업까지 끝나야 워커가 준비되므로 기본 30초보다 넉넉하게 둡니다.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+
+# 마스터는 추론을 하지 않으므로 OpenMP / MKL 스레드 풀을 만들지 않게 합니다.
+# (fork 전에 만들어진 OpenMP 스레드 풀은 자식 프로세스에서 멈춤의 원인이 됩니다. 워커는 post_fork에서 다시 설정합니다.)
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('MKL_NUM_THREADS', '1')
+
+
+def _available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_threads(num_workers):
+    """EMOTION_TORCH_THREADS가 없으면 사용 가능한 코어를 워커 수로 나눕니다."""
+    configured = os.environ.get('EMOTION_TORCH_THREADS')
+    if configured:
+        return int(configured)
+    return max(1, _available_cpus() // max(1, num_workers))
+
+
+def when_ready(server):
+    if not server.cfg.preload_app and not MODEL_DIR and server.cfg.workers > 1:
+        server.log.warning(
+            f"EMOTION_MODEL_LOADING=background인데 EMOTION_MODEL_DIR(mmap 아티팩트)이 없습니다. "
+            f"워커 {server.cfg.workers}개가 각자 모델 가중치를 한 벌씩 로드합니다 (노드당 {server.cfg.workers}벌). "
+            f"preload로 바꾸거나 scripts/pack_model.py로 만든 아티팩트를 지정하세요."
+        )
+    if server.cfg.preload_app:
+        from src.emotion_engine import share_model_memory
+        from src.model_loader import model_loader
+        model_loader.wait()
+        share_model_memory()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from src.emotion_engine import configure_worker_threads
+    configure_worker_threads(worker_threads(server.cfg.workers))
+
+
+def post_worker_init(worker):
+    # background 모드에서는 로더 스레드가 로딩 직후 워밍업합니다.
+    if worker.cfg.preload_app:
+        from src.emotion_engine import warm_up
+        warm_up()
@@ -1,9 +1,18 @@
+import os
+import sys
 import pandas as pd
-import json
-import re
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# 감정 매핑 / 텍스트 정제 / 라벨 읽기는 학습 스크립트와 같은 공용 모듈을 사용합니다.
+from src.corpus.labels import map_ecode_to_6class
+from src.corpus.readers import iter_ecodes
+from src.corpus.text import clean_text
+
 # --- Matplotlib 한글 폰트 설정 (Windows: Malgun Gothic) ---
 try:
     plt.rcParams['font.family'] = 'Malgun Gothic'
@@ -11,36 +20,6 @@ try:
 except:
     print("한글 폰트 설정에 실패했습니다. 그래프의 라벨이 깨질 수 있습니다.")
 
-# --- 감정 매핑 함수 정의 --- 
-def map_emotion_code(ecode):
-    """
-    E코드 문자열을 대분류 감정 문자열로 매핑합니다. (예: 'E11' -> '분노')
-    """
-    # E코드 문자열이 아니거나 형식이 맞지 않으면 None 반환
-    if not isinstance(ecode, str) or len(ecode) < 2 or ecode[0] != 'E':
-        return None
-
-    try:
-        # 'E'를 제거하고 숫자 부분만 추출
-        code_num = int(ecode[1:])
-    except ValueError:
-        return None 
-
-    if 10 <= code_num <= 19:
-        return '분노'
-    elif 20 <= code_num <= 29:
-        return '슬픔'
-    elif 30 <= code_num <= 39:
-        return '불안'
-    elif 40 <= code_num <= 49:
-        return '상처'
-    elif 50 <= code_num <= 59:
-        return '당황'
-    elif 60 <= code_num <= 69:
-        return '기쁨'
-    else:
-        return None
-
 # --- [Phase 1] 데이터 로딩 및 병합 ---
 print("---" + "[Phase 1] 데이터 로딩 및 병합 시작" + "---")
 
@@ -56,10 +35,8 @@ try:
     df_train_text = pd.read_excel(train_text_path, header=0)
     df_val_text = pd.read_excel(val_text_path, header=0)
 
-    with open(train_label_path, 'r', encoding='utf-8') as f:
-        train_labels_raw = json.load(f)
-    with open(val_label_path, 'r', encoding='utf-8') as f:
-        val_labels_raw = json.load(f)
+    train_emotions = list(iter_ecodes(train_label_path))
+    val_emotions = list(iter_ecodes(val_label_path))
 
     print("파일 로딩 성공!")
 
@@ -69,18 +46,9 @@ except FileNotFoundError as e:
     exit()
 
 
-# 2. 라벨 데이터 정제 및 추출
-def extract_emotions(raw_labels):
-    emotions = []
-    for dialogue in raw_labels:
-        try:
-            emotions.append(dialogue['profile']['emotion']['type'])
-        except KeyError:
-            emotions.append(None)
-    return emotions
-
-df_train_labels = pd.DataFrame({'emotion': extract_emotions(train_labels_raw)})
-df_val_labels = pd.DataFrame({'emotion': extract_emotions(val_labels_raw)})
+# 2. 라벨 데이터 추출
+df_train_labels = pd.DataFrame({'emotion': train_emotions})
+df_val_labels = pd.DataFrame({'emotion': val_emotions})
 
 # 3. 텍스트 데이터와 라벨 데이터 병합
 def combine_dialogues(df):
@@ -97,8 +65,8 @@ df_val = combine_dialogues(df_val)
 
 
 # 원본 E코드(emotion)를 대분류 감정(major_emotion)으로 매핑하고, 매핑되지 않은 데이터는 제거합니다.
-df_train['major_emotion'] = df_train['emotion'].apply(map_emotion_code)
-df_val['major_emotion'] = df_val['emotion'].apply(map_emotion_code)
+df_train['major_emotion'] = df_train['emotion'].apply(map_ecode_to_6class)
+df_val['major_emotion'] = df_val['emotion'].apply(map_ecode_to_6class)
 
 df_train.dropna(subset=['major_emotion'], inplace=True)
 df_val.dropna(subset=['major_emotion'], inplace=True)
@@ -144,13 +112,6 @@ print("\n시각화 완료. 그래프 창을 닫으면 다음 단계가 진행됩
 # 2. 텍스트 정제
 print("\n---" + "텍스트 정제 시작" + "---")
 
-def clean_text(text):
-    if not isinstance(text, str):
-        return ""
-    # 정규표현식을 사용하여 한글, 영어, 숫자, 공백을 제외한 모든 문자 제거
-    return re.sub(r'[^가-힣a-zA-Z0-9 ]', '', text)
-
-
 df_combined['cleaned_text'] = df_combined['text'].apply(clean_text)
 
 print("텍스트 정제 완료.")
@@ -1,35 +1,29 @@
-import json
-import re
 import os
+import sys
+from itertools import islice
 
-# 1. 텍스트 정제 함수 정의 (train_final.py의 로직)
-def clean_text(text: str) -> str:
-    """한글, 영어, 숫자, 공백을 제외한 모든 특수문자를 제거합니다."""
-    return re.sub(r'[^가-힣a-zA-Z0-9 ]', '', str(text))
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# 1. 텍스트 정제 함수 (학습 / 평가 / 서빙 공용 규칙)
+from src.corpus.readers import iter_label_records
+from src.corpus.text import clean_text
 
 # 2. 파일 경로 설정 및 데이터 로드 (파일 경로가 data/에 있다고 가정)
 file_path = './data/training-label.json'
 
 try:
-    with open(file_path, 'r', encoding='utf-8') as f:
-        training_data_raw = json.load(f)
-
-    print(f"✅ '{file_path}' 파일 로딩 성공. 총 {len(training_data_raw)}개 데이터 중 10개만 추출합니다.")
+    print(f"✅ '{file_path}' 파일에서 앞쪽 5개 데이터만 추출합니다.")
     print("---------------------------------------------------\n")
 
-    # 3. 첫 10개 데이터에 대해 처리 및 비교
+    # 3. 첫 5개 데이터에 대해 처리 및 비교
     comparison_data = []
     
-    # training_data_raw는 대화 단위의 리스트입니다.
-    for i, data in enumerate(training_data_raw[:5]):
-        # 대화의 모든 문장을 공백으로 연결하여 원본 텍스트를 만듭니다. (explore_data.py 로직)
-        raw_text = " ".join(data['talk']['content'].values())
-        
+    # 대화의 모든 문장은 공백으로 연결되어 나옵니다. (학습 스크립트와 같은 리더)
+    for i, (emotion_type, raw_text) in enumerate(islice(iter_label_records(file_path), 5)):
         cleaned_text = clean_text(raw_text)
         
-        # 원본 데이터의 E코드 감정 추출 (참고용)
-        emotion_type = data['profile']['emotion']['type']
-        
         comparison_data.append({
             'ID': i + 1,
             'Emotion': emotion_type,
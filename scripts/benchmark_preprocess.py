@@ -0,0 +1,116 @@
+# 파일 이름: benchmark_preprocess.py
+# train_final.load_and_process의 전처리 단계(대화 열 결합 / clean_text / E코드 매핑)를
+# 기존 행 단위 apply 구현과 벡터화 구현(src/corpus/preprocess.py)으로 각각 실행해 rows/sec를 비교하는 스크립트
+# 사용법: python scripts/benchmark_preprocess.py --rows 50000 --repeat 3
+
+import os
+import sys
+import re
+import time
+import random
+import argparse
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.corpus.preprocess import process_frame
+
+DIALOGUE_COLS = [8, 9, 10, 11]
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후기니디리미비시이지치키티피히"
+PUNCTUATION = [".", ",", "?", "!", "~", "ㅠㅠ", "ㅋㅋ", "...", "^^"]
+
+
+# --- 기존 구현 (행 단위) ---
+def clean_text(text: str) -> str:
+    return re.sub(r'[^가-힣a-zA-Z0-9 ]', '', str(text))
+
+
+def map_ecode_to_6class(e_code_str):
+    if not isinstance(e_code_str, str) or not e_code_str.startswith('E'): return None
+    try: code_num = int(e_code_str[1:])
+    except (ValueError, TypeError): return None
+
+    if 10 <= code_num <= 19: return '분노'
+    elif 20 <= code_num <= 29: return '슬픔'
+    elif 30 <= code_num <= 39: return '불안'
+    elif 40 <= code_num <= 49: return '상처'
+    elif 50 <= code_num <= 59: return '당황'
+    elif 60 <= code_num <= 69: return '기쁨'
+    else: return None
+
+
+def process_rowwise(df_combined):
+    for col in DIALOGUE_COLS:
+        df_combined[col] = df_combined[col].astype(str).fillna('')
+    df_combined['text'] = df_combined[DIALOGUE_COLS].apply(lambda row: ' '.join(row), axis=1)
+    df_combined['cleaned_text'] = df_combined['text'].apply(clean_text)
+    df_combined['major_emotion'] = df_combined['e_code'].apply(map_ecode_to_6class)
+    df_combined.dropna(subset=['major_emotion', 'cleaned_text'], inplace=True)
+    return df_combined[df_combined['cleaned_text'].str.strip() != '']
+
+
+# --- 합성 말뭉치 ---
+def random_utterance(rng):
+    words = []
+    for _ in range(rng.randint(3, 15)):
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.15:
+            word += rng.choice(PUNCTUATION)
+        words.append(word)
+    return " ".join(words)
+
+
+def make_corpus(rows, seed):
+    """AI-Hub 감성대화 엑셀과 같은 모양(14개 열, 8~11열이 발화, 일부 결측)의 DataFrame을 만듭니다."""
+    rng = random.Random(seed)
+    data = {col: [f"meta{col}"] * rows for col in range(14)}
+    for col in DIALOGUE_COLS:
+        # 세 번째 사람 발화(10, 11열)는 실제 데이터처럼 일부 비어 있습니다.
+        missing = 0.3 if col >= 10 else 0.0
+        data[col] = [None if rng.random() < missing else random_utterance(rng) for _ in range(rows)]
+    e_codes = [f"E{rng.randint(10, 69)}" for _ in range(rows)]
+    for i in rng.sample(range(rows), rows // 100):
+        e_codes[i] = rng.choice([None, "E99", "X10", "E"])
+    df = pd.DataFrame(data)
+    df['e_code'] = e_codes
+    return df
+
+
+def bench(fn, corpus, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        df = corpus.copy()
+        start = time.perf_counter()
+        result = fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(args):
+    print(f"합성 말뭉치 생성 중... ({args.rows}행)")
+    corpus = make_corpus(args.rows, args.seed)
+
+    rowwise_time, expected = bench(process_rowwise, corpus, args.repeat)
+    vectorized_time, actual = bench(lambda df: process_frame(df, DIALOGUE_COLS), corpus, args.repeat)
+
+    # 기존 구현은 그대로 두고 비교합니다. 합성 발화에는 줄바꿈 / 탭이 없으므로,
+    # 새 경로의 공백 문자 -> ' ' 규칙(CLEAN_TEXT_VERSION 3)이 있어도 결과가 같아야 합니다.
+    columns = ['text', 'cleaned_text', 'major_emotion']
+    same = expected.index.equals(actual.index) and expected[columns].equals(actual[columns])
+
+    print(f"행 단위 apply : {rowwise_time:.3f}s ({args.rows / rowwise_time:,.0f} rows/sec)")
+    print(f"벡터화        : {vectorized_time:.3f}s ({args.rows / vectorized_time:,.0f} rows/sec)")
+    print(f"속도 향상     : x{rowwise_time / vectorized_time:.1f}")
+    print(f"결과 일치     : {same} (남은 행 {len(actual)}개)")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="load_and_process 전처리 단계 벤치마크")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
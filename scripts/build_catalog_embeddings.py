@@ -0,0 +1,64 @@
+# 파일 이름: build_catalog_embeddings.py
+# 추천 카탈로그의 각 항목을 감정 분류기의 인코더로 임베딩하여 의미 기반 추천 인덱스를 만드는 스크립트
+# 사용법: python scripts/build_catalog_embeddings.py --catalog src/data/recommendation_catalog.jsonl --out ./models/catalog_embeddings
+# 생성된 <out>.npy / <out>.json 경로(확장자 제외)를 RECOMMENDATION_EMBEDDINGS 환경 변수로 지정하면 서버가 사용합니다.
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.recommender import load_catalog_items, DEFAULT_CATALOG_PATH
+from src.emotion_engine import model_input_text
+
+DEFAULT_MODEL_ID = "taehoon222/korean-emotion-classifier-final"
+MAX_LENGTH = 128  # src/emotion_engine.py의 MAX_LENGTH와 같아야 합니다.
+
+
+def encode(model, tokenizer, texts, batch_size):
+    """
+    일기 임베딩과 같은 방식으로 임베딩합니다: 마지막 은닉층의 [CLS] 벡터를 L2 정규화
+    (src/emotion_engine.py의 _window_logits, RECOMMENDATION_EMBEDDINGS 설정 시 output_hidden_states=True).
+    """
+    vectors = []
+    with torch.inference_mode():
+        for start in range(0, len(texts), batch_size):
+            enc = tokenizer(texts[start:start + batch_size], padding=True, truncation=True, max_length=MAX_LENGTH, return_tensors="pt")
+            outputs = model(**enc, output_hidden_states=True)
+            pooled = torch.nn.functional.normalize(outputs.hidden_states[-1][:, 0], dim=-1)
+            vectors.append(pooled.numpy().astype(np.float32))
+    return np.concatenate(vectors)
+
+
+def build_embeddings(args):
+    items = sorted(set(load_catalog_items(args.catalog)))
+    print(f"카탈로그 항목 {len(items)}개 임베딩 중...")
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model).eval()
+    # 서빙 시 일기 임베딩과 같은 정제(model_input_text = clean_text)를 거쳐야 코사인 유사도가 기호 / 구두점에 흔들리지 않습니다.
+    texts = [model_input_text(f"{media} {title}") for _, _, media, title in items]
+    embeddings = encode(model, tokenizer, texts, args.batch_size)
+
+    if os.path.dirname(args.out):
+        os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    np.save(f"{args.out}.npy", embeddings)
+    with open(f"{args.out}.json", 'w', encoding='utf-8') as f:
+        json.dump([list(item) for item in items], f, ensure_ascii=False)
+    print(f"저장 완료: {args.out}.npy {embeddings.shape}, {args.out}.json")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="추천 카탈로그 임베딩 인덱스 생성")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH)
+    parser.add_argument("--model", default=DEFAULT_MODEL_ID)
+    parser.add_argument("--out", default="./models/catalog_embeddings")
+    parser.add_argument("--batch-size", type=int, default=64)
+    build_embeddings(parser.parse_args())
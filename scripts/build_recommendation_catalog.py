@@ -0,0 +1,73 @@
+# 파일 이름: build_recommendation_catalog.py
+# JSON Lines / CSV 추천 목록을 검증하고 SQLite 카탈로그 파일로 묶는 스크립트
+# 사용법: python scripts/build_recommendation_catalog.py items1.jsonl items2.csv --out ./models/recommendation_catalog.sqlite
+# 생성된 파일은 RECOMMENDATION_CATALOG_PATH 환경 변수로 지정하면 서버 시작 시 로드됩니다.
+
+import os
+import sys
+import csv
+import sqlite3
+import argparse
+from collections import Counter
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.recommender import load_catalog_items
+
+EMOTIONS = {'기쁨', '슬픔', '분노', '불안', '상처', '당황'}
+STRATEGIES = {'수용', '전환'}
+
+
+def read_items(path):
+    if path.endswith('.csv'):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            return [(r['emotion'], r['strategy'], r['media'], r['title']) for r in csv.DictReader(f)]
+    return load_catalog_items(path)
+
+
+def build_catalog(inputs, out_path):
+    items, skipped = set(), 0
+    for path in inputs:
+        for emotion, strategy, media, title in read_items(path):
+            emotion, strategy, media, title = (str(v).strip() for v in (emotion, strategy, media, title))
+            if emotion not in EMOTIONS or strategy not in STRATEGIES or not media or not title:
+                skipped += 1
+                continue
+            items.add((emotion, strategy, media, title))
+
+    if os.path.dirname(out_path):
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    if os.path.exists(out_path):
+        os.remove(out_path)
+
+    with sqlite3.connect(out_path) as conn:
+        conn.execute("""
+            CREATE TABLE recommendation_item (
+                emotion TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                media TEXT NOT NULL,
+                title TEXT NOT NULL
+            )
+        """)
+        conn.executemany("INSERT INTO recommendation_item VALUES (?, ?, ?, ?)", sorted(items))
+        conn.execute("CREATE INDEX idx_recommendation_item_emotion_strategy ON recommendation_item (emotion, strategy)")
+    with sqlite3.connect(out_path) as conn:
+        conn.execute("VACUUM")
+
+    print(f"카탈로그 생성 완료: {out_path} ({len(items)}개 항목, 잘못된 항목 {skipped}개 제외)")
+    counts = Counter((e, s) for e, s, _, _ in items)
+    for emotion in sorted(EMOTIONS):
+        print(f"  {emotion}: " + ", ".join(f"{s} {counts.get((emotion, s), 0)}개" for s in sorted(STRATEGIES)))
+    missing = [(e, s) for e in EMOTIONS for s in STRATEGIES if not counts.get((e, s))]
+    if missing:
+        print(f"경고: 추천 항목이 없는 (감정, 시나리오): {missing}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="추천 카탈로그 SQLite 빌드")
+    parser.add_argument("inputs", nargs='+', help=".jsonl / .json / .csv (emotion, strategy, media, title)")
+    parser.add_argument("--out", default="./models/recommendation_catalog.sqlite")
+    args = parser.parse_args()
+    build_catalog(args.inputs, args.out)
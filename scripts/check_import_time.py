@@ -0,0 +1,76 @@
+# 파일 이름: check_import_time.py
+# `python -X importtime`으로 src 패키지의 import 비용을 재고, 예산을 넘거나 무거운 의존성이 딸려 오면 실패하는 회귀 검사
+# torch / transformers / google.generativeai는 처음 사용할 때 import 해야 합니다 (src/emotion_engine.py, src/llm.py).
+# 사용법: python scripts/check_import_time.py [--module src --budget-ms 300] [--module src.main --budget-ms 1500]
+
+import os
+import sys
+import argparse
+import subprocess
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGETS = {'src': 300.0, 'src.main': 1500.0}
+FORBIDDEN_MODULES = ('torch', 'transformers', 'google.generativeai', 'onnxruntime', 'pandas')
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력 -> [(모듈 이름, self us, cumulative us)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 헤더 줄
+        rows.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return rows
+
+
+def measure(module):
+    """
+    새 인터프리터에서 module을 import하고 (그 모듈의 cumulative ms, 전체 행)을 반환합니다.
+    인터프리터 시작(site, encodings 등)은 빼고, 상위 패키지(src)를 포함한 module import 비용만 셉니다.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=project_root, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"'{module}' import 실패:\n{result.stderr[-2000:]}")
+    rows = parse_importtime(result.stderr)
+    total_ms = next(cumulative for name, _, cumulative in rows if name == module) / 1000
+    return total_ms, rows
+
+
+def check(module, budget_ms, repeat, top):
+    # 첫 실행은 디스크 캐시 / .pyc 영향을 받으므로 여러 번 재서 가장 빠른 값을 씁니다.
+    runs = [measure(module) for _ in range(max(1, repeat))]
+    total_ms, rows = min(runs, key=lambda run: run[0])
+    imported = {name for name, _, _ in rows}
+    forbidden = [name for name in FORBIDDEN_MODULES if name in imported]
+
+    status = "OK" if total_ms <= budget_ms and not forbidden else "FAIL"
+    print(f"[{status}] import {module}: {total_ms:.1f}ms (예산 {budget_ms:.0f}ms, {len(rows)}개 모듈)")
+    for name, self_us, _ in sorted(rows, key=lambda row: -row[1])[:top]:
+        print(f"    {self_us / 1000:8.1f}ms  {name}")
+    if forbidden:
+        print(f"    처음 사용할 때 import 해야 하는 모듈이 딸려 왔습니다: {', '.join(forbidden)}")
+    return status == "OK"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="src 패키지 import 시간 예산 검사 (-X importtime)")
+    parser.add_argument("--module", action="append", help="검사할 모듈 (여러 번 지정 가능, 기본: src, src.main)")
+    parser.add_argument("--budget-ms", action="append", type=float, help="--module과 같은 순서의 예산 (ms)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="self 시간이 큰 모듈 N개 출력")
+    args = parser.parse_args()
+
+    modules = args.module or list(DEFAULT_BUDGETS)
+    budgets = args.budget_ms or [DEFAULT_BUDGETS.get(m, 1000.0) for m in modules]
+    if len(budgets) != len(modules):
+        parser.error("--budget-ms는 --module과 같은 개수만큼 지정해야 합니다.")
+
+    results = [check(module, budget, args.repeat, args.top) for module, budget in zip(modules, budgets)]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,98 @@
+# 파일 이름: check_onnx_parity.py
+# PyTorch 모델과 ONNX(fp32 / INT8) 모델의 예측이 일치하는지 held-out 데이터로 비교하는 스크립트
+# 사용법: python scripts/check_onnx_parity.py --data ./data/test.json --limit 2000
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.onnx_backend import OnnxEmotionClassifier, MAX_LENGTH
+from src.corpus.readers import iter_label_records
+from src.corpus.text import clean_text
+
+DEFAULT_MODEL_ID = "taehoon222/korean-emotion-classifier-final"
+
+
+def load_texts(label_path, limit):
+    texts = []
+    for _, text in iter_label_records(label_path):
+        cleaned = clean_text(text)
+        if cleaned.strip():
+            texts.append(cleaned)
+            if limit and len(texts) >= limit:
+                break
+    return texts
+
+
+def torch_logits(model, tokenizer, texts, batch_size):
+    outputs = []
+    with torch.inference_mode():
+        for start in range(0, len(texts), batch_size):
+            enc = tokenizer(texts[start:start + batch_size], padding=True, truncation=True, max_length=MAX_LENGTH, return_tensors="pt")
+            outputs.append(model(**enc).logits.numpy())
+    return np.concatenate(outputs)
+
+
+def softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    probs = np.exp(logits)
+    return probs / probs.sum(axis=-1, keepdims=True)
+
+
+def compare(name, reference, candidate, seconds, n):
+    ref_probs, cand_probs = softmax(reference), softmax(candidate)
+    top1_agree = (ref_probs.argmax(-1) == cand_probs.argmax(-1)).mean()
+    deltas = np.abs(ref_probs - cand_probs).max(axis=-1)
+    print(f"[{name}] top-1 일치율: {top1_agree:.4f} | "
+          f"score 차이 평균: {deltas.mean():.5f}, p99: {np.percentile(deltas, 99):.5f}, 최대: {deltas.max():.5f} | "
+          f"{n / seconds:.1f} samples/sec")
+    return {'top1_agreement': float(top1_agree), 'mean_delta': float(deltas.mean()), 'max_delta': float(deltas.max())}
+
+
+def run_parity(args):
+    texts = load_texts(args.data, args.limit)
+    print(f"비교 데이터: {len(texts)}개")
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model).eval()
+
+    start = time.perf_counter()
+    reference = torch_logits(model, tokenizer, texts, args.batch_size)
+    print(f"[torch] {len(texts) / (time.perf_counter() - start):.1f} samples/sec")
+
+    results = {}
+    for name, file_name in (("onnx", "model.onnx"), ("onnx-int8", "model.int8.onnx")):
+        path = os.path.join(args.onnx_dir, file_name)
+        if not os.path.exists(path):
+            print(f"[{name}] {path} 파일이 없어 건너뜁니다. scripts/export_onnx.py를 먼저 실행하세요.")
+            continue
+        classifier = OnnxEmotionClassifier(path, tokenizer, model.config.id2label)
+        start = time.perf_counter()
+        candidate = np.concatenate([
+            classifier.logits(texts[i:i + args.batch_size]) for i in range(0, len(texts), args.batch_size)
+        ])
+        results[name] = compare(name, reference, candidate, time.perf_counter() - start, len(texts))
+
+    failed = [name for name, r in results.items() if r['top1_agreement'] < args.min_agreement]
+    if failed:
+        print(f"경고: top-1 일치율이 {args.min_agreement} 미만인 백엔드: {failed}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PyTorch vs ONNX 백엔드 예측 일치 검사")
+    parser.add_argument("--model", default=DEFAULT_MODEL_ID)
+    parser.add_argument("--onnx-dir", default="./models/onnx")
+    parser.add_argument("--data", default="./data/test.json")
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    run_parity(parser.parse_args())
@@ -1,168 +1,208 @@
-# 파일 이름: evaluate.py
-# 학습한 모델을 평가하고 혼동 행렬을 생성하는 스크립트
-
-import torch
-import pandas as pd
-# 'from pyexpat import model' 라인은 완전히 삭제합니다.
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, Trainer, TrainingArguments
-from sklearn.metrics import accuracy_score, precision_recall_fscore_support, confusion_matrix
+# 파일 이름: evaluate_model.py
+# 학습한 모델을 held-out 데이터로 평가하는 CLI
+# 추론은 길이별 버킷 배치로 한 번만 수행하고, 모든 지표(정확도, F1, 클래스별 지표, 혼동 행렬, loss)는 그 logits로 계산합니다.
+# 사용법:
+#   python scripts/evaluate_model.py --model ./results/emotion_model_v2_manual/best_model
+#   python scripts/evaluate_model.py --model taehoon222/korean-emotion-classifier-final --backend onnx-int8 --onnx-path ./models/onnx/model.int8.onnx
+
 import os
+import sys
 import json
-import re
-import platform
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# --- Matplotlib 한글 폰트 설정 (이전과 동일) ---
-try:
-    if platform.system() == 'Windows':
-        plt.rc('font', family='Malgun Gothic')
-    elif platform.system() == 'Darwin': # Mac OS
-        plt.rc('font', family='AppleGothic')
-    else: # Linux
-        plt.rc('font', family='NanumBarunGothic')
-    plt.rcParams['axes.unicode_minus'] = False
-except:
-    print("한글 폰트 설정에 실패했습니다. 그래프의 라벨이 깨질 수 있습니다.")
-
-# --- 헬퍼(Helper) 함수 및 클래스 정의 (이전과 동일) ---
-class EmotionDataset(torch.utils.data.Dataset):
-    def __init__(self, encodings, labels):
-        self.encodings = encodings
-        self.labels = labels
-    def __getitem__(self, idx):
-        item = {key: val[idx].clone().detach() for key, val in self.encodings.items()}
-        item['labels'] = torch.tensor(self.labels[idx], dtype=torch.long)
-        return item
-    def __len__(self):
-        return len(self.labels)
-
-def compute_metrics(pred):
-    labels = pred.label_ids
-    preds = pred.predictions.argmax(-1)
-    acc = accuracy_score(labels, preds)
-    precision, recall, f1, _ = precision_recall_fscore_support(labels, preds, average='weighted', zero_division=0)
-    return {'accuracy': acc, 'f1': f1, 'precision': precision, 'recall': recall}
-
-# --- train_final.py와 동일한 데이터 처리 로직 전체를 여기에 추가 ---
-def map_ecode_to_major_emotion(ecode):
-    """E코드를 대분류 감정으로 매핑하는 함수"""
-    try:
-        code_num = int(ecode[1:])
-    except (ValueError, TypeError):
-        return None
-    
-    # 이 부분은 train_final.py와 완전히 동일해야 합니다.
-    if 10 <= code_num <= 19: return '분노'
-    elif 20 <= code_num <= 29: return '슬픔'
-    elif 30 <= code_num <= 39: return '불안'
-    elif 40 <= code_num <= 49: return '상처'
-    elif 50 <= code_num <= 59: return '당황'
-    elif 60 <= code_num <= 69: return '기쁨'
-    else: return None
-
-def load_and_process_validation_data(file_path='./data/'):
-    """JSON을 로드하고 레이블을 통합/처리하는 완전한 함수"""
-    # 주의: 실제 테스트 파일명으로 변경해야 합니다.
-    test_label_path = os.path.join(file_path, 'test.json') 
-    try:
-        with open(test_label_path, 'r', encoding='utf-8') as f:
-            test_data_raw = json.load(f)
-    except FileNotFoundError:
-        print(f"오류: 테스트용 라벨 파일 '{test_label_path}'를 찾을 수 없습니다.")
-        return None
-        
-    data = [{'text': " ".join(d['talk']['content'].values()), 'emotion': d['profile']['emotion']['type']} for d in test_data_raw]
-    df_test = pd.DataFrame(data)
-
-    df_test['major_emotion'] = df_test['emotion'].apply(map_ecode_to_major_emotion)
-    df_test.dropna(subset=['major_emotion'], inplace=True)
-    
-    def clean_text(text):
-        return re.sub(r'[^가-힣a-zA-Z0-9 ]', '', text)
-    df_test['cleaned_text'] = df_test['text'].apply(clean_text)
-    
-    return df_test
+import time
+import argparse
+import numpy as np
+# torch / AutoModelForSequenceClassification은 --backend torch일 때만 torch_forward 안에서 import 합니다.
+# (transformers 패키지 자체는 하위 모듈을 지연 로딩하므로 토크나이저 / 설정만 쓸 때는 torch를 불러오지 않습니다.)
+from transformers import AutoConfig, AutoTokenizer
+from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
 
-# --- 메인 평가 로직 ---
-def evaluate_saved_model():
-    """저장된 모델을 불러와 성능 평가 및 혼동 행렬을 생성하는 메인 함수"""
-    
-    MODEL_PATH = "E:/Emotion/results/emotion_model_v2_manual"  
-    print(f"'{MODEL_PATH}' 경로의 모델을 평가합니다.")
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.bucketing import run_bucketed
+from src.corpus.metrics import classification_metrics
+from src.corpus.readers import load_label_frame
+
+DEFAULT_MODEL_ID = "taehoon222/korean-emotion-classifier-final"
+MAX_LENGTH = 128  # src/emotion_engine.py의 MAX_LENGTH와 같아야 합니다.
+
+
+# --- 추론 (한 번만) ---
+def torch_forward(model_path, tokenizer, threads):
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    if threads:
+        torch.set_num_threads(threads)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path).eval()
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model.to(device)
+
+    def forward(batch):
+        encodings = tokenizer.pad({'input_ids': batch}, padding=True, return_tensors="pt").to(device)
+        with torch.inference_mode():
+            return model(**encodings).logits.float().cpu().numpy()
+
+    return forward
+
+
+def onnx_forward(onnx_path, tokenizer, id2label, threads):
+    from src.onnx_backend import OnnxEmotionClassifier
+
+    classifier = OnnxEmotionClassifier(onnx_path, tokenizer, id2label, intra_op_threads=threads)
+    return classifier.logits_from_input_ids
+
+
+def predict_logits(forward, tokenizer, texts, batch_size=64, max_length=MAX_LENGTH):
+    """
+    전체 데이터를 한 번에 패딩하지 않고, 길이가 비슷한 문장끼리 묶어
+    각 배치를 그 배치의 최대 길이까지만 패딩해 추론합니다 (src/bucketing.py, 서빙과 동일한 로직).
+    """
+    input_ids = tokenizer(texts, truncation=True, max_length=max_length)['input_ids']
+    return np.stack(run_bucketed(input_ids, forward, max_batch_size=batch_size))
+
+
+# --- 지표 (logits에서 계산) ---
+def summarize(logits, y_true, labels):
+    y_pred = logits.argmax(-1)
+    label_ids = list(range(len(labels)))
+
+    results = classification_metrics(y_true, y_pred)
+    _, _, macro_f1, _ = precision_recall_fscore_support(y_true, y_pred, labels=label_ids, average='macro', zero_division=0)
+    results['macro_f1'] = macro_f1
+
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    log_probs = shifted - np.log(np.exp(shifted).sum(axis=-1, keepdims=True))
+    results['loss'] = float(-log_probs[np.arange(len(y_true)), y_true].mean())
+
+    precision, recall, f1, support = precision_recall_fscore_support(y_true, y_pred, labels=label_ids, zero_division=0)
+    results['per_class'] = {
+        label: {'precision': float(p), 'recall': float(r), 'f1': float(f), 'support': int(s)}
+        for label, p, r, f, s in zip(labels, precision, recall, f1, support)
+    }
+    results['confusion_matrix'] = confusion_matrix(y_true, y_pred, labels=label_ids).tolist()
+    return {k: float(v) if isinstance(v, np.floating) else v for k, v in results.items()}
+
+
+def print_report(results, labels):
+    print("\n--- 최종 평가 결과 ---")
+    for key in ('accuracy', 'f1', 'macro_f1', 'precision', 'recall', 'loss'):
+        print(f"  {key:>9}: {results[key]:.4f}")
+    print(f"  {'samples':>9}: {results['samples']} ({results['samples_per_sec']:.1f} samples/sec, 추론 {results['inference_sec']:.2f}s)")
+
+    print("\n--- 클래스별 지표 ---")
+    print(f"  {'label':<6} {'precision':>9} {'recall':>9} {'f1':>9} {'support':>8}")
+    for label, m in results['per_class'].items():
+        print(f"  {label:<6} {m['precision']:>9.4f} {m['recall']:>9.4f} {m['f1']:>9.4f} {m['support']:>8}")
+
+    print("\n--- 혼동 행렬 (행: 실제, 열: 예측) ---")
+    print("        " + " ".join(f"{label:>6}" for label in labels))
+    for label, row in zip(labels, results['confusion_matrix']):
+        print(f"  {label:<6}" + " ".join(f"{count:>6}" for count in row))
 
+
+def save_confusion_matrix_plot(cm, labels, path):
+    """matplotlib / seaborn이 있을 때만 혼동 행렬 이미지를 저장합니다."""
     try:
-        tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
-        loaded_model = AutoModelForSequenceClassification.from_pretrained(MODEL_PATH)
-        loaded_model.config.problem_type = "single_label_classification"
-    except OSError:
-        print(f"오류: '{MODEL_PATH}' 경로에서 모델 또는 토크나이저를 찾을 수 없습니다.")
+        import platform
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+    except ImportError:
+        print("matplotlib / seaborn이 없어 혼동 행렬 이미지는 건너뜁니다.")
         return
 
-    df_val = load_and_process_validation_data()
-    if df_val is None or df_val.empty: 
-        print("처리 후 평가 데이터가 없습니다.")
-        return
+    # --- Matplotlib 한글 폰트 설정 ---
+    try:
+        if platform.system() == 'Windows':
+            plt.rc('font', family='Malgun Gothic')
+        elif platform.system() == 'Darwin': # Mac OS
+            plt.rc('font', family='AppleGothic')
+        else: # Linux
+            plt.rc('font', family='NanumBarunGothic')
+        plt.rcParams['axes.unicode_minus'] = False
+    except Exception:
+        print("한글 폰트 설정에 실패했습니다. 그래프의 라벨이 깨질 수 있습니다.")
 
-    
-    label2id = loaded_model.config.label2id
-    id2label = loaded_model.config.id2label
-
-    df_val['label_id'] = df_val['major_emotion'].map(label2id)
-    df_val.dropna(subset=['label_id'], inplace=True)
-
-    val_labels = df_val['label_id'].tolist()
-    val_texts = df_val['cleaned_text'].tolist()
-    
-    val_encodings = tokenizer(val_texts, truncation=True, padding=True, max_length=128, return_tensors="pt")
-    
-    
-    val_dataset = EmotionDataset(val_encodings, val_labels)
-
-    training_args = TrainingArguments(
-        output_dir="./results1/temp_eval",
-        report_to="none"
-    )
-
-    trainer = Trainer(
-        model=loaded_model, 
-        args=training_args,
-        compute_metrics=compute_metrics
-    )
-
-    print("평가를 시작합니다...")
-    results = trainer.evaluate(eval_dataset=val_dataset)
-    print("\n--- 최종 평가 결과 ---")
-    print(results)
-    
-    # 최종 평가 결과를 JSON 파일로 저장
-    results_to_save = {
-        "accuracy": results.get("eval_accuracy"),
-        "f1": results.get("eval_f1"),
-        "loss": results.get("eval_loss") # 손실 값 추가
-    }
-    results_path = os.path.join(MODEL_PATH, "final_test_results.json")
-    with open(results_path, "w", encoding='utf-8') as f:
-        json.dump(results_to_save, f, indent=4, ensure_ascii=False)
-    print(f"최종 평가 결과가 {results_path}에 저장되었습니다.")
-    
-    print("\n--- 혼동 행렬 생성 ---")
-    predictions = trainer.predict(val_dataset)
-    y_pred = predictions.predictions.argmax(-1)
-    y_true = predictions.label_ids
-
-    labels = [id2label[i] for i in sorted(id2label.keys())]
-    cm = confusion_matrix(y_true, y_pred)
-    
     plt.figure(figsize=(10, 8))
-    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', xticklabels=labels, yticklabels=labels)
+    sns.heatmap(np.asarray(cm), annot=True, fmt='d', cmap='Blues', xticklabels=labels, yticklabels=labels)
     plt.xlabel('예측 라벨 (Predicted Label)')
     plt.ylabel('실제 라벨 (True Label)')
     plt.title('Confusion Matrix')
-    
-    cm_path = os.path.join(MODEL_PATH, "confusion_matrix.png")
-    plt.savefig(cm_path)
-    print(f"혼동 행렬이 {cm_path}에 저장되었습니다.")
-    
+    plt.savefig(path)
+    print(f"혼동 행렬이 {path}에 저장되었습니다.")
+
+
+# --- 메인 평가 로직 ---
+def evaluate(args):
+    if not os.path.exists(args.data):
+        print(f"오류: 평가용 라벨 파일 '{args.data}'를 찾을 수 없습니다.")
+        return 1
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    config = AutoConfig.from_pretrained(args.model)
+    id2label = {int(k): v for k, v in config.id2label.items()}
+    labels = [id2label[i] for i in sorted(id2label)]
+    label2id = {label: i for i, label in id2label.items()}
+
+    df = load_label_frame(args.data)
+    df['label_id'] = df['major_emotion'].map(label2id)
+    df = df.dropna(subset=['label_id'])
+    if args.limit:
+        df = df.iloc[:args.limit]
+    if df.empty:
+        print("처리 후 평가 데이터가 없습니다.")
+        return 1
+
+    if args.backend == 'torch':
+        forward = torch_forward(args.model, tokenizer, args.threads)
+    else:
+        from src.onnx_backend import default_onnx_path
+        forward = onnx_forward(args.onnx_path or default_onnx_path(args.backend), tokenizer, id2label, args.threads)
+
+    print(f"'{args.model}' ({args.backend}) 모델로 {len(df)}개 샘플을 평가합니다...")
+    start = time.perf_counter()
+    logits = predict_logits(forward, tokenizer, df['cleaned_text'].tolist(), args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    y_true = df['label_id'].to_numpy(dtype=np.int64)
+    results = summarize(logits, y_true, labels)
+    results.update({
+        'model': args.model,
+        'backend': args.backend,
+        'samples': len(y_true),
+        'inference_sec': elapsed,
+        'samples_per_sec': len(y_true) / elapsed,
+    })
+    print_report(results, labels)
+
+    output_dir = args.output_dir or (args.model if os.path.isdir(args.model) else os.path.join("results", "eval"))
+    os.makedirs(output_dir, exist_ok=True)
+    suffix = "" if args.backend == 'torch' else f"_{args.backend}"
+    results_path = os.path.join(output_dir, f"final_test_results{suffix}.json")
+    with open(results_path, "w", encoding='utf-8') as f:
+        json.dump(results, f, indent=4, ensure_ascii=False)
+    print(f"\n최종 평가 결과가 {results_path}에 저장되었습니다.")
+
+    if args.save_logits:
+        np.save(os.path.join(output_dir, f"test_logits{suffix}.npy"), logits)
+    if not args.no_plot:
+        save_confusion_matrix_plot(results['confusion_matrix'], labels, os.path.join(output_dir, f"confusion_matrix{suffix}.png"))
+    return 0
+
+
 if __name__ == "__main__":
-    evaluate_saved_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="감정 분류 모델 오프라인 평가 (1회 추론)")
+    parser.add_argument("--model", default=DEFAULT_MODEL_ID, help="모델 디렉터리 또는 Hub ID (토크나이저 / 라벨 정보도 여기서 읽습니다)")
+    parser.add_argument("--data", default="./data/test.json")
+    parser.add_argument("--backend", choices=["torch", "onnx", "onnx-int8"], default="torch")
+    parser.add_argument("--onnx-path", default=None, help="ONNX 파일 경로 (기본: EMOTION_ONNX_DIR 아래 model.onnx / model.int8.onnx)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=None, help="CPU intra-op 스레드 수")
+    parser.add_argument("--limit", type=int, default=0, help="앞에서부터 N개만 평가 (0이면 전체)")
+    parser.add_argument("--output-dir", default=None, help="결과 저장 경로 (기본: 로컬 모델 디렉터리, Hub ID면 ./results/eval)")
+    parser.add_argument("--save-logits", action="store_true", help="logits를 .npy로 함께 저장")
+    parser.add_argument("--no-plot", action="store_true", help="혼동 행렬 이미지를 만들지 않음")
+    sys.exit(evaluate(parser.parse_args()))
@@ -4,8 +4,8 @@
 import os
 import pandas as pd
 from dataclasses import dataclass
+import sys
 import json
-import re
 import torch
 import numpy as np
 from transformers import (
@@ -14,13 +14,22 @@ from transformers import (
     Trainer,
     TrainingArguments
 )
-from sklearn.metrics import accuracy_score, precision_recall_fscore_support, confusion_matrix
+from sklearn.metrics import confusion_matrix
 import platform
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# train_final.py와 동일한 클래스 및 함수들
-# (데이터 로딩, 메트릭 계산 등)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.corpus.cache import TokenizedCorpus
+from src.corpus.dataset import EmotionDataset, DynamicPaddingCollator
+from src.corpus.metrics import compute_metrics
+from src.corpus.readers import load_excel_frame
+
+# 평가 설정과 3그룹 매핑
+# (데이터 로딩, 메트릭 계산, Dataset은 src/corpus 공용 모듈)
 # -----------------------------------------------------------------
 @dataclass
 class TrainingConfig:
@@ -36,39 +45,6 @@ class TrainingConfig:
         # [수정] 이미 훈련된 1단계 모델의 "best_model" 폴더를 지정
         return os.path.join(self.output_dir, 'emotion_model_step1_3class', 'best_model')
 
-class EmotionDataset(torch.utils.data.Dataset):
-    def __init__(self, encodings, labels):
-        self.encodings = encodings
-        self.labels = labels
-    def __getitem__(self, idx):
-        item = {key: val[idx].clone().detach() for key, val in self.encodings.items()}
-        item['labels'] = torch.tensor(self.labels[idx])
-        return item
-    def __len__(self):
-        return len(self.labels)
-
-def compute_metrics(pred):
-    labels = pred.label_ids
-    preds = pred.predictions.argmax(-1)
-    acc = accuracy_score(labels, preds)
-    precision, recall, f1, _ = precision_recall_fscore_support(labels, preds, average='weighted', zero_division=0)
-    return {'accuracy': acc, 'f1': f1}
-
-def clean_text(text: str) -> str:
-    return re.sub(r'[^가-힣a-zA-Z0-9 ]', '', str(text))
-
-def map_ecode_to_6class(e_code_str):
-    if not isinstance(e_code_str, str) or not e_code_str.startswith('E'): return None
-    try: code_num = int(e_code_str[1:]) 
-    except (ValueError, TypeError): return None
-    if 0 <= code_num <= 9:   return '기쁨' 
-    elif 10 <= code_num <= 19: return '분노'
-    elif 20 <= code_num <= 29: return '슬픔'
-    elif 30 <= code_num <= 39: return '불안'
-    elif 40 <= code_num <= 49: return '상처'
-    elif 50 <= code_num <= 59: return '당황'
-    else: return None 
-
 def map_6_to_3_groups(emotion_6_class):
     if emotion_6_class == '슬픔': return '그룹1(슬픔)'
     elif emotion_6_class in ['불안', '상처']: return '그룹2(불안,상처)'
@@ -76,36 +52,15 @@ def map_6_to_3_groups(emotion_6_class):
     else: return None 
 
 def load_and_process(text_file, label_file, data_dir):
-    text_path = os.path.join(data_dir, text_file)
-    label_path = os.path.join(data_dir, label_file)
-    try:
-        df_text = pd.read_excel(text_path, header=0)
-        with open(label_path, 'r', encoding='utf-8') as f:
-            labels_raw = json.load(f)
-    except FileNotFoundError as e:
-        print(f"오류: 필수 파일을 찾을 수 없습니다: {e}")
-        return pd.DataFrame()
-    e_codes = []
-    for dialogue in labels_raw:
-        try: e_codes.append(dialogue['profile']['emotion']['type'])
-        except KeyError: e_codes.append(None)
-    if len(df_text) != len(e_codes):
-        min_len = min(len(df_text), len(e_codes))
-        df_text = df_text.iloc[:min_len]
-        e_codes = e_codes[:min_len]
-    df_labels = pd.DataFrame({'e_code': e_codes})
-    df_combined = pd.concat([df_text, df_labels], axis=1)
-    dialogue_cols = [col for col in df_combined.columns if '문장' in str(col)]
-    for col in dialogue_cols:
-        df_combined[col] = df_combined[col].astype(str).fillna('')
-    df_combined['text'] = df_combined[dialogue_cols].apply(lambda row: ' '.join(row), axis=1)
-    df_combined['cleaned_text'] = df_combined['text'].apply(clean_text)
-    df_combined['major_emotion'] = df_combined['e_code'].apply(map_ecode_to_6class)
-    df_combined.dropna(subset=['major_emotion'], inplace=True)
+    # 헤더가 있는 엑셀에서 '문장' 열을 발화로 사용합니다 (전처리와 6-Class 매핑은 src/corpus 공용 모듈).
+    df_combined = load_excel_frame(
+        os.path.join(data_dir, text_file), os.path.join(data_dir, label_file),
+        text_columns=None, header=0
+    )
+    if df_combined.empty:
+        return df_combined
     df_combined['group_emotion'] = df_combined['major_emotion'].apply(map_6_to_3_groups)
-    df_combined.dropna(subset=['group_emotion', 'cleaned_text'], inplace=True)
-    df_combined = df_combined[df_combined['cleaned_text'].str.strip() != '']
-    return df_combined
+    return df_combined.dropna(subset=['group_emotion'])
 
 def get_test_data(config: TrainingConfig) -> pd.DataFrame:
     """[수정] Test Set만 불러오는 함수"""
@@ -171,8 +126,9 @@ def run_evaluation():
         
     df_test['label'] = df_test['label'].astype(int)
 
-    test_encodings = tokenizer(list(df_test['cleaned_text']), max_length=config.max_length, padding=True, truncation=True, return_tensors="pt")
-    test_dataset = EmotionDataset(test_encodings, df_test['label'].tolist())
+    token_ids = tokenizer(list(df_test['cleaned_text']), max_length=config.max_length, truncation=True)['input_ids']
+    test_corpus = TokenizedCorpus.from_token_ids(df_test, token_ids)
+    test_dataset = EmotionDataset(test_corpus, range(len(test_corpus)), df_test['label'])
 
     # --- 4. Trainer 설정 (평가 전용) ---
     training_args = TrainingArguments(
@@ -184,6 +140,7 @@ def run_evaluation():
     trainer = Trainer(
         model=model,
         args=training_args,
+        data_collator=DynamicPaddingCollator(tokenizer.pad_token_id),
         compute_metrics=compute_metrics
     )
 
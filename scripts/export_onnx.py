@@ -0,0 +1,55 @@
+# 파일 이름: export_onnx.py
+# 감정 분류 모델을 ONNX 그래프로 내보내고, INT8 동적 양자화 버전을 함께 생성하는 스크립트
+# 사용법: python scripts/export_onnx.py [--model taehoon222/korean-emotion-classifier-final] [--out ./models/onnx]
+
+import os
+import argparse
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+DEFAULT_MODEL_ID = "taehoon222/korean-emotion-classifier-final"
+
+
+def export_onnx(model_id, out_dir, opset=17):
+    os.makedirs(out_dir, exist_ok=True)
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    int8_path = os.path.join(out_dir, "model.int8.onnx")
+
+    print(f"'{model_id}' 모델 로딩 중...")
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    model = AutoModelForSequenceClassification.from_pretrained(model_id)
+    model.eval()
+
+    dummy = tokenizer(["ONNX 내보내기용 예시 문장입니다."], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    print(f"ONNX(fp32) 내보내는 중... -> {fp32_path}")
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            tuple(dummy[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+
+    print(f"INT8 동적 양자화 중... -> {int8_path}")
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+    for path in (fp32_path, int8_path):
+        print(f"  {path}: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+    print("완료. EMOTION_BACKEND=onnx 또는 onnx-int8 로 서버를 실행하세요.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="감정 분류 모델 ONNX / INT8 내보내기")
+    parser.add_argument("--model", default=DEFAULT_MODEL_ID)
+    parser.add_argument("--out", default="./models/onnx")
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+    export_onnx(args.model, args.out, args.opset)
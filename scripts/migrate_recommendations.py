@@ -1,6 +1,7 @@
 import os
 import sys
 import logging
+import argparse
 
 # --- 프로젝트 루트 경로 설정 ---
 # 이 스크립트가 'scripts' 폴더 안에 있으므로, 부모 디렉토리(프로젝트 루트)를 경로에 추가합니다.
@@ -10,18 +11,19 @@ if project_root not in sys.path:
 
 from src import create_app, db
 from src.models import Diary
-from src.main import generate_recommendation, recommender # generate_recommendation 사용
+from src.main import generate_recommendation, RECOMMENDATION_STRATEGIES # generate_recommendation 사용
 import datetime
 
 # --- 로깅 설정 ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def migrate_diaries_with_recommendations():
+def migrate_diaries_with_recommendations(strategy=None):
     """
     기존의 모든 일기를 순회하며 'recommendation' 필드가 비어있는 경우,
     새로운 추천을 생성하여 채워넣습니다.
+    strategy가 'local_only'이면 Gemini를 호출하지 않고 로컬 Recommender만 사용합니다.
     """
-    app = create_app()
+    app = create_app(load_model=False)  # 추천만 생성하므로 감정 분류 모델은 필요 없습니다.
     with app.app_context():
         logging.info("데이터 마이그레이션을 시작합니다...")
         
@@ -41,25 +43,10 @@ def migrate_diaries_with_recommendations():
             try:
                 logging.info(f"ID: {diary.id} 일기 처리 중...")
                 
-                # 1. Gemini API를 통해 추천 생성 시도
-                recommendation_text = generate_recommendation(diary.content, diary.emotion)
+                # 1. 추천 생성 (Gemini 실패 시 generate_recommendation 내부에서 Recommender로 대체됩니다)
+                recommendation_text = generate_recommendation(diary.content, diary.emotion, strategy=strategy)
 
-                # 2. 실패 시, Recommender 클래스로 대체
-                if recommendation_text is None:
-                    logging.warning(f"ID: {diary.id} - Gemini 추천 실패. Recommender 클래스로 대체합니다.")
-                    su_yoong_recs = recommender.recommend(diary.emotion, '수용')
-                    jeon_hwan_recs = recommender.recommend(diary.emotion, '전환')
-                    
-                    # diary_logic.js가 파싱할 수 있는 형식으로 만듭니다.
-                    recommendation_text = f"## [수용]\n"
-                    for rec in su_yoong_recs:
-                        recommendation_text += f"* {rec}\n"
-                    
-                    recommendation_text += f"\n## [전환]\n"
-                    for rec in jeon_hwan_recs:
-                        recommendation_text += f"* {rec}\n"
-                
-                # 3. 데이터베이스에 반영
+                # 2. 데이터베이스에 반영
                 diary.recommendation = recommendation_text
                 updated_count += 1
                 logging.info(f"ID: {diary.id} - 추천 생성 완료.")
@@ -82,4 +69,8 @@ def migrate_diaries_with_recommendations():
         logging.info("마이그레이션 완료.")
 
 if __name__ == '__main__':
-    migrate_diaries_with_recommendations()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="비어있는 일기 추천 채우기")
+    parser.add_argument("--strategy", choices=RECOMMENDATION_STRATEGIES, default=None,
+                        help="추천 생성 전략 (기본값: RECOMMENDATION_STRATEGY 환경 변수)")
+    args = parser.parse_args()
+    migrate_diaries_with_recommendations(args.strategy)
\ No newline at end of file
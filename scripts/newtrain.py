@@ -1,10 +1,15 @@
 #newtrain.py
 
 import os
+import sys
+import re
+import copy
+import time
+import argparse
 import pandas as pd
 import json
-import re
 import torch
+import torch.nn.functional as F
 import numpy as np
 from transformers import (
     AutoTokenizer,
@@ -12,7 +17,7 @@ from transformers import (
     Trainer,
     TrainingArguments
 )
-from sklearn.metrics import accuracy_score, precision_recall_fscore_support, confusion_matrix
+from sklearn.metrics import confusion_matrix
 from sklearn.model_selection import train_test_split # 데이터 분리
 from sklearn.utils import class_weight
 from torch.nn import CrossEntropyLoss
@@ -22,6 +27,17 @@ import platform
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.bucketing import run_bucketed
+from src.corpus.cache import load_or_build, TokenizedCorpus
+from src.corpus.dataset import EmotionDataset, DynamicPaddingCollator
+from src.corpus.metrics import compute_metrics, classification_metrics
+from src.corpus.readers import load_label_frame
+from src.corpus.text import CLEAN_TEXT_VERSION
+
 # --- Matplotlib 한글 폰트 설정 (로컬 PC용) ---
 try:
     if platform.system() == 'Windows':
@@ -49,83 +65,174 @@ class TrainingConfig:
     weight_decay: float = 0.01
     max_length: int = 128
     warmup_ratio: float = 0.1
+    cache_dir: str = "./data/cache"  # 전처리 + 토큰 캐시 (원본/clean_text/토크나이저/max_length가 바뀌면 새로 생성)
+    # --- 지식 증류 (mode="distill") ---
+    teacher_model_name: str = "taehoon222/korean-emotion-classifier-final"  # 서빙 중인 모델
+    student_num_layers: int = 4
+    student_learning_rate: float = 5e-5
+    distill_temperature: float = 2.0
+    distill_alpha: float = 0.7  # soft(teacher) loss 비중. 나머지는 정답 라벨 CE
+    latency_samples: int = 200  # CPU 지연 시간 측정에 쓰는 Test 문장 수
     
     def get_model_name(self) -> str:
+        # 증류 모드에서는 teacher의 토크나이저와 구조를 그대로 씁니다.
+        if self.mode == 'distill':
+            return self.teacher_model_name
         return self.base_model_name
         
     def get_output_dir(self) -> str:
+        if self.mode == 'distill':
+            return os.path.join(self.output_dir, f'emotion_model_student_{self.student_num_layers}L')
         # v2 모델 저장 경로
         return os.path.join(self.output_dir, 'emotion_model_v2_manual')
 
 # --- 2. 커스텀 클래스 및 함수 ---
-class EmotionDataset(torch.utils.data.Dataset):
-    def __init__(self, encodings, labels):
-        self.encodings = encodings
-        self.labels = labels
-    def __getitem__(self, idx):
-        item = {key: val[idx].clone().detach() for key, val in self.encodings.items()}
-        item['labels'] = torch.tensor(self.labels[idx])
-        return item
-    def __len__(self):
-        return len(self.labels)
-
 class CustomTrainer(Trainer):
     def __init__(self, *args, class_weights=None, **kwargs):
         super().__init__(*args, **kwargs)
-        if class_weights is not None:
-            self.loss_fct = CrossEntropyLoss(weight=class_weights)
+        self.loss_fct = CrossEntropyLoss(weight=class_weights)
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        labels = inputs.pop("labels")
+        outputs = model(**inputs)
+        logits = outputs.get("logits")
+        loss = self.loss_fct(logits.view(-1, self.model.config.num_labels), labels.view(-1))
+        return (loss, outputs) if return_outputs else loss
+
+class DistillationTrainer(CustomTrainer):
+    """
+    정답 라벨 CE(클래스 가중치 포함)와 teacher soft logits에 대한 KL을 섞어 student를 학습합니다.
+    teacher logits는 학습 전에 한 번만 계산해 배치의 'teacher_logits'로 들어옵니다 (검증 배치에는 없음).
+    """
+    def __init__(self, *args, temperature=2.0, alpha=0.7, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.temperature = temperature
+        self.alpha = alpha
     def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        teacher_logits = inputs.pop("teacher_logits", None)
         labels = inputs.pop("labels")
         outputs = model(**inputs)
         logits = outputs.get("logits")
         loss = self.loss_fct(logits.view(-1, self.model.config.num_labels), labels.view(-1))
+        if teacher_logits is not None:
+            t = self.temperature
+            soft_loss = F.kl_div(
+                F.log_softmax(logits / t, dim=-1),
+                F.softmax(teacher_logits.to(logits.dtype) / t, dim=-1),
+                reduction="batchmean"
+            ) * (t * t)
+            loss = self.alpha * soft_loss + (1 - self.alpha) * loss
         return (loss, outputs) if return_outputs else loss
 
-def compute_metrics(pred):
-    labels = pred.label_ids
-    preds = pred.predictions.argmax(-1)
-    acc = accuracy_score(labels, preds)
-    precision, recall, f1, _ = precision_recall_fscore_support(labels, preds, average='weighted', zero_division=0)
-    return {'accuracy': acc, 'f1': f1}
+LAYER_KEY = re.compile(r'\.layer\.(\d+)\.')
+
+def build_student(teacher, num_layers):
+    """
+    teacher와 같은 구조에서 Transformer 층 수만 줄인 student를 만듭니다.
+    임베딩 / 분류기는 teacher 가중치를 그대로, 층은 teacher 층 중 고르게 고른 것으로 초기화합니다.
+    """
+    config = copy.deepcopy(teacher.config)
+    teacher_layers = config.num_hidden_layers
+    config.num_hidden_layers = num_layers
+    keep = [round(i * (teacher_layers - 1) / max(num_layers - 1, 1)) for i in range(num_layers)]
+
+    state = {}
+    for key, value in teacher.state_dict().items():
+        match = LAYER_KEY.search(key)
+        if match is None:
+            state[key] = value
+        elif int(match.group(1)) in keep:
+            state[f"{key[:match.start()]}.layer.{keep.index(int(match.group(1)))}.{key[match.end():]}"] = value
+
+    student = AutoModelForSequenceClassification.from_config(config)
+    student.load_state_dict(state)
+    print(f"student 생성: teacher {teacher_layers}층 중 {keep}번 층으로 {num_layers}층 초기화")
+    return student
 
-def clean_text(text: str) -> str:
-    return re.sub(r'[^가-힣a-zA-Z0-9 ]', '', str(text))
+def predict_logits(model, tokenizer, corpus, rows, batch_size=64):
+    """캐시된 토큰 id를 길이별 버킷 배치로 한 번씩만 추론합니다 (src/bucketing.py)."""
+    device = next(model.parameters()).device
+    sequences = [corpus.sequence(row).tolist() for row in rows]
+
+    def forward(batch):
+        encodings = tokenizer.pad({'input_ids': batch}, padding=True, return_tensors="pt").to(device)
+        with torch.inference_mode():
+            return model(**encodings).logits.float().cpu().numpy()
+
+    model.eval()
+    return np.stack(run_bucketed(sequences, forward, max_batch_size=batch_size))
+
+def measure_cpu_latency(model, corpus, rows, threads=1, warmup=10):
+    """CPU, 배치 크기 1에서 문장당 추론 시간(ms)의 p50 / p95 (서빙 환경과 같은 조건)"""
+    model = copy.deepcopy(model).to("cpu").eval()
+    previous_threads = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    timings = []
+    try:
+        with torch.inference_mode():
+            for i, row in enumerate(rows):
+                input_ids = torch.tensor([corpus.sequence(row).tolist()])
+                start = time.perf_counter()
+                model(input_ids=input_ids, attention_mask=torch.ones_like(input_ids))
+                if i >= warmup:
+                    timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        torch.set_num_threads(previous_threads)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 95))
+
+def distillation_report(models, tokenizer, test_corpus, df_test, config):
+    """teacher / student의 Test 정확도, F1, 파라미터 수, CPU 지연 시간을 나란히 비교합니다."""
+    rows = df_test['token_row'].to_numpy()
+    y_true = df_test['label'].to_numpy()
+    latency_rows = rows[:config.latency_samples + 10]
+
+    report = {}
+    for name, model in models.items():
+        logits = predict_logits(model, tokenizer, test_corpus, rows, config.eval_batch_size)
+        metrics = classification_metrics(y_true, logits.argmax(-1))
+        p50, p95 = measure_cpu_latency(model, test_corpus, latency_rows)
+        params = sum(p.numel() for p in model.parameters())
+        report[name] = {
+            'layers': model.config.num_hidden_layers,
+            'params_m': params / 1e6,
+            'fp32_mb': params * 4 / 1024 / 1024,
+            'accuracy': float(metrics['accuracy']),
+            'f1': float(metrics['f1']),
+            'cpu_p50_ms': p50,
+            'cpu_p95_ms': p95,
+        }
+
+    print("\n--- Teacher vs Student (Test Set, CPU 1 thread, batch 1) ---")
+    print(f"  {'model':<8} {'layers':>6} {'params(M)':>10} {'fp32(MB)':>9} {'accuracy':>9} {'f1':>7} {'p50(ms)':>8} {'p95(ms)':>8}")
+    for name, r in report.items():
+        print(f"  {name:<8} {r['layers']:>6} {r['params_m']:>10.1f} {r['fp32_mb']:>9.1f} {r['accuracy']:>9.4f} {r['f1']:>7.4f} {r['cpu_p50_ms']:>8.1f} {r['cpu_p95_ms']:>8.1f}")
+    teacher, student = report['teacher'], report['student']
+    print(f"  -> F1 {student['f1'] - teacher['f1']:+.4f}, 지연 시간 x{teacher['cpu_p50_ms'] / student['cpu_p50_ms']:.1f} 단축, "
+          f"크기 x{teacher['fp32_mb'] / student['fp32_mb']:.1f} 축소")
+    return report
 
 # --- 3. 데이터 로더 ([변경] Train/Val/Test 분리) ---
-def get_data(config: TrainingConfig) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def get_data(config: TrainingConfig, tokenizer) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, TokenizedCorpus, TokenizedCorpus]:
     if config.mode == 'nsmc':
       raise ValueError("이 스크립트는 'emotion' 모드 전용입니다.")
 
-    elif config.mode == 'emotion':
+    elif config.mode in ('emotion', 'distill'):
         print("--- 감정 데이터 로딩 (Train/Val/Test 분리) ---")
         
-        def load_and_map_labels(file_name):
-            def map_ecode_to_major_emotion(ecode):
-                try: code_num = int(ecode[1:])
-                except: return None
-                
-                if 10 <= code_num <= 19: return '분노'
-                elif 20 <= code_num <= 29: return '슬픔'
-                elif 30 <= code_num <= 39: return '불안'
-                elif 40 <= code_num <= 49: return '상처'
-                elif 50 <= code_num <= 59: return '당황'
-                elif 60 <= code_num <= 69: return '기쁨'
-                else: return None
-
-            with open(os.path.join(config.data_dir, file_name), 'r', encoding='utf-8') as f:
-                raw = json.load(f)
-            data = [{'text': " ".join(d['talk']['content'].values()), 'emotion': d['profile']['emotion']['type']} for d in raw]
-            df = pd.DataFrame(data)
-            df['major_emotion'] = df['emotion'].apply(map_ecode_to_major_emotion)
-            df.dropna(subset=['major_emotion'], inplace=True)
-            df['cleaned_text'] = df['text'].apply(clean_text)
-            return df
+        def load_corpus(name, file_name):
+            # 전처리 결과와 토큰 id를 캐시에서 읽고, 캐시가 없을 때만 JSON을 파싱/토크나이징합니다.
+            return load_or_build(
+                name, [os.path.join(config.data_dir, file_name)],
+                lambda: load_label_frame(os.path.join(config.data_dir, file_name)),
+                tokenizer, config.max_length, config.cache_dir, CLEAN_TEXT_VERSION
+            )
         
         # 1. Test Set 로드 (기존 validation-label.json 사용)
-        df_test = load_and_map_labels("test.json")
+        test_corpus = load_corpus("test-json", "test.json")
+        df_test = test_corpus.frame.copy()
         
         # 2. Train Set 로드 (기존 training-label.json 사용)
-        df_train_full = load_and_map_labels("training-label.json")
+        train_corpus = load_corpus("train-json", "training-label.json")
+        df_train_full = train_corpus.frame
         
         # 3. Train Set을 9:1로 분리 (신규 Train / 신규 Validation)
         label_column_str = 'major_emotion'
@@ -142,22 +249,27 @@ def get_data(config: TrainingConfig) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Dat
         print(f"  [신규] 검증(Validation)용: {len(df_val)}개 (10%)")
         print(f"  [최종] 테스트(Test)용: {len(df_test)}개 ")
         
-        return df_train, df_val, df_test
+        return df_train, df_val, df_test, train_corpus, test_corpus
     else:
         raise ValueError(f"지원하지 않는 모드입니다: {config.mode}")
 
 # --- 4. 메인 실행 함수 ---
-def run_training():
-    config = TrainingConfig()
-    df_train, df_val, df_test = get_data(config)
+def run_training(config: TrainingConfig):
+    distill = config.mode == 'distill'
+    tokenizer = AutoTokenizer.from_pretrained(config.get_model_name())
+    df_train, df_val, df_test, train_corpus, test_corpus = get_data(config, tokenizer)
     
-    text_column = 'cleaned_text'
     label_column_str = 'major_emotion'
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     
-    # 2. 토크나이저 및 라벨 인코딩
-    tokenizer = AutoTokenizer.from_pretrained(config.get_model_name())
-    unique_labels = sorted(df_train[label_column_str].unique())
-    label_to_id = {label: i for i, label in enumerate(unique_labels)}
+    # 2. 라벨 인코딩 (증류 모드에서는 student가 teacher 분류기를 물려받으므로 teacher의 라벨 순서를 따릅니다)
+    if distill:
+        teacher = AutoModelForSequenceClassification.from_pretrained(config.teacher_model_name).to(device).eval()
+        label_to_id = {label: int(i) for label, i in teacher.config.label2id.items()}
+        unique_labels = sorted(label_to_id, key=label_to_id.get)
+    else:
+        unique_labels = sorted(df_train[label_column_str].unique())
+        label_to_id = {label: i for i, label in enumerate(unique_labels)}
     id_to_label = {i: label for label, i in label_to_id.items()}
     
     print("\n--- 생성된 라벨 순서 (0~5) ---")
@@ -169,17 +281,21 @@ def run_training():
     df_test['label'] = df_test[label_column_str].map(label_to_id)
 
     # 3. 데이터셋 생성 및 클래스 가중치 계산
-    train_encodings = tokenizer(list(df_train[text_column]), max_length=config.max_length, padding=True, truncation=True, return_tensors="pt")
-    val_encodings = tokenizer(list(df_val[text_column]), max_length=config.max_length, padding=True, truncation=True, return_tensors="pt")
+    # 토크나이징은 캐시 단계에서 끝났으므로 token_row로 캐시 버퍼를 가리키기만 하고, 패딩은 배치마다 collator가 합니다.
+    teacher_logits = None
+    if distill:
+        print("\nteacher soft logits 계산 중 (학습 전 1회)...")
+        teacher_logits = predict_logits(teacher, tokenizer, train_corpus, df_train['token_row'], config.eval_batch_size)
+        teacher.to("cpu")  # 학습 중에는 teacher가 필요 없으므로 GPU 메모리를 비워 둡니다.
+    train_dataset = EmotionDataset(train_corpus, df_train['token_row'], df_train['label'], teacher_logits=teacher_logits)
+    val_dataset = EmotionDataset(train_corpus, df_val['token_row'], df_val['label'])
+    data_collator = DynamicPaddingCollator(tokenizer.pad_token_id)
     
-    train_dataset = EmotionDataset(train_encodings, df_train['label'].tolist())
-    val_dataset = EmotionDataset(val_encodings, df_val['label'].tolist())
-    
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     print(f"\nUsing device: {device}")
-    # 클래스 가중치 계산 
+    # 클래스 가중치 계산 (['기쁨', '당황', '분노', '불안', '상처', '슬픔'] 순서 기준, 실제 라벨 순서로 재배열)
     manual_weights_list = [6.00, 4.50, 0.85, 1.80, 1.80, 0.92] 
-    class_weights = torch.tensor(manual_weights_list, dtype=torch.float).to(device)
+    weight_by_label = dict(zip(sorted(unique_labels), manual_weights_list))
+    class_weights = torch.tensor([weight_by_label[label] for label in unique_labels], dtype=torch.float).to(device)
     
     print(f"--- 수동 적용된 클래스 가중치 ---")
     print(f"{class_weights.tolist()}")
@@ -187,13 +303,16 @@ def run_training():
 
 
     # 4. 모델 로딩
-    model = AutoModelForSequenceClassification.from_pretrained(
-        config.get_model_name(),
-        num_labels=len(unique_labels),
-        id2label=id_to_label,
-        label2id=label_to_id,
-        ignore_mismatched_sizes=True 
-    ).to(device)
+    if distill:
+        model = build_student(teacher, config.student_num_layers).to(device)
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(
+            config.get_model_name(),
+            num_labels=len(unique_labels),
+            id2label=id_to_label,
+            label2id=label_to_id,
+            ignore_mismatched_sizes=True 
+        ).to(device)
 
     # 5. 훈련 실행
     training_args = TrainingArguments(
@@ -201,7 +320,7 @@ def run_training():
         num_train_epochs=config.num_train_epochs,
         per_device_train_batch_size=config.train_batch_size,
         per_device_eval_batch_size=config.eval_batch_size,
-        learning_rate=config.learning_rate,
+        learning_rate=config.student_learning_rate if distill else config.learning_rate,
         weight_decay=config.weight_decay,
         warmup_ratio=config.warmup_ratio,
         eval_strategy="epoch",
@@ -212,14 +331,19 @@ def run_training():
         report_to="none"
     )
 
-    trainer = CustomTrainer(
+    trainer_kwargs = dict(
         model=model,
         args=training_args,
         train_dataset=train_dataset,
         eval_dataset=val_dataset,      
+        data_collator=data_collator,
         compute_metrics=compute_metrics,
         class_weights=class_weights
     )
+    if distill:
+        trainer = DistillationTrainer(**trainer_kwargs, temperature=config.distill_temperature, alpha=config.distill_alpha)
+    else:
+        trainer = CustomTrainer(**trainer_kwargs)
     
     print(f"\n '[신규 분리 데이터]'로 모델 훈련을 시작합니다...")
     trainer.train()
@@ -241,8 +365,7 @@ def run_training():
     print("="*50)
     
     # Test Set을 위한 데이터셋 생성
-    test_encodings = tokenizer(list(df_test[text_column]), max_length=config.max_length, padding=True, truncation=True, return_tensors="pt")
-    test_dataset = EmotionDataset(test_encodings, df_test['label'].tolist())
+    test_dataset = EmotionDataset(test_corpus, df_test['token_row'], df_test['label'])
 
     # trainer.predict()를 사용하여 Test Set에 대한 예측 수행
     test_predictions = trainer.predict(test_dataset)
@@ -278,5 +401,16 @@ def run_training():
     plt.savefig(cm_path)
     print(f"최종 혼동 행렬이 {cm_path}에 저장되었습니다.")
 
+    if distill:
+        report = distillation_report({'teacher': teacher, 'student': trainer.model}, tokenizer, test_corpus, df_test, config)
+        report_path = os.path.join(output_dir, "distillation_report.json")
+        with open(report_path, "w", encoding='utf-8') as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        print(f"증류 비교 결과가 {report_path}에 저장되었습니다.")
+
 if __name__ == "__main__":
-    run_training()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="감정 분류 모델 학습 (emotion: 기본 학습, distill: teacher -> 소형 student 지식 증류)")
+    parser.add_argument("--mode", choices=["emotion", "distill"], default=TrainingConfig.mode)
+    parser.add_argument("--student-layers", type=int, default=TrainingConfig.student_num_layers)
+    args = parser.parse_args()
+    run_training(TrainingConfig(mode=args.mode, student_num_layers=args.student_layers))
\ No newline at end of file
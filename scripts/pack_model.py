@@ -0,0 +1,69 @@
+# 파일 이름: pack_model.py
+# 서빙용 모델을 특정 revision으로 고정해 오프라인 아티팩트 디렉터리로 묶는 스크립트 (src/model_artifact.py)
+# 네트워크가 되는 곳에서 한 번 실행하고, 결과 디렉터리를 이미지에 넣은 뒤 EMOTION_MODEL_DIR로 지정합니다.
+# 사용법: python scripts/pack_model.py [--model taehoon222/korean-emotion-classifier-final] [--revision <commit>] [--out ./models/emotion]
+
+import os
+import sys
+import shutil
+import argparse
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.model_artifact import PhaseTimer, load_artifact, save_weights, write_manifest
+
+DEFAULT_MODEL_ID = "taehoon222/korean-emotion-classifier-final"
+
+
+def resolve_revision(model_id, revision):
+    """revision을 주지 않으면 현재 Hub의 커밋 해시로 고정합니다."""
+    if revision or os.path.isdir(model_id):
+        return revision
+    from huggingface_hub import HfApi
+    return HfApi().model_info(model_id).sha
+
+
+def pack_model(model_id, revision, out_dir):
+    revision = resolve_revision(model_id, revision)
+    print(f"'{model_id}' (revision: {revision}) 모델 로딩 중...")
+    tokenizer = AutoTokenizer.from_pretrained(model_id, revision=revision)
+    model = AutoModelForSequenceClassification.from_pretrained(model_id, revision=revision).eval()
+
+    tmp_dir = out_dir.rstrip('/') + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    tokenizer.save_pretrained(tmp_dir)
+    model.config.save_pretrained(tmp_dir)
+    save_weights(model, tmp_dir)
+    manifest = write_manifest(tmp_dir, model_id, revision)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+
+    for name, info in manifest['files'].items():
+        print(f"  {name}: {info['size'] / 1024 / 1024:.1f} MB  sha256={info['sha256'][:12]}")
+
+    # 묶은 결과를 오프라인 로더로 다시 읽어 원본과 같은 logits가 나오는지 확인합니다.
+    import torch
+    timer = PhaseTimer()
+    packed_tokenizer, packed_model = load_artifact(out_dir, timer)
+    sample = packed_tokenizer(["오프라인 아티팩트 확인용 문장입니다."], return_tensors="pt")
+    with torch.inference_mode():
+        diff = (model(**sample).logits - packed_model(**sample).logits).abs().max().item()
+    print(f"오프라인 로딩: {timer.summary()} | logits 최대 차이: {diff:.2e}")
+    if diff > 1e-5:
+        print("경고: 원본과 아티팩트의 출력이 다릅니다.")
+        return 1
+    print(f"완료. EMOTION_MODEL_DIR={out_dir} 로 서버를 실행하세요.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="감정 분류 모델 오프라인 아티팩트 만들기")
+    parser.add_argument("--model", default=DEFAULT_MODEL_ID)
+    parser.add_argument("--revision", default=None, help="Hub 커밋 해시 / 태그 (기본: 현재 main의 커밋 해시)")
+    parser.add_argument("--out", default="./models/emotion")
+    args = parser.parse_args()
+    sys.exit(pack_model(args.model, args.revision, args.out))
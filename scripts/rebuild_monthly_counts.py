@@ -0,0 +1,39 @@
+# 파일 이름: rebuild_monthly_counts.py
+# diary 테이블에서 diary_monthly_count(사용자별 월간 일기 수) 집계 테이블을 다시 만드는 스크립트
+# Supabase(PostgreSQL)는 supabase/migrations/20251115090000_add_diary_monthly_count.sql이 채우므로,
+# 로컬 SQLite 등 마이그레이션을 거치지 않은 DB에서 집계 테이블을 처음 만든 뒤 한 번 실행합니다.
+# 서버(gunicorn 워커)를 띄우기 전에 실행하세요. 실행 중에 저장 / 삭제된 일기는 집계에서 빠질 수 있습니다.
+# 사용법: python scripts/rebuild_monthly_counts.py [--if-empty]
+
+import os
+import sys
+import logging
+import argparse
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src import create_app, db
+from src.models import DiaryMonthlyCount, rebuild_monthly_counts
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def rebuild(app, if_empty=False):
+    """집계 행 수를 반환합니다. if_empty=True이고 이미 채워져 있으면 아무것도 하지 않고 None을 반환합니다."""
+    with app.app_context():
+        if if_empty and DiaryMonthlyCount.query.first() is not None:
+            logging.info("diary_monthly_count가 이미 채워져 있어 건너뜁니다.")
+            return None
+        rows = rebuild_monthly_counts()
+        db.session.commit()
+        logging.info(f"diary_monthly_count 집계 테이블을 다시 만들었습니다 ({rows}행).")
+        return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="diary_monthly_count 집계 테이블 재생성")
+    parser.add_argument("--if-empty", action="store_true", help="집계 테이블이 비어 있을 때만 채웁니다.")
+    args = parser.parse_args()
+    rebuild(create_app(load_model=False), if_empty=args.if_empty)
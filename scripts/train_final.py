@@ -1,9 +1,9 @@
 # 파일 이름: train_final.py
 
 import os
+import sys
 import pandas as pd
 import json
-import re
 import torch
 import numpy as np
 from transformers import (
@@ -12,7 +12,7 @@ from transformers import (
     Trainer, 
     TrainingArguments
 )
-from sklearn.metrics import accuracy_score, precision_recall_fscore_support, confusion_matrix
+from sklearn.metrics import confusion_matrix
 from sklearn.model_selection import train_test_split 
 from sklearn.utils import resample 
 from typing import Dict, List, Tuple
@@ -21,6 +21,16 @@ import platform
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.corpus.cache import load_or_build, TokenizedCorpus
+from src.corpus.dataset import EmotionDataset, DynamicPaddingCollator
+from src.corpus.metrics import compute_metrics
+from src.corpus.readers import load_excel_frame
+from src.corpus.text import CLEAN_TEXT_VERSION
+
 # --- Matplotlib 한글 폰트 설정 ---
 try:
     if platform.system() == 'Windows':
@@ -47,6 +57,7 @@ class TrainingConfig:
     weight_decay: float = 0.01
     max_length: int = 128
     warmup_ratio: float = 0.1
+    cache_dir: str = "./data/cache"  # 전처리 + 토큰 캐시 (원본/clean_text/토크나이저/max_length가 바뀌면 새로 생성)
     
     def get_model_name(self) -> str:
         if self.mode == 'emotion':
@@ -62,100 +73,44 @@ class TrainingConfig:
         # 모델 저장 경로 수정 
         return os.path.join(self.output_dir, 'emotion_model_6class_oversampled')
 
-# --- 2. 커스텀 클래스 및 함수 ---
-class EmotionDataset(torch.utils.data.Dataset):
-    def __init__(self, encodings, labels):
-        self.encodings = encodings
-        self.labels = labels
-    def __getitem__(self, idx):
-        item = {key: val[idx].clone().detach() for key, val in self.encodings.items()}
-        item['labels'] = torch.tensor(self.labels[idx])
-        return item
-    def __len__(self):
-        return len(self.labels)
-
-def compute_metrics(pred):
-    labels = pred.label_ids
-    preds = pred.predictions.argmax(-1)
-    acc = accuracy_score(labels, preds)
-    precision, recall, f1, _ = precision_recall_fscore_support(labels, preds, average='weighted', zero_division=0)
-    return {'accuracy': acc, 'f1': f1}
-
-def clean_text(text: str) -> str:
-    return re.sub(r'[^가-힣a-zA-Z0-9 ]', '', str(text))
-
-# --- 3. 데이터 로더 ---
-
-def map_ecode_to_6class(e_code_str):
-    """E코드("E18")를 6-Class("분노")로 매핑하는 함수"""
-    if not isinstance(e_code_str, str) or not e_code_str.startswith('E'): return None
-    try: code_num = int(e_code_str[1:]) 
-    except (ValueError, TypeError): return None
-    
-    if 10 <= code_num <= 19: return '분노'
-    elif 20 <= code_num <= 29: return '슬픔'
-    elif 30 <= code_num <= 39: return '불안'
-    elif 40 <= code_num <= 49: return '상처'
-    elif 50 <= code_num <= 59: return '당황'
-    elif 60 <= code_num <= 69: return '기쁨'
-    else: return None
-
+# --- 2. 데이터 로더 (src/corpus 공용 모듈 사용) ---
 def load_and_process(text_file, label_file, data_dir):
     """Excel(텍스트)과 JSON(라벨)을 병합하고 전처리하는 헬퍼 함수"""
-    text_path = os.path.join(data_dir, text_file)
-    label_path = os.path.join(data_dir, label_file)
-    try:
-        df_text = pd.read_excel(text_path, header=None)
-        with open(label_path, 'r', encoding='utf-8') as f:
-            labels_raw = json.load(f)
-    except FileNotFoundError as e:
-        print(f"오류: 필수 파일을 찾을 수 없습니다: {e}")
-        return pd.DataFrame()
-    
-    e_codes = []
-    for dialogue in labels_raw:
-        try: e_codes.append(dialogue['profile']['emotion']['type']) # "E18"
-        except KeyError: e_codes.append(None)
-    
-    if len(df_text) != len(e_codes):
-        min_len = min(len(df_text), len(e_codes))
-        print(f"경고: {text_file}과 {label_file} 줄 수 불일치. {min_len}개로 축소합니다.")
-        df_text = df_text.iloc[:min_len]
-        e_codes = e_codes[:min_len]
-        
-    df_labels = pd.DataFrame({'e_code': e_codes})
-    df_combined = pd.concat([df_text, df_labels], axis=1)
-    
-    dialogue_cols = [8, 9, 10, 11]
-    for col in dialogue_cols:
-        df_combined[col] = df_combined[col].astype(str).fillna('')
-    df_combined['text'] = df_combined[dialogue_cols].apply(lambda row: ' '.join(row), axis=1)
+    return load_excel_frame(os.path.join(data_dir, text_file), os.path.join(data_dir, label_file))
 
-    df_combined['cleaned_text'] = df_combined['text'].apply(clean_text)
-    
-    df_combined['major_emotion'] = df_combined['e_code'].apply(map_ecode_to_6class)
-    
-    df_combined.dropna(subset=['major_emotion', 'cleaned_text'], inplace=True)
-    df_combined = df_combined[df_combined['cleaned_text'].str.strip() != '']
-    
-    return df_combined
+def load_corpus(name, text_file, label_file, config: TrainingConfig, tokenizer) -> TokenizedCorpus:
+    """load_and_process 결과와 토큰 id를 캐시에서 읽습니다. 캐시가 없을 때만 엑셀을 읽고 토크나이징합니다."""
+    sources = [os.path.join(config.data_dir, f) for f in (text_file, label_file)]
+    missing = [p for p in sources if not os.path.exists(p)]
+    if missing:
+        print(f"오류: 필수 파일을 찾을 수 없습니다: {missing}")
+        return TokenizedCorpus.empty()
+    return load_or_build(
+        name, sources,
+        lambda: load_and_process(text_file, label_file, config.data_dir),
+        tokenizer, config.max_length, config.cache_dir, CLEAN_TEXT_VERSION
+    )
 
-def get_data(config: TrainingConfig) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def get_data(config: TrainingConfig, tokenizer) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, TokenizedCorpus, TokenizedCorpus]:
     """
     Train/Val/Test 3-Set을 로드하고, Train Set에 Oversampling을 적용
+    각 DataFrame의 token_row 열은 함께 반환되는 코퍼스(train/test)의 토큰 캐시 행 번호입니다.
     """
+    empty = TokenizedCorpus.empty()
     if config.mode != 'emotion':
         print("이 스크립트는 'emotion' 모드 전용입니다.")
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), empty, empty
 
     print("--- 감정 데이터 로딩 (Train/Validation/Test) ---")
     
-    df_full_train = load_and_process("training-origin.xlsx", "training-label.json", config.data_dir)
-    df_test = load_and_process("validation-origin.xlsx", "test.json", config.data_dir)
+    train_corpus = load_corpus("train", "training-origin.xlsx", "training-label.json", config, tokenizer)
+    test_corpus = load_corpus("test", "validation-origin.xlsx", "test.json", config, tokenizer)
+    df_full_train = train_corpus.frame
+    df_test = test_corpus.frame.copy()
     
     if df_full_train.empty or df_test.empty:
         print("오류: 데이터 로딩 실패.")
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), empty, empty
 
     print(f"Full Train data loaded: {len(df_full_train)} rows")
     print(f"Test data loaded: {len(df_test)} rows")
@@ -204,23 +159,22 @@ def get_data(config: TrainingConfig) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Dat
     print(f"\nNew Train set (Oversampled) size: {len(df_train)}")
     print(f"New Validation set (Original) size: {len(df_val)}")
     
-    return df_train, df_val, df_test
+    return df_train, df_val, df_test, train_corpus, test_corpus
 
-# --- 4. 메인 실행 함수 ---
+# --- 3. 메인 실행 함수 ---
 def run_training():
     config = TrainingConfig()
     
-    df_train, df_val, df_test = get_data(config)
+    model_name_to_load = config.get_model_name()
+    tokenizer = AutoTokenizer.from_pretrained(model_name_to_load)
+
+    df_train, df_val, df_test, train_corpus, test_corpus = get_data(config, tokenizer)
     
     if df_train.empty or df_val.empty or df_test.empty:
         print("\n오류: 데이터가 비어있어 훈련을 중단합니다.")
         return
 
-    text_column = 'cleaned_text'
     label_column_str = 'major_emotion' 
-    
-    model_name_to_load = config.get_model_name()
-    tokenizer = AutoTokenizer.from_pretrained(model_name_to_load)
 
     unique_labels = sorted(df_train[label_column_str].unique())
     label_to_id = {label: i for i, label in enumerate(unique_labels)}
@@ -232,14 +186,11 @@ def run_training():
     df_val['label'] = df_val[label_column_str].map(label_to_id) 
     df_test['label'] = df_test[label_column_str].map(label_to_id)
 
-    print("데이터셋 토크나이징 중...")
-    train_encodings = tokenizer(list(df_train[text_column]), max_length=config.max_length, padding=True, truncation=True, return_tensors="pt")
-    val_encodings = tokenizer(list(df_val[text_column]), max_length=config.max_length, padding=True, truncation=True, return_tensors="pt")
-    test_encodings = tokenizer(list(df_test[text_column]), max_length=config.max_length, padding=True, truncation=True, return_tensors="pt")
-    
-    train_dataset = EmotionDataset(train_encodings, df_train['label'].tolist())
-    val_dataset = EmotionDataset(val_encodings, df_val['label'].tolist())
-    test_dataset = EmotionDataset(test_encodings, df_test['label'].tolist())
+    # 토크나이징은 캐시 단계에서 끝났으므로 token_row로 캐시 버퍼를 가리키기만 하고, 패딩은 배치마다 collator가 합니다.
+    train_dataset = EmotionDataset(train_corpus, df_train['token_row'], df_train['label'])
+    val_dataset = EmotionDataset(train_corpus, df_val['token_row'], df_val['label'])
+    test_dataset = EmotionDataset(test_corpus, df_test['token_row'], df_test['label'])
+    data_collator = DynamicPaddingCollator(tokenizer.pad_token_id)
     
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     print(f"\nUsing device: {device}")
@@ -274,6 +225,7 @@ def run_training():
         args=training_args,
         train_dataset=train_dataset,
         eval_dataset=val_dataset,      
+        data_collator=data_collator,
         compute_metrics=compute_metrics
     )
     
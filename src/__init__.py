@@ -1,13 +1,39 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import LoginManager
 import os
 
-db = SQLAlchemy()
-login_manager = LoginManager()
-login_manager.login_view = 'auth.login' 
+# Flask 확장은 처음 접근할 때 만듭니다. `import src.corpus...`만 하는 전처리 스크립트 / 노트북이
+# 이 패키지의 __init__을 거치면서 flask / flask_sqlalchemy를 import 하지 않도록 하기 위해서입니다.
+_extensions = {}
+
+
+def _create_db():
+    from flask_sqlalchemy import SQLAlchemy
+    return SQLAlchemy()
+
+
+def _create_login_manager():
+    from flask_login import LoginManager
+    login_manager = LoginManager()
+    login_manager.login_view = 'auth.login'
+    return login_manager
+
+
+_EXTENSION_FACTORIES = {'db': _create_db, 'login_manager': _create_login_manager}
+
+
+def __getattr__(name):
+    # `from . import db` / `from src import db`도 이 함수를 거칩니다 (PEP 562).
+    factory = _EXTENSION_FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name not in _extensions:
+        _extensions[name] = factory()
+    return _extensions[name]
+
+
+def create_app(load_model=True):
+    from flask import Flask
+    from . import db
 
-def create_app():
     app = Flask(__name__, static_folder='templates/static')
     
     # 1. 설정
@@ -46,22 +72,28 @@ def create_app():
     with app.app_context():
         from . import models
         db.create_all()
+        # diary_monthly_count는 여기서 채우지 않습니다. 워커마다 create_app이 돌면서 서로 지우고 다시 채우게 되므로,
+        # Supabase는 마이그레이션에서, 그 밖의 DB는 scripts/rebuild_monthly_counts.py로 한 번 채웁니다.
 
     @app.teardown_appcontext
     def shutdown_session(exception=None):
         db.session.remove()
 
-   # 3. AI 모델 로딩
-    from .emotion_engine import load_emotion_classifier
-    # 앱 컨텍스트 안에서 모델을 로드하고 app 객체에 저장합니다.
-    with app.app_context():
-        app.emotion_classifier = load_emotion_classifier()
-        
-
+    # 3. AI 모델 로딩 (백그라운드 스레드, 기다리지 않음)
+    # 모델이 준비되기 전에도 로그인 / 달력 / 일기 API는 바로 응답하고, 예측 API만 503을 돌려줍니다.
+    # 분류를 하지 않는 스크립트(마이그레이션 등)는 load_model=False로 모델 로딩을 건너뜁니다.
+    from .model_loader import model_loader
+    if load_model:
+        model_loader.start()
+    app.model_loader = model_loader
 
     # 5. 블루프린트 등록
     from . import main, auth
     app.register_blueprint(main.bp)
     app.register_blueprint(auth.bp)
 
+    # 6. 추천 생성 백그라운드 워커 (recommendation_job 테이블 기반)
+    from . import jobs
+    jobs.init_app(app)
+
     return app
@@ -7,6 +7,7 @@ import logging
 from werkzeug.security import generate_password_hash, check_password_hash
 from . import db
 from .models import User
+from .identity import remember_identity
 
 bp = Blueprint('auth', __name__, url_prefix='/auth')
 
@@ -30,6 +31,7 @@ def login():
         session.clear()
         session['user_id'] = user.id
         session['username'] = user.username
+        remember_identity(user)
         return redirect(url_for('main.home'))
 
     return render_template('auth_combined.html')
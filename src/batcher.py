@@ -0,0 +1,93 @@
+# src/batcher.py
+# 동시에 들어온 감정 분석 요청을 몇 ms 동안 모아서 한 번의 forward pass로 처리하는 마이크로 배처
+
+import os
+import queue
+import threading
+import time
+import logging
+
+
+class _PendingRequest:
+    """큐에 들어간 단일 요청. 워커 스레드가 결과를 채우고 event를 set 합니다."""
+    __slots__ = ('text', 'top_k', 'event', 'result', 'error')
+
+    def __init__(self, text, top_k):
+        self.text = text
+        self.top_k = top_k
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    요청을 최대 max_wait_ms 동안(또는 max_batch_size개가 찰 때까지) 모은 뒤
+    run_batch(texts, top_k)를 한 번 호출하고, 각 호출자에게 자신의 top_k 결과를 돌려줍니다.
+
+    run_batch는 texts와 같은 순서로 [[{'label', 'score'}, ...], ...]를 반환해야 합니다.
+    """
+
+    def __init__(self, run_batch, max_batch_size=16, max_wait_ms=5):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    def _ensure_worker(self):
+        # gunicorn --preload 환경에서는 fork 이후 스레드가 사라지므로, 프로세스마다 워커를 새로 띄웁니다.
+        pid = os.getpid()
+        if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+                return
+            if self._worker_pid != pid:
+                self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._loop, name='emotion-micro-batcher', daemon=True)
+            self._worker_pid = pid
+            self._worker.start()
+
+    def submit(self, text, top_k=3, timeout=None):
+        self._ensure_worker()
+        request = _PendingRequest(text, top_k)
+        self._queue.put(request)
+        if not request.event.wait(timeout):
+            raise TimeoutError("마이크로 배치 추론 대기 시간이 초과되었습니다.")
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect(self):
+        # 첫 요청은 올 때까지 기다리고, 이후 요청은 첫 요청 시점부터 max_wait까지만 모읍니다.
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            max_k = max(req.top_k for req in batch)
+            try:
+                outputs = self.run_batch([req.text for req in batch], max_k)
+                for req, output in zip(batch, outputs):
+                    req.result = output[:req.top_k]
+            except Exception as e:
+                logging.error(f"마이크로 배치 추론 중 오류 발생 (배치 크기 {len(batch)}): {e}")
+                for req in batch:
+                    req.error = e
+            finally:
+                for req in batch:
+                    req.event.set()
@@ -0,0 +1,45 @@
+# src/bucketing.py
+# 길이별 버킷 배치: 토큰 수가 비슷한 입력끼리 묶어 각 배치를 그 배치의 최대 길이까지만 패딩합니다.
+# 서빙(emotion_engine 마이크로 배치)과 오프라인 평가 스크립트가 같은 로직을 사용합니다.
+
+DEFAULT_BOUNDARIES = (16, 32, 64, 128, 256, 512)
+
+
+def _bucket_of(length, boundaries):
+    for i, boundary in enumerate(boundaries):
+        if length <= boundary:
+            return i
+    return len(boundaries)
+
+
+def length_buckets(lengths, max_batch_size=32, boundaries=DEFAULT_BOUNDARIES):
+    """
+    인덱스를 길이순으로 정렬한 뒤, 배치 크기가 max_batch_size를 넘거나
+    길이 구간(boundaries)이 바뀌는 지점에서 끊어 배치 목록을 만듭니다.
+    반환값: 원래 인덱스 리스트들의 리스트
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    batches, current, current_bucket = [], [], None
+    for idx in order:
+        bucket = _bucket_of(lengths[idx], boundaries)
+        if current and (len(current) >= max_batch_size or bucket != current_bucket):
+            batches.append(current)
+            current = []
+        current.append(idx)
+        current_bucket = bucket
+    if current:
+        batches.append(current)
+    return batches
+
+
+def run_bucketed(sequences, forward, max_batch_size=32, boundaries=DEFAULT_BOUNDARIES):
+    """
+    sequences(토큰 id 리스트들)를 길이별 배치로 나눠 forward(batch)를 호출하고,
+    forward가 돌려준 행(row)들을 원래 순서대로 되돌려 리스트로 반환합니다.
+    """
+    results = [None] * len(sequences)
+    for batch in length_buckets([len(seq) for seq in sequences], max_batch_size, boundaries):
+        outputs = forward([sequences[i] for i in batch])
+        for i, output in zip(batch, outputs):
+            results[i] = output
+    return results
@@ -0,0 +1,2 @@
+# src/corpus
+# AI-Hub 감성대화 말뭉치 로딩 / 전처리 / 캐시 (학습·평가 스크립트 공용)
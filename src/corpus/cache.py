@@ -0,0 +1,112 @@
+# src/corpus/cache.py
+# 전처리 + 토크나이징 결과를 디스크에 한 번만 저장하고, 이후 실행에서는 memmap으로 바로 읽는 캐시
+#
+# 캐시 디렉터리 구조 (<cache_dir>/<name>-<key>/):
+#   frame.parquet  : 전처리된 DataFrame (cleaned_text, major_emotion 등) + token_row 열
+#   input_ids.npy  : 모든 문장의 토큰 id를 이어 붙인 1차원 int32 배열
+#   offsets.npy    : 문장 i의 토큰은 input_ids[offsets[i]:offsets[i + 1]]
+#   meta.json      : 캐시 키를 만든 정보 (디버깅용)
+
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(source_paths, clean_text_version, tokenizer, max_length):
+    """원본 파일 내용, clean_text 버전, 토크나이저, max_length 중 하나라도 바뀌면 키가 달라집니다."""
+    meta = {
+        'sources': {os.path.basename(p): file_digest(p) for p in source_paths},
+        'clean_text_version': clean_text_version,
+        'tokenizer': tokenizer.name_or_path,
+        'tokenizer_class': type(tokenizer).__name__,
+        'vocab_size': len(tokenizer),
+        'max_length': max_length,
+    }
+    key = hashlib.sha256(json.dumps(meta, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    return key, meta
+
+
+class TokenizedCorpus:
+    """전처리된 DataFrame과 memmap 토큰 배열을 함께 들고 있는 객체"""
+
+    def __init__(self, frame, input_ids, offsets):
+        self.frame = frame
+        self.input_ids = input_ids
+        self.offsets = offsets
+
+    @classmethod
+    def empty(cls):
+        return cls(pd.DataFrame(), np.zeros(0, dtype=np.int32), np.zeros(1, dtype=np.int64))
+
+    @classmethod
+    def from_token_ids(cls, frame, token_ids):
+        """토크나이저 출력(문장별 id 리스트)을 offsets가 붙은 연속 버퍼 하나로 합칩니다 (캐시 없이 쓸 때)."""
+        offsets = np.zeros(len(token_ids) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids in token_ids], out=offsets[1:])
+        input_ids = np.fromiter((t for ids in token_ids for t in ids), dtype=np.int32, count=int(offsets[-1]))
+        return cls(frame, input_ids, offsets)
+
+    def sequence(self, row):
+        """row번째 문장의 토큰 id (패딩 없음, 버퍼의 view라 복사하지 않습니다)"""
+        return self.input_ids[self.offsets[row]:self.offsets[row + 1]]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+def load_or_build(name, source_paths, build_frame, tokenizer, max_length, cache_dir,
+                  clean_text_version, text_column='cleaned_text'):
+    """
+    캐시가 있으면 memmap으로 읽고(zero-copy), 없으면 build_frame()으로 DataFrame을 만든 뒤
+    text_column을 토크나이징하여 캐시에 저장합니다.
+    """
+    key, meta = cache_key(source_paths, clean_text_version, tokenizer, max_length)
+    path = os.path.join(cache_dir, f"{name}-{key}")
+
+    if os.path.exists(os.path.join(path, 'meta.json')):
+        print(f"[캐시] '{name}' 전처리/토큰 캐시를 불러옵니다: {path}")
+        return _load(path)
+
+    print(f"[캐시] '{name}' 캐시가 없어 전처리와 토크나이징을 수행합니다...")
+    frame = build_frame()
+    if frame.empty:
+        return TokenizedCorpus.empty()
+    frame = frame.reset_index(drop=True)
+    frame['token_row'] = np.arange(len(frame), dtype=np.int64)
+
+    token_ids = tokenizer(list(frame[text_column]), truncation=True, max_length=max_length)['input_ids']
+    corpus = TokenizedCorpus.from_token_ids(frame, token_ids)
+    input_ids, offsets = corpus.input_ids, corpus.offsets
+
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    # 문자열 열만 저장합니다 (엑셀 원본의 다른 열은 학습에 쓰이지 않습니다).
+    keep = [c for c in frame.columns if c in (text_column, 'major_emotion', 'e_code', 'emotion', 'token_row')]
+    frame[keep].to_parquet(os.path.join(tmp_path, 'frame.parquet'), index=False)
+    np.save(os.path.join(tmp_path, 'input_ids.npy'), input_ids)
+    np.save(os.path.join(tmp_path, 'offsets.npy'), offsets)
+    with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    print(f"[캐시] 저장 완료: {path} (문장 {len(frame)}개, 토큰 {int(offsets[-1])}개)")
+    return _load(path)
+
+
+def _load(path):
+    frame = pd.read_parquet(os.path.join(path, 'frame.parquet'))
+    input_ids = np.load(os.path.join(path, 'input_ids.npy'), mmap_mode='r')
+    offsets = np.load(os.path.join(path, 'offsets.npy'), mmap_mode='r')
+    return TokenizedCorpus(frame, input_ids, offsets)
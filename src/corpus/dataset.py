@@ -0,0 +1,58 @@
+# src/corpus/dataset.py
+# Hugging Face Trainer용 Dataset / collator
+# 토큰 id는 TokenizedCorpus의 연속 버퍼(패딩 없음)에 그대로 두고, 배치를 만들 때 그 배치의 최대 길이까지만 패딩합니다.
+
+import numpy as np
+import torch
+
+
+class EmotionDataset(torch.utils.data.Dataset):
+    """
+    corpus(TokenizedCorpus)의 rows번째 문장들과 라벨.
+    __getitem__은 버퍼의 view를 돌려줄 뿐 텐서를 만들거나 복사하지 않습니다.
+    teacher_logits(지식 증류용, rows와 같은 순서의 (N, num_labels) 배열)를 주면 샘플에 함께 담습니다.
+    """
+
+    def __init__(self, corpus, rows, labels, teacher_logits=None):
+        self.corpus = corpus
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self.teacher_logits = teacher_logits
+        if len(self.rows) != len(self.labels):
+            raise ValueError(f"문장 수({len(self.rows)})와 라벨 수({len(self.labels)})가 다릅니다.")
+
+    def __getitem__(self, idx):
+        item = {'input_ids': self.corpus.sequence(self.rows[idx]), 'labels': self.labels[idx]}
+        if self.teacher_logits is not None:
+            item['teacher_logits'] = self.teacher_logits[idx]
+        return item
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class DynamicPaddingCollator:
+    """EmotionDataset 샘플 리스트를 배치 내 최대 길이로 패딩한 input_ids / attention_mask / labels (/ teacher_logits) 텐서로 묶습니다."""
+
+    def __init__(self, pad_token_id, pad_to_multiple_of=None):
+        self.pad_token_id = pad_token_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+
+    def __call__(self, features):
+        lengths = [len(f['input_ids']) for f in features]
+        max_len = max(lengths)
+        if self.pad_to_multiple_of:
+            max_len = -(-max_len // self.pad_to_multiple_of) * self.pad_to_multiple_of
+
+        input_ids = np.full((len(features), max_len), self.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(features), max_len), dtype=np.int64)
+        for i, (feature, length) in enumerate(zip(features, lengths)):
+            input_ids[i, :length] = feature['input_ids']
+            attention_mask[i, :length] = 1
+
+        batch = {'input_ids': torch.from_numpy(input_ids), 'attention_mask': torch.from_numpy(attention_mask)}
+        if 'labels' in features[0]:
+            batch['labels'] = torch.tensor([int(f['labels']) for f in features], dtype=torch.long)
+        if 'teacher_logits' in features[0]:
+            batch['teacher_logits'] = torch.from_numpy(np.stack([f['teacher_logits'] for f in features]).astype(np.float32))
+        return batch
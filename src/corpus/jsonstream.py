@@ -0,0 +1,78 @@
+# src/corpus/jsonstream.py
+# 최상위가 배열인 큰 JSON 파일을 원소 단위로 읽는 증분 파서
+# 파일 전체를 json.load로 한 번에 올리지 않고, 고정 크기 청크를 읽어 원소 하나씩 디코딩한 뒤 바로 넘겨줍니다.
+# 메모리 사용량은 파일 크기와 무관하게 "청크 + 원소 하나" 수준으로 유지됩니다.
+
+import json
+
+WHITESPACE = ' \t\r\n'
+# 배열 원소 뒤에 올 수 있는 문자. 디코딩한 값 바로 뒤가 이 중 하나여야 값이 끝났다고 확신할 수 있습니다.
+DELIMITERS = ',]' + WHITESPACE
+
+
+class _ChunkBuffer:
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _read_more(self):
+        chunk = self.f.read(self.chunk_size)
+        self.eof = not chunk
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        """공백을 건너뛴 다음 문자 (파일 끝이면 None)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return None
+            self._read_more()
+
+    def decode(self, decoder):
+        """
+        현재 위치의 JSON 값 하나를 디코딩합니다. 값이 청크 경계에 걸려 있으면 청크를 더 읽어 다시 시도합니다.
+        값 바로 뒤에 구분 문자(',', ']', 공백)가 있을 때만 성공으로 봅니다.
+        숫자는 경계에서 잘려도 디코딩되기 때문입니다 ('12.5'가 '12.' | '5'로 나뉘면 '12.'에서 12가 나옵니다).
+        """
+        self.peek()  # raw_decode는 앞쪽 공백을 건너뛰지 않습니다.
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+                if (end < len(self.buf) and self.buf[end] in DELIMITERS) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read_more()
+
+
+def iter_json_array(path, chunk_size=1 << 16):
+    """
+    [원소, 원소, ...] 형태 JSON 파일의 원소를 앞에서부터 하나씩 yield 합니다.
+    원소 하나의 디코딩은 표준 json 디코더(raw_decode)가 맡고, 여기서는 배열의 괄호와 쉼표만 따라갑니다.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        reader = _ChunkBuffer(f, chunk_size)
+        if reader.peek() != '[':
+            raise ValueError(f"{path}: 최상위 값이 JSON 배열이 아닙니다.")
+        reader.pos += 1
+
+        if reader.peek() == ']':
+            return
+        while True:
+            yield reader.decode(decoder)
+            char = reader.peek()
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"{path}: 배열 원소 뒤에 ',' 또는 ']'가 필요합니다 (실제: {char!r}).")
+            reader.pos += 1
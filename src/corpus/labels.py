@@ -0,0 +1,34 @@
+# src/corpus/labels.py
+# AI-Hub 감성대화 말뭉치의 E코드(E10~E69) -> 6-Class 감정 매핑
+
+import numpy as np
+
+# 학습 스크립트가 sorted()로 만드는 라벨 순서와 같습니다.
+EMOTION_LABELS = ('기쁨', '당황', '분노', '불안', '상처', '슬픔')
+
+# E코드 숫자(0~69) -> 6-Class 조회표. E10~E69만 값이 있고 나머지는 None입니다.
+ECODE_TABLE = np.full(70, None, dtype=object)
+for _start, _label in ((10, '분노'), (20, '슬픔'), (30, '불안'), (40, '상처'), (50, '당황'), (60, '기쁨')):
+    ECODE_TABLE[_start:_start + 10] = _label
+
+
+def ecode_number(e_code):
+    """"E18" -> 18. 형식이 다르면 None."""
+    if not isinstance(e_code, str) or not e_code.startswith('E'):
+        return None
+    try:
+        return int(e_code[1:])
+    except ValueError:
+        return None
+
+
+def map_ecode_to_6class(e_code):
+    """E코드("E18")를 6-Class("분노")로 매핑합니다. 범위를 벗어나면 None."""
+    number = ecode_number(e_code)
+    if number is None or not 0 <= number < len(ECODE_TABLE):
+        return None
+    return ECODE_TABLE[number]
+
+
+# 예전 스크립트에서 쓰던 이름
+map_ecode_to_major_emotion = map_ecode_to_6class
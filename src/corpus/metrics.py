@@ -0,0 +1,16 @@
+# src/corpus/metrics.py
+# 학습(Trainer)과 오프라인 평가가 함께 쓰는 분류 지표
+
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+
+
+def classification_metrics(labels, preds):
+    acc = accuracy_score(labels, preds)
+    precision, recall, f1, _ = precision_recall_fscore_support(labels, preds, average='weighted', zero_division=0)
+    return {'accuracy': acc, 'f1': f1, 'precision': precision, 'recall': recall}
+
+
+def compute_metrics(pred):
+    """Trainer(compute_metrics=...)용: EvalPrediction에서 accuracy / weighted F1을 계산합니다."""
+    metrics = classification_metrics(pred.label_ids, pred.predictions.argmax(-1))
+    return {'accuracy': metrics['accuracy'], 'f1': metrics['f1']}
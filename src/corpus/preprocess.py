@@ -0,0 +1,44 @@
+# src/corpus/preprocess.py
+# 학습 데이터 전처리의 벡터화 버전: 행 단위 apply 대신 열 전체에 pandas 문자열 연산 / 배열 조회를 적용합니다.
+# 결과는 행 단위 구현(clean_text, map_ecode_to_6class)과 동일해야 합니다.
+
+import numpy as np
+import pandas as pd
+from .text import CLEAN_TEXT_PATTERN, WHITESPACE_PATTERN
+from .labels import ECODE_TABLE, ecode_number
+
+
+def join_text_columns(df: pd.DataFrame, columns) -> pd.Series:
+    """여러 발화 열을 공백으로 이어 붙입니다. (행 단위 ' '.join(row)와 같이 결측값은 문자열 'nan'이 됩니다.)"""
+    parts = [df[col].astype(str) for col in columns]
+    return parts[0].str.cat(parts[1:], sep=' ')
+
+
+def clean_text_column(texts: pd.Series) -> pd.Series:
+    """열 전체에 text.clean_text와 같은 규칙(NFC 정규화, 공백 문자를 ' '로 바꾼 뒤 정규식 제거)을 적용합니다."""
+    texts = texts.astype(str).str.normalize('NFC').str.replace(WHITESPACE_PATTERN, ' ', regex=True)
+    return texts.str.replace(CLEAN_TEXT_PATTERN, '', regex=True)
+
+
+def map_ecode_column(e_codes: pd.Series) -> pd.Series:
+    """
+    "E18" 같은 E코드 열을 6-Class 라벨 열로 바꿉니다. 형식이 다르거나 범위를 벗어나면 None.
+    E코드 종류는 수십 개뿐이므로 고유값만 해석하고, 행 전체는 정수 인덱스 배열 조회로 채웁니다.
+    """
+    codes, uniques = pd.factorize(e_codes)
+    unique_labels = np.full(len(uniques) + 1, None, dtype=object)  # 마지막 칸: 결측값(code -1)
+    for i, e_code in enumerate(uniques):
+        number = ecode_number(e_code)
+        if number is not None and 0 <= number < len(ECODE_TABLE):
+            unique_labels[i] = ECODE_TABLE[number]
+    return pd.Series(unique_labels[codes], index=e_codes.index, dtype=object)
+
+
+def process_frame(df: pd.DataFrame, text_columns, ecode_column='e_code') -> pd.DataFrame:
+    """text / cleaned_text / major_emotion 열을 만들고 라벨이 없거나 빈 문장인 행을 제거합니다."""
+    df['text'] = join_text_columns(df, text_columns)
+    df['cleaned_text'] = clean_text_column(df['text'])
+    df['major_emotion'] = map_ecode_column(df[ecode_column])
+
+    df = df.dropna(subset=['major_emotion', 'cleaned_text'])
+    return df[df['cleaned_text'].str.strip() != '']
@@ -0,0 +1,68 @@
+# src/corpus/readers.py
+# AI-Hub 감성대화 원본 파일 리더
+# - 라벨 JSON(training-label.json / test.json): 대화마다 E코드와 발화 내용만 꺼내는 제너레이터
+#   (jsonstream으로 대화 하나씩 읽으므로 파일 크기와 무관하게 메모리가 일정합니다)
+# - 원본 엑셀(training-origin.xlsx / validation-origin.xlsx) + 라벨 JSON 병합
+
+import pandas as pd
+from .jsonstream import iter_json_array
+from .preprocess import process_frame, clean_text_column, map_ecode_column
+
+
+def iter_label_records(label_path):
+    """
+    라벨 JSON의 대화마다 (e_code, text)를 돌려줍니다.
+    e_code는 profile.emotion.type (없으면 None), text는 talk.content의 발화를 공백으로 이은 문자열입니다.
+    """
+    for dialogue in iter_json_array(label_path):
+        yield _emotion_type(dialogue), " ".join(dialogue.get('talk', {}).get('content', {}).values())
+
+
+def _emotion_type(dialogue):
+    try:
+        return dialogue['profile']['emotion']['type']
+    except (KeyError, TypeError):
+        return None
+
+
+def iter_ecodes(label_path):
+    for e_code, _ in iter_label_records(label_path):
+        yield e_code
+
+
+def load_label_frame(label_path) -> pd.DataFrame:
+    """
+    라벨 JSON만으로 text / emotion / major_emotion / cleaned_text DataFrame을 만듭니다.
+    6-Class로 매핑되지 않는 대화는 제외합니다.
+    """
+    records = list(iter_label_records(label_path))
+    df = pd.DataFrame(records, columns=['emotion', 'text'])
+    df['major_emotion'] = map_ecode_column(df['emotion'])
+    df = df.dropna(subset=['major_emotion'])
+    df['cleaned_text'] = clean_text_column(df['text'])
+    return df
+
+
+def load_excel_frame(text_path, label_path, text_columns=(8, 9, 10, 11), header=None) -> pd.DataFrame:
+    """
+    원본 엑셀(발화 텍스트)과 라벨 JSON(E코드)을 행 순서대로 병합하고 전처리합니다.
+    두 파일의 행 수가 다르면 짧은 쪽에 맞춥니다. 파일이 없으면 빈 DataFrame을 반환합니다.
+    text_columns가 None이면 헤더에 '문장'이 들어간 열을 발화 열로 사용합니다.
+    """
+    try:
+        df_text = pd.read_excel(text_path, header=header)
+        e_codes = list(iter_ecodes(label_path))
+    except FileNotFoundError as e:
+        print(f"오류: 필수 파일을 찾을 수 없습니다: {e}")
+        return pd.DataFrame()
+
+    if len(df_text) != len(e_codes):
+        min_len = min(len(df_text), len(e_codes))
+        print(f"경고: {text_path}과 {label_path} 줄 수 불일치. {min_len}개로 축소합니다.")
+        df_text = df_text.iloc[:min_len]
+        e_codes = e_codes[:min_len]
+
+    df_combined = pd.concat([df_text, pd.DataFrame({'e_code': e_codes})], axis=1)
+    if text_columns is None:
+        text_columns = [col for col in df_text.columns if '문장' in str(col)]
+    return process_frame(df_combined, list(text_columns))
@@ -0,0 +1,22 @@
+# src/corpus/text.py
+# 학습 / 평가 / 서빙이 모두 같은 입력을 토크나이저에 넣도록 하는 단일 텍스트 정제 규칙
+
+import re
+import unicodedata
+
+# clean_text 규칙을 바꾸면 이 값을 올려야 기존 토큰 캐시(src/corpus/cache.py)가 무효화됩니다.
+CLEAN_TEXT_VERSION = 3
+
+# 줄바꿈 / 탭 등은 지우지 않고 공백으로 바꿉니다. 지우면 여러 줄 일기의 줄 끝 단어와 다음 줄 첫 단어가 붙습니다.
+# ' '는 바꿔도 그대로이므로 매치에서 빼서(\s 중 ' '가 아닌 문자) 문장마다 수십 번씩 치환하지 않게 합니다.
+WHITESPACE_PATTERN = re.compile(r'[^\S ]')
+CLEAN_TEXT_PATTERN = re.compile(r'[^가-힣a-zA-Z0-9 ]')
+
+
+def clean_text(text) -> str:
+    """
+    공백 문자(줄바꿈, 탭 등)를 ' '로 바꾼 뒤 한글 음절, 영문, 숫자, 공백을 제외한 모든 문자를 제거합니다.
+    NFD로 입력된 한글(자모 분리)이 통째로 지워지지 않도록 먼저 NFC로 합칩니다.
+    """
+    text = WHITESPACE_PATTERN.sub(' ', unicodedata.normalize('NFC', str(text)))
+    return CLEAN_TEXT_PATTERN.sub('', text)
@@ -1,27 +1,100 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
+# torch / transformers는 import 비용이 크므로 모델을 로드하거나 추론하는 함수 안에서 import 합니다.
+# (src.main을 import하기만 하는 스크립트는 이 비용을 치르지 않습니다. scripts/check_import_time.py 참고)
+import numpy as np
 import os
+import time
+import hashlib
 import logging
+import threading
+from .batcher import MicroBatcher
+from .bucketing import run_bucketed
+from .cache import TTLCache
+from .corpus.text import clean_text
+from .model_artifact import PhaseTimer, load_artifact
 
 # 모델을 저장할 전역 변수
 _classifier = None
+_batcher = None
+# 백그라운드 로더 스레드와 요청 스레드가 동시에 로딩을 시작하지 않도록 막는 잠금
+_load_lock = threading.Lock()
+# configure_worker_threads로 정한 워커별 intra-op 스레드 수 (ONNX 세션을 만들 때 사용)
+_intra_op_threads = None
+
+# 마이크로 배칭 설정 (환경 변수로 조정)
+BATCHING_ENABLED = os.environ.get('EMOTION_BATCHING', '1') != '0'
+BATCH_MAX_SIZE = int(os.environ.get('EMOTION_BATCH_MAX_SIZE', '16'))
+BATCH_MAX_WAIT_MS = float(os.environ.get('EMOTION_BATCH_MAX_WAIT_MS', '5'))
+
+# 예측 결과 캐시 설정 (같은 일기를 다시 분석할 때 모델 호출을 건너뜁니다)
+prediction_cache = TTLCache(
+    max_size=int(os.environ.get('EMOTION_CACHE_SIZE', '1024')),
+    ttl=float(os.environ.get('EMOTION_CACHE_TTL', '3600')),
+)
+
+# 의미 기반 추천용 임베딩: 분류와 같은 forward pass에서 [CLS] 벡터를 함께 보관합니다.
+# (RECOMMENDATION_EMBEDDINGS로 카탈로그 임베딩이 지정된 경우에만, torch 백엔드에서 동작)
+EMBEDDINGS_ENABLED = bool(os.environ.get('RECOMMENDATION_EMBEDDINGS'))
+embedding_cache = TTLCache(
+    max_size=int(os.environ.get('EMOTION_CACHE_SIZE', '1024')),
+    ttl=float(os.environ.get('EMOTION_CACHE_TTL', '3600')),
+)
+MAX_LENGTH = 128  # scripts/train_final.py의 max_length와 동일
+
+# 긴 일기 처리 방식
+# - truncate: 앞쪽 MAX_LENGTH 토큰만 분석 (학습 때와 동일, 기본값)
+# - window  : stride만큼 겹치는 토큰 윈도우로 나눠 한 번의 배치로 분석한 뒤 logit을 집계
+LONG_TEXT_MODE = os.environ.get('EMOTION_LONG_TEXT_MODE', 'truncate')
+WINDOW_STRIDE = int(os.environ.get('EMOTION_WINDOW_STRIDE', '32'))
+MAX_WINDOWS = int(os.environ.get('EMOTION_MAX_WINDOWS', '8'))
+WINDOW_AGGREGATION = os.environ.get('EMOTION_WINDOW_AGGREGATION', 'mean')  # mean / max / length
+
+# 추론 백엔드 선택: 'torch'(기본), 'onnx', 'onnx-int8'
+MODEL_ID = "taehoon222/korean-emotion-classifier-final"
+BACKEND = os.environ.get('EMOTION_BACKEND', 'torch').lower()
+
+# 오프라인 모드: scripts/pack_model.py로 만든 로컬 아티팩트 디렉터리를 지정하면 Hub에 접속하지 않습니다.
+# EMOTION_MODEL_VERIFY=size 이면 sha256 대신 파일 크기만 확인합니다 (시작 시간 단축).
+MODEL_DIR = os.environ.get('EMOTION_MODEL_DIR')
+MODEL_VERIFY = os.environ.get('EMOTION_MODEL_VERIFY', 'sha256').lower()
+
+# 모델 로딩 단계별 소요 시간 (로그와 함께 남깁니다)
+startup_timer = PhaseTimer()
+_weights_mmapped = False
 
 def load_emotion_classifier():
-    global _classifier
     # 모델이 이미 로드되었다면, 즉시 반환
     if _classifier is not None:
         return _classifier
+    with _load_lock:
+        return _load_emotion_classifier_locked()
+
+def _load_emotion_classifier_locked():
+    global _classifier, _weights_mmapped
+    if _classifier is not None:
+        return _classifier
+
+    if BACKEND in ('onnx', 'onnx-int8'):
+        _classifier = _load_onnx_classifier(BACKEND)
+        if _classifier is not None:
+            return _classifier
+        logging.warning("ONNX 백엔드 로딩 실패. PyTorch 백엔드로 대체합니다.")
 
-    # 모델이 로드되지 않았다면, 로드 시작
-    MODEL_ID = "taehoon222/korean-emotion-classifier-final"
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
 
-    logging.info(f"Hugging Face Hub 모델 '{MODEL_ID}'에서 모델을 불러옵니다...")
     try:
-        logging.info("토크나이저 로딩 중...")
-        tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
-        logging.info("모델 로딩 중...")
-        model = AutoModelForSequenceClassification.from_pretrained(MODEL_ID)
-        logging.info("Hugging Face Hub 모델 로딩 성공!")
+        if MODEL_DIR:
+            logging.info(f"로컬 모델 아티팩트 '{MODEL_DIR}'에서 모델을 불러옵니다 (오프라인)...")
+            tokenizer, model = load_artifact(MODEL_DIR, startup_timer, full_verify=MODEL_VERIFY != 'size')
+            _weights_mmapped = True
+        else:
+            # 모델이 로드되지 않았다면, 로드 시작
+            logging.info(f"Hugging Face Hub 모델 '{MODEL_ID}'에서 모델을 불러옵니다...")
+            with startup_timer.phase('tokenizer'):
+                tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+            with startup_timer.phase('model'):
+                model = AutoModelForSequenceClassification.from_pretrained(MODEL_ID)
+        logging.info("모델 로딩 성공!")
     except Exception as e:
         logging.error(f"모델 로딩 중 오류: {e}")
         return None
@@ -33,9 +106,218 @@ def load_emotion_classifier():
         logging.info("Device set to use cpu")
     
     # 로드된 모델을 전역 변수에 저장
-    _classifier = pipeline("text-classification", model=model, tokenizer=tokenizer, device=device)
+    with startup_timer.phase('pipeline'):
+        _classifier = pipeline("text-classification", model=model, tokenizer=tokenizer, device=device)
+    logging.info(f"모델 로딩 단계별 시간: {startup_timer.summary()}")
     return _classifier
 
+def share_model_memory():
+    """
+    gunicorn --preload 마스터에서 fork 전에 호출합니다.
+    PyTorch 가중치를 공유 메모리(/dev/shm)로 옮기고 읽기 전용(eval, requires_grad=False)으로 고정해,
+    워커 수와 관계없이 노드당 가중치 한 벌만 물리 메모리에 올라가도록 합니다.
+    (일반 힙에 두면 copy-on-write라도 GC / 할당자가 페이지를 건드리는 순간 워커마다 사본이 생깁니다.)
+    """
+    classifier = load_emotion_classifier()
+    if classifier is None or not hasattr(classifier, 'model'):
+        return
+    model = classifier.model
+    if model.device.type != 'cpu' or _weights_mmapped:
+        # 로컬 아티팩트에서 mmap으로 읽은 가중치는 이미 파일 페이지 캐시를 공유합니다.
+        return
+    model.eval().requires_grad_(False)
+    model.share_memory()
+    size_mb = sum(p.numel() * p.element_size() for p in model.parameters()) / 2**20
+    logging.info(f"모델 가중치 {size_mb:.0f}MB를 공유 메모리로 옮겼습니다 (워커 간 공유).")
+
+def configure_worker_threads(num_threads):
+    """
+    fork된 워커에서 호출합니다. 워커마다 intra-op 스레드 수를 나눠 가져 코어를 초과 구독하지 않도록 하고,
+    fork 후 사라진 ONNX Runtime 세션 스레드 풀은 새로 만듭니다.
+    """
+    global _intra_op_threads
+    import torch
+
+    num_threads = max(1, int(num_threads))
+    _intra_op_threads = num_threads
+    torch.set_num_threads(num_threads)
+    if _classifier is not None and not hasattr(_classifier, 'model'):
+        _classifier.reset_session(intra_op_threads=num_threads)
+    logging.info(f"워커 pid={os.getpid()} intra-op 스레드 수: {num_threads}")
+
+WARMUP_TEXTS = [
+    "오늘은 기분이 좋다",
+    "아침부터 일이 꼬여서 하루 종일 마음이 불안하고 답답했는데 저녁에 친구와 이야기를 나누고 나서야 조금 괜찮아졌다",
+]
+
+def warm_up():
+    """
+    요청을 받기 전에 짧은 / 긴 문장으로 forward pass를 한 번씩 돌려
+    스레드 풀, 할당자, 커널 선택 같은 지연 초기화를 첫 요청에서 치르지 않도록 합니다.
+    (캐시와 마이크로 배처를 거치지 않고 _run_batch를 직접 호출합니다.) 성공하면 True.
+    """
+    if load_emotion_classifier() is None:
+        logging.warning("모델이 없어 워밍업을 건너뜁니다.")
+        return False
+    start = time.perf_counter()
+    try:
+        for text in WARMUP_TEXTS:
+            _run_batch([text], 1)
+    except Exception as e:
+        logging.error(f"모델 워밍업 중 오류: {e}")
+        return False
+    startup_timer.phases['warm_up'] = time.perf_counter() - start
+    logging.info(f"모델 워밍업 완료 (pid={os.getpid()}). 단계별 시간: {startup_timer.summary()}")
+    return True
+
+def _load_onnx_classifier(backend):
+    """scripts/export_onnx.py로 내보낸 ONNX 그래프를 onnxruntime으로 불러옵니다."""
+    try:
+        from transformers import AutoConfig, AutoTokenizer
+        from .onnx_backend import OnnxEmotionClassifier, default_onnx_path
+
+        onnx_path = os.environ.get('EMOTION_ONNX_PATH') or default_onnx_path(backend)
+        if not os.path.exists(onnx_path):
+            logging.error(f"ONNX 모델 파일을 찾을 수 없습니다: {onnx_path}")
+            return None
+        logging.info(f"'{backend}' 백엔드로 모델을 불러옵니다: {onnx_path}")
+        source = MODEL_DIR or MODEL_ID
+        with startup_timer.phase('tokenizer'):
+            tokenizer = AutoTokenizer.from_pretrained(source, local_files_only=bool(MODEL_DIR))
+            config = AutoConfig.from_pretrained(source, local_files_only=bool(MODEL_DIR))
+        with startup_timer.phase('model'):
+            classifier = OnnxEmotionClassifier(onnx_path, tokenizer, config.id2label, intra_op_threads=_intra_op_threads)
+        logging.info(f"모델 로딩 단계별 시간: {startup_timer.summary()}")
+        return classifier
+    except Exception as e:
+        logging.error(f"ONNX 모델 로딩 중 오류: {e}")
+        return None
+
+def _run_batch(texts, top_k):
+    """여러 텍스트를 (윈도우로 나눈 뒤) 한 번의 패딩된 forward pass로 분류합니다."""
+    classifier = load_emotion_classifier()
+    tokenizer = classifier.tokenizer
+    # 학습 / 평가 스크립트와 같은 clean_text를 거친 문장을 토크나이저에 넣습니다.
+    windows, owners, lengths = _split_windows(tokenizer, [model_input_text(text) for text in texts])
+    logits, pooled = _window_logits(classifier, windows)
+
+    if hasattr(classifier, 'model'):
+        id2label = classifier.model.config.id2label
+    else:
+        id2label = classifier.id2label
+
+    owners = np.asarray(owners)
+    lengths = np.asarray(lengths, dtype=np.float32)
+    results = []
+    for i, text in enumerate(texts):
+        rows = np.flatnonzero(owners == i)
+        text_logits = _aggregate(logits[rows], lengths[rows])
+        probs = np.exp(text_logits - text_logits.max())
+        probs /= probs.sum()
+        order = np.argsort(-probs)[:top_k]
+        results.append([{'label': id2label[int(j)], 'score': float(probs[j])} for j in order])
+        if pooled is not None:
+            embedding = (pooled[rows] * lengths[rows, None]).sum(axis=0)
+            embedding_cache.set(embedding_cache_key(text), embedding / (np.linalg.norm(embedding) or 1.0))
+
+    if len(windows) > len(texts):
+        logging.info(f"윈도우 분할 추론: 텍스트 {len(texts)}개 -> 윈도우 {len(windows)}개")
+    logging.info(f"마이크로 배치 추론 완료. 배치 크기: {len(texts)}")
+    return results
+
+def _split_windows(tokenizer, texts):
+    """
+    각 텍스트를 MAX_LENGTH 토큰 윈도우로 나눕니다 (truncate 모드에서는 첫 윈도우만 사용).
+    윈도우 수가 MAX_WINDOWS를 넘으면 텍스트 전체에 고르게 퍼지도록 골라 비용 상한을 지킵니다.
+    반환값: (윈도우별 input_ids, 윈도우별 원래 텍스트 번호, 윈도우별 본문 토큰 수)
+    """
+    body_len = MAX_LENGTH - tokenizer.num_special_tokens_to_add()
+    step = max(1, body_len - WINDOW_STRIDE)
+    max_windows = max(1, MAX_WINDOWS) if LONG_TEXT_MODE == 'window' else 1
+    token_ids = tokenizer(texts, add_special_tokens=False, truncation=False)['input_ids']
+
+    windows, owners, lengths = [], [], []
+    for owner, ids in enumerate(token_ids):
+        starts = list(range(0, max(len(ids) - WINDOW_STRIDE, 1), step))
+        if len(starts) > max_windows:
+            if max_windows == 1:
+                starts = [0]
+            else:
+                starts = [starts[round(i * (len(starts) - 1) / (max_windows - 1))] for i in range(max_windows)]
+        for start in starts:
+            body = ids[start:start + body_len]
+            windows.append(tokenizer.build_inputs_with_special_tokens(body))
+            owners.append(owner)
+            lengths.append(max(1, len(body)))
+    return windows, owners, lengths
+
+def _window_logits(classifier, windows):
+    """
+    윈도우들을 길이별 버킷으로 나눠 각 버킷을 그 버킷의 최대 길이까지만 패딩해 모델에 넣고,
+    원래 순서대로 (logits, [CLS] 임베딩 또는 None)을 반환합니다.
+    """
+    if not hasattr(classifier, 'model'):
+        # ONNX 백엔드: 그래프 출력이 logits뿐이므로 임베딩은 제공하지 않습니다.
+        rows = run_bucketed(windows, classifier.logits_from_input_ids, max_batch_size=BATCH_MAX_SIZE)
+        return np.stack(rows), None
+
+    import torch
+
+    tokenizer, model = classifier.tokenizer, classifier.model
+
+    def forward(batch):
+        encodings = tokenizer.pad({'input_ids': batch}, padding=True, return_tensors="pt").to(model.device)
+        with torch.inference_mode():
+            outputs = model(**encodings, output_hidden_states=EMBEDDINGS_ENABLED)
+        logits = outputs.logits.float().cpu().numpy()
+        if not EMBEDDINGS_ENABLED:
+            return [(row, None) for row in logits]
+        pooled = torch.nn.functional.normalize(outputs.hidden_states[-1][:, 0], dim=-1).float().cpu().numpy()
+        return list(zip(logits, pooled))
+
+    rows = run_bucketed(windows, forward, max_batch_size=BATCH_MAX_SIZE)
+    logits = np.stack([row[0] for row in rows])
+    pooled = np.stack([row[1] for row in rows]) if EMBEDDINGS_ENABLED else None
+    return logits, pooled
+
+def _aggregate(window_logits, window_lengths):
+    """한 텍스트에 속한 윈도우들의 logit을 WINDOW_AGGREGATION 방식으로 합칩니다."""
+    if len(window_logits) == 1:
+        return window_logits[0]
+    if WINDOW_AGGREGATION == 'max':
+        return window_logits.max(axis=0)
+    if WINDOW_AGGREGATION == 'length':
+        return (window_logits * window_lengths[:, None]).sum(axis=0) / window_lengths.sum()
+    return window_logits.mean(axis=0)
+
+def embedding_cache_key(text):
+    return hashlib.sha256(model_input_text(text).encode('utf-8')).hexdigest()
+
+def get_text_embedding(text):
+    """predict_emotion에서 계산해 둔 일기 임베딩. 없으면 None (추가 추론은 하지 않습니다)."""
+    if not EMBEDDINGS_ENABLED or not text:
+        return None
+    return embedding_cache.get(embedding_cache_key(text))
+
+def get_batcher():
+    global _batcher
+    if _batcher is None:
+        _batcher = MicroBatcher(_run_batch, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS)
+    return _batcher
+
+def model_input_text(text):
+    """
+    모델(토크나이저)에 실제로 들어가는 문자열. 캐시 키도 이 값으로 만들어,
+    모델 입력이 같을 때만 캐시 결과를 공유합니다.
+    폼(FormData)으로 온 일기는 줄바꿈이 \r\n이므로, src/main.py의 content_hash처럼 \n으로 통일한 뒤 정제합니다.
+    (그대로 두면 clean_text가 \r\n을 공백 두 개로 바꿔 JSON으로 온 같은 일기와 캐시 키가 달라집니다.)
+    """
+    return clean_text(str(text).replace('\r\n', '\n').replace('\r', '\n'))
+
+def prediction_cache_key(text, top_k):
+    digest = hashlib.sha256(model_input_text(text).encode('utf-8')).hexdigest()
+    return f"{digest}:{top_k}"
+
 def predict_emotion(text, top_k=3):
     logging.info(f"predict_emotion 함수 호출됨. 텍스트 길이: {len(text) if text else 0}, top_k={top_k}")
     classifier = load_emotion_classifier()
@@ -46,10 +328,21 @@ def predict_emotion(text, top_k=3):
         logging.error("감정 분석 엔진이 준비되지 않았습니다.")
         return []
     
+    cache_key = prediction_cache_key(text, top_k)
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        logging.info(f"예측 캐시 적중 (Top {top_k}): {cached}")
+        return cached
+
     try:
         logging.info(f"분류기 실행 중... 텍스트: {text[:50]}...") 
-        results = classifier(text, top_k=top_k)
+        if BATCHING_ENABLED:
+            results = get_batcher().submit(text, top_k=top_k)
+        else:
+            results = _run_batch([text], top_k)[0]
         logging.info(f"분류 결과 (Top {top_k}): {results}")
+        if results:
+            prediction_cache.set(cache_key, results)
         return results
     except Exception as e:
         logging.error(f"감정 분류 중 오류 발생: {e}")
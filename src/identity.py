@@ -0,0 +1,74 @@
+# src/identity.py
+# 페이지마다 User를 조회하지 않도록 사용자 이름(username / nickname)을 캐시합니다.
+# 1) 서명된 세션 쿠키의 사본 (같은 사용자의 요청이면 어느 워커로 가도 최신, IDENTITY_CACHE_TTL 동안 유효)
+# 2) 프로세스별 TTLCache (user_id -> identity)
+# 3) 둘 다 없을 때만 DB 조회
+# 닉네임을 바꾸면 update_nickname에서 두 곳을 모두 갱신합니다. 다른 워커의 캐시는 TTL이 지나면 다시 읽습니다.
+
+import os
+import time
+from flask import session
+from . import db
+from .cache import TTLCache
+from .models import User
+
+IDENTITY_TTL = float(os.environ.get('IDENTITY_CACHE_TTL', '300'))
+SESSION_MIRROR = os.environ.get('IDENTITY_SESSION_MIRROR', '1') != '0'
+SESSION_KEY = 'identity'
+
+identity_cache = TTLCache(
+    max_size=int(os.environ.get('IDENTITY_CACHE_SIZE', '4096')),
+    ttl=IDENTITY_TTL,
+)
+
+
+def get_identity(user_id):
+    """{'username', 'nickname', 'display_name'} 또는 (사용자가 없으면) None"""
+    identity = _from_session(user_id)
+    if identity is not None:
+        return identity
+
+    identity = identity_cache.get(user_id)
+    if identity is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        identity = _identity_of(user)
+        identity_cache.set(user_id, identity)
+    _mirror_to_session(user_id, identity)
+    return identity
+
+
+def remember_identity(user):
+    """로그인 / 닉네임 변경 직후 호출합니다. 이 프로세스의 캐시와 세션 사본을 최신 값으로 바꿉니다."""
+    identity = _identity_of(user)
+    identity_cache.set(user.id, identity)
+    _mirror_to_session(user.id, identity)
+    return identity
+
+
+def invalidate_identity(user_id):
+    identity_cache.pop(user_id)
+    session.pop(SESSION_KEY, None)
+
+
+def _identity_of(user):
+    return {
+        'username': user.username,
+        'nickname': user.nickname,
+        'display_name': user.nickname if user.nickname else user.username,
+    }
+
+
+def _from_session(user_id):
+    if not SESSION_MIRROR:
+        return None
+    mirror = session.get(SESSION_KEY)
+    if not mirror or mirror.get('user_id') != user_id or time.time() - mirror.get('at', 0) > IDENTITY_TTL:
+        return None
+    return {key: mirror[key] for key in ('username', 'nickname', 'display_name')}
+
+
+def _mirror_to_session(user_id, identity):
+    if SESSION_MIRROR:
+        session[SESSION_KEY] = dict(identity, user_id=user_id, at=time.time())
@@ -0,0 +1,173 @@
+# src/jobs.py
+# 일기를 먼저 저장하고, Gemini 추천은 백그라운드 워커가 나중에 채워 넣는 작업 큐
+# 작업은 recommendation_job 테이블에 저장되므로 서버가 재시작되어도 pending 작업이 다시 처리됩니다.
+
+import os
+import datetime
+import logging
+import threading
+import time
+from . import db
+from .models import Diary, RecommendationJob
+
+MAX_ATTEMPTS = int(os.environ.get('RECOMMENDATION_JOB_MAX_ATTEMPTS', '3'))
+# 이 시간(초) 이상 running 상태인 작업은 처리 중 프로세스가 죽은 것으로 보고 다시 pending으로 돌립니다.
+STALE_AFTER = int(os.environ.get('RECOMMENDATION_JOB_STALE_AFTER', '300'))
+# 실패한 작업은 이 시간(초)이 지난 뒤에 다시 가져갑니다. 서킷이 열려 있는 동안 시도를 모두 써 버리지 않도록 합니다.
+RETRY_DELAY = float(os.environ.get('RECOMMENDATION_JOB_RETRY_DELAY', '10'))
+
+
+def enqueue_recommendation(diary):
+    """diary에 대한 추천 생성 작업을 등록합니다. 커밋은 호출한 쪽에서 합니다."""
+    job = RecommendationJob(diary=diary)
+    db.session.add(job)
+    return job
+
+
+class RecommendationWorker:
+    """
+    recommendation_job 테이블을 폴링하는 스레드 풀.
+    여러 gunicorn 워커가 동시에 폴링해도 status 조건부 UPDATE로 작업을 하나씩만 가져갑니다.
+    """
+
+    def __init__(self, app, num_threads=2, poll_interval=2.0):
+        self.app = app
+        self.num_threads = max(1, int(num_threads))
+        self.poll_interval = float(poll_interval)
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+        self._last_requeue = 0.0
+
+    def ensure_started(self):
+        # --preload로 fork된 워커 프로세스에는 마스터의 스레드가 없으므로 프로세스마다 시작합니다.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self._threads = []
+            for i in range(self.num_threads):
+                thread = threading.Thread(target=self._loop, name=f'recommendation-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            logging.info(f"추천 백그라운드 워커 {self.num_threads}개 시작 (pid={pid})")
+
+    def notify(self):
+        self._wakeup.set()
+
+    def _loop(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    processed = self.run_once()
+            except Exception as e:
+                logging.error(f"추천 작업 처리 루프 오류: {e}")
+                processed = False
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def run_once(self):
+        """pending 작업 하나를 가져와 처리합니다. 처리한 작업이 없으면 False."""
+        if time.monotonic() - self._last_requeue > STALE_AFTER / 5:
+            self._last_requeue = time.monotonic()
+            requeue_stale_jobs()
+        job = claim_next_job()
+        if job is None:
+            return False
+        process_job(job)
+        return True
+
+
+def requeue_stale_jobs():
+    threshold = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=STALE_AFTER)
+    updated = RecommendationJob.query.filter(
+        RecommendationJob.status == 'running',
+        RecommendationJob.updated_at < threshold
+    ).update({'status': 'pending'}, synchronize_session=False)
+    db.session.commit()
+    if updated:
+        logging.warning(f"중단된 추천 작업 {updated}개를 다시 대기열에 넣었습니다.")
+
+
+def claim_next_job():
+    retry_before = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=RETRY_DELAY)
+    candidates = RecommendationJob.query.with_entities(RecommendationJob.id).filter(
+        RecommendationJob.status == 'pending',
+        db.or_(RecommendationJob.attempts == 0, RecommendationJob.updated_at < retry_before)
+    ).order_by(RecommendationJob.created_at.asc()).limit(5).all()
+    for (job_id,) in candidates:
+        claimed = RecommendationJob.query.filter(
+            RecommendationJob.id == job_id,
+            RecommendationJob.status == 'pending'
+        ).update({
+            'status': 'running',
+            'attempts': RecommendationJob.attempts + 1,
+            'updated_at': db.func.now()
+        }, synchronize_session=False)
+        db.session.commit()
+        if claimed:
+            return db.session.get(RecommendationJob, job_id)
+    return None
+
+
+class RecommendationUnavailable(Exception):
+    """Gemini 추천을 받지 못했습니다 (오류, 타임아웃, 서킷 open). 작업을 다시 시도합니다."""
+
+
+def process_job(job):
+    from .main import generate_job_recommendation, fallback_recommendation
+
+    diary = db.session.get(Diary, job.diary_id)
+    if diary is None:
+        job.status = 'failed'
+        job.last_error = '일기를 찾을 수 없습니다.'
+        db.session.commit()
+        return
+
+    try:
+        logging.info(f"추천 작업 처리 중... job={job.id}, diary={diary.id}")
+        recommendation_text = generate_job_recommendation(diary.content, diary.emotion)
+        if recommendation_text is None:
+            raise RecommendationUnavailable("Gemini 추천 생성 실패")
+        diary.recommendation = recommendation_text
+        job.status = 'done'
+        job.last_error = None
+        db.session.commit()
+        logging.info(f"추천 작업 완료. job={job.id}")
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(RecommendationJob, job.id)
+        if job is None:
+            return
+        job.last_error = str(e)
+        if job.attempts >= MAX_ATTEMPTS:
+            # 더 이상 재시도하지 않으므로, 일기가 빈 추천으로 남지 않게 로컬 추천을 채워 둡니다.
+            job.status = 'failed'
+            diary = db.session.get(Diary, job.diary_id)
+            if diary is not None and diary.recommendation is None:
+                diary.recommendation = fallback_recommendation(diary.emotion, diary.content)
+        else:
+            job.status = 'pending'
+        db.session.commit()
+        logging.error(f"추천 작업 실패 (시도 {job.attempts}/{MAX_ATTEMPTS}). job={job.id}: {e}")
+
+
+def init_app(app):
+    """앱에 백그라운드 워커를 붙이고, 요청이 들어오는 프로세스에서 워커가 돌고 있도록 보장합니다."""
+    worker = RecommendationWorker(
+        app,
+        num_threads=os.environ.get('RECOMMENDATION_WORKERS', '2'),
+        poll_interval=os.environ.get('RECOMMENDATION_JOB_POLL_INTERVAL', '2'),
+    )
+    app.recommendation_worker = worker
+
+    @app.before_request
+    def _start_recommendation_worker():
+        worker.ensure_started()
+
+    return worker
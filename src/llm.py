@@ -0,0 +1,42 @@
+# src/llm.py
+# 추천 문구 생성용 LLM(Gemini) 제공자
+# google.generativeai는 import 비용이 크므로, 모듈을 불러올 때가 아니라 처음 호출할 때 import + configure 합니다.
+# (src.main을 import하기만 하는 마이그레이션 / CLI 스크립트는 이 비용을 치르지 않습니다.)
+
+import os
+import logging
+import threading
+
+
+class GeminiProvider:
+    """generate(prompt, timeout) -> str, stream(prompt, timeout) -> 텍스트 조각 제너레이터"""
+
+    def __init__(self, model_name='gemini-flash-latest', api_key_env='GEMINI_API_KEY'):
+        self.model_name = model_name
+        self.api_key_env = api_key_env
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                import google.generativeai as genai
+
+                api_key = os.environ.get(self.api_key_env)
+                if not api_key:
+                    logging.warning(f"🔥🔥🔥 {self.api_key_env} 환경 변수가 설정되지 않았습니다. 🔥🔥🔥")
+                genai.configure(api_key=api_key)
+                self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate(self, prompt, timeout):
+        return self._get_model().generate_content(prompt, request_options={'timeout': timeout}).text
+
+    def stream(self, prompt, timeout):
+        for chunk in self._get_model().generate_content(prompt, stream=True, request_options={'timeout': timeout}):
+            yield chunk.text
+
+
+gemini = GeminiProvider()
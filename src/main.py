@@ -1,27 +1,26 @@
-from flask import Blueprint, render_template, session, redirect, url_for, jsonify, request, current_app
-from sqlalchemy import extract, String # String 추가
+from flask import Blueprint, render_template, session, redirect, url_for, jsonify, request, current_app, Response, stream_with_context
 import datetime
 import time
 from . import db
-from .models import Diary, User
-from .emotion_engine import predict_emotion
+from .models import Diary, User, RecommendationJob, DiaryMonthlyCount, utc_month
+from .emotion_engine import predict_emotion, prediction_cache, get_text_embedding
 from .recommender import Recommender
+from .semantic_recommender import load_semantic_index
+from .jobs import enqueue_recommendation
+from .model_loader import model_loader
+from .llm import gemini
+from .identity import get_identity, remember_identity, identity_cache
 import logging
 import os
-import google.generativeai as genai
+import hashlib
+import json
+from itsdangerous import URLSafeSerializer, BadSignature
+from .cache import TTLCache
+from .resilience import ResilientCaller, CircuitOpenError
 
 bp = Blueprint('main', __name__)
 recommender = Recommender()
-
-# --- Gemini API 설정 ---
-try:
-    api_key = os.environ.get('GEMINI_API_KEY')
-    if not api_key:
-        logging.warning("🔥🔥🔥 GEMINI_API_KEY 환경 변수가 설정되지 않았습니다. 🔥🔥🔥")
-    genai.configure(api_key=api_key)
-except Exception as e:
-    logging.error(f"🔥🔥🔥 Gemini API 설정 중 오류 발생: {e} 🔥🔥🔥")
-
+semantic_index = load_semantic_index()
 
 # 감정별 이모지 맵
 emotion_emoji_map = {
@@ -38,15 +37,213 @@ default_recommendations = {
     '상처': '마음의 상처를 받았을 때는, 위로가 되는 음악을 듣거나, 조용한 곳에서 책을 읽으며 마음을 달래보세요.'
 }
 
-def generate_recommendation(user_diary, predicted_emotion):
+# 추천 생성 전략
+# - llm_first  : Gemini 우선, 실패 시 로컬 Recommender (기본값)
+# - local_first: 로컬 Recommender 우선, 해당 감정의 로컬 추천이 없을 때만 Gemini
+# - local_only : Gemini를 호출하지 않음 (오프라인 / 피크 시간 부하 분산)
+RECOMMENDATION_STRATEGIES = ('llm_first', 'local_first', 'local_only')
+RECOMMENDATION_STRATEGY = os.environ.get('RECOMMENDATION_STRATEGY', 'llm_first')
+if RECOMMENDATION_STRATEGY not in RECOMMENDATION_STRATEGIES:
+    logging.warning(f"알 수 없는 RECOMMENDATION_STRATEGY '{RECOMMENDATION_STRATEGY}'. llm_first로 대체합니다.")
+    RECOMMENDATION_STRATEGY = 'llm_first'
+
+def local_recommendation(predicted_emotion, user_diary=None):
+    """
+    로컬 Recommender 카탈로그로 만든 [수용]/[전환] 마크다운. 해당 감정의 추천이 없으면 None.
+    의미 기반 인덱스가 있고 predict_emotion에서 일기 임베딩을 계산해 두었다면 내용과 가까운 항목을,
+    아니면 일기 내용 해시를 seed로 한 무작위 조합을 고릅니다.
+    """
+    embedding = get_text_embedding(user_diary)
+    if semantic_index is not None and embedding is not None:
+        semantic_text = semantic_index.recommend_markdown(predicted_emotion, embedding)
+        if semantic_text is not None:
+            return semantic_text
+    if not recommender.has_emotion(predicted_emotion):
+        return None
+    seed = content_hash(user_diary) if user_diary else None
+    return recommender.recommend_markdown(predicted_emotion, seed=seed)
+
+def fallback_recommendation(predicted_emotion, user_diary=None):
+    """Gemini를 쓸 수 없을 때(오류, 타임아웃, 서킷 open) 돌려줄 추천"""
+    local_text = local_recommendation(predicted_emotion, user_diary)
+    if local_text is not None:
+        return local_text
+    return default_recommendations.get(predicted_emotion, "오늘은 좋아하는 음악을 들으며 편안한 하루를 보내는 건 어떠세요?")
+
+def _use_local_first(predicted_emotion, strategy):
+    """전략상 Gemini 호출 없이 로컬 추천을 써야 하면 True"""
+    if strategy == 'local_only':
+        return True
+    if strategy != 'local_first':
+        return False
+    return recommender.has_emotion(predicted_emotion) or (
+        semantic_index is not None and semantic_index.has_emotion(predicted_emotion))
+
+# (일기 내용 해시, 감정) -> Gemini 추천 결과. /api/predict에서 만든 추천을 /diary/save에서 재사용합니다.
+recommendation_cache = TTLCache(
+    max_size=int(os.environ.get('RECOMMENDATION_CACHE_SIZE', '512')),
+    ttl=float(os.environ.get('RECOMMENDATION_CACHE_TTL', '3600')),
+)
+
+# Gemini 호출 보호: 호출당 제한 시간, (선택) p95 기반 hedged 재요청, 연속 실패 시 서킷 브레이커
+GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', '15'))
+gemini_caller = ResilientCaller(
+    'gemini',
+    deadline=GEMINI_TIMEOUT,
+    hedge=os.environ.get('GEMINI_HEDGE', '0') == '1',
+    hedge_min_delay=float(os.environ.get('GEMINI_HEDGE_MIN_DELAY', '2')),
+    failure_threshold=int(os.environ.get('GEMINI_BREAKER_THRESHOLD', '5')),
+    recovery_timeout=float(os.environ.get('GEMINI_BREAKER_RECOVERY', '30')),
+)
+
+def content_hash(text):
+    # 브라우저는 FormData로 보내는 textarea 값의 줄바꿈을 \r\n으로 바꾸므로,
+    # JSON(/api/predict)으로 받은 \n 텍스트와 같은 해시가 나오도록 줄바꿈을 \n으로 통일합니다.
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return hashlib.sha256(text.strip().encode('utf-8')).hexdigest()
+
+def _recommendation_serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='recommendation')
+
+def make_recommendation_token(user_diary, emotion, recommendation_text):
+    """
+    추천 결과에 대한 서명 토큰. 클라이언트가 저장 시 추천 본문과 함께 돌려보내면,
+    다른 워커 프로세스로 요청이 가더라도 Gemini를 다시 호출하지 않고 재사용할 수 있습니다.
+    """
+    return _recommendation_serializer().dumps({
+        'h': content_hash(user_diary),
+        'e': emotion,
+        'r': content_hash(recommendation_text),
+    })
+
+def verify_recommendation_token(token, user_diary, emotion, recommendation_text):
+    if not token or not recommendation_text:
+        return False
+    try:
+        payload = _recommendation_serializer().loads(token)
+    except BadSignature:
+        return False
+    return (payload.get('h') == content_hash(user_diary)
+            and payload.get('e') == emotion
+            and payload.get('r') == content_hash(recommendation_text))
+
+def generate_recommendation(user_diary, predicted_emotion, strategy=None):
+    """
+    주어진 일기 내용과 감정을 바탕으로 문화생활 추천을 생성합니다.
+    strategy(기본값: RECOMMENDATION_STRATEGY)에 따라 Gemini 또는 로컬 Recommender를 사용하며,
+    항상 [수용]/[전환] 형식의 문자열을 반환합니다 (None을 반환하지 않습니다).
+    """
+    strategy = strategy or RECOMMENDATION_STRATEGY
+    if _use_local_first(predicted_emotion, strategy):
+        logging.info(f"추천 전략 '{strategy}': 로컬 Recommender를 사용합니다.")
+        return fallback_recommendation(predicted_emotion, user_diary)
+
+    recommendation_text = generate_llm_recommendation(user_diary, predicted_emotion)
+    if recommendation_text is None:
+        logging.info("Gemini 추천 실패. 로컬 Recommender로 대체합니다.")
+        return fallback_recommendation(predicted_emotion, user_diary)
+    return recommendation_text
+
+
+def generate_llm_recommendation(user_diary, predicted_emotion):
     """
-    주어진 일기 내용과 감정을 바탕으로 Gemini API를 사용하여 문화생활 추천을 생성합니다.
+    Gemini API로 추천을 생성합니다. 실패(오류, 타임아웃, 서킷 open)하면 None을 반환합니다.
+    같은 (일기, 감정)에 대해 이미 생성한 추천이 있으면 캐시에서 바로 반환합니다.
     """
+    cache_key = (content_hash(user_diary), predicted_emotion)
+    cached = recommendation_cache.get(cache_key)
+    if cached is not None:
+        logging.info("추천 캐시 적중. Gemini API 호출을 건너뜁니다.")
+        return cached
+
     start_time = time.time()
     logging.info("Gemini API 호출 시작...")
     try:
-        model = genai.GenerativeModel('gemini-flash-latest')
-        prompt = f"""
+        prompt = build_recommendation_prompt(user_diary, predicted_emotion)
+        text = gemini_caller.call(lambda: gemini.generate(prompt, GEMINI_TIMEOUT))
+        end_time = time.time()
+        logging.info(f"Gemini API 호출 완료. 소요 시간: {end_time - start_time:.2f}초")
+        recommendation_cache.set(cache_key, text)
+        return text
+    except CircuitOpenError:
+        logging.warning("Gemini 서킷이 열려 있어 호출을 건너뜁니다.")
+        return None
+    except Exception as e:
+        logging.error(f"🔥🔥🔥 Gemini API 호출 중 오류 발생: {e} 🔥🔥🔥")
+        return None
+
+
+def generate_job_recommendation(user_diary, predicted_emotion, strategy=None):
+    """
+    백그라운드 작업(src/jobs.py)용. 로컬 전략이면 로컬 추천을, 아니면 Gemini 추천을 반환합니다.
+    generate_recommendation과 달리 Gemini가 실패하면 대체 추천 대신 None을 반환하므로 작업이 재시도됩니다.
+    """
+    strategy = strategy or RECOMMENDATION_STRATEGY
+    if _use_local_first(predicted_emotion, strategy):
+        return fallback_recommendation(predicted_emotion, user_diary)
+    return generate_llm_recommendation(user_diary, predicted_emotion)
+
+
+class RecommendationStreamInterrupted(Exception):
+    """Gemini 스트리밍이 일부 조각을 보낸 뒤 실패했습니다 (이미 보낸 텍스트는 잘린 추천입니다)."""
+
+
+def stream_recommendation(user_diary, predicted_emotion, strategy=None):
+    """
+    generate_recommendation의 스트리밍 버전. Gemini 응답 조각(chunk)을 생성되는 대로 yield 합니다.
+    로컬 전략이거나 캐시에 있으면 전체 텍스트를 한 번에, 첫 조각 전에 오류가 나면 대체 추천을 yield 합니다.
+    조각을 보낸 뒤에 실패하면 RecommendationStreamInterrupted를 던집니다.
+    """
+    strategy = strategy or RECOMMENDATION_STRATEGY
+    if _use_local_first(predicted_emotion, strategy):
+        yield fallback_recommendation(predicted_emotion, user_diary)
+        return
+
+    cache_key = (content_hash(user_diary), predicted_emotion)
+    cached = recommendation_cache.get(cache_key)
+    if cached is not None:
+        logging.info("추천 캐시 적중. Gemini API 호출을 건너뜁니다.")
+        yield cached
+        return
+
+    if not gemini_caller.breaker.allow_request():
+        logging.warning("Gemini 서킷이 열려 있어 로컬 추천으로 대체합니다.")
+        yield fallback_recommendation(predicted_emotion, user_diary)
+        return
+
+    start_time = time.time()
+    logging.info("Gemini API 스트리밍 호출 시작...")
+    parts = []
+    recorded = False
+    try:
+        prompt = build_recommendation_prompt(user_diary, predicted_emotion)
+        for text in gemini.stream(prompt, GEMINI_TIMEOUT):
+            if text:
+                parts.append(text)
+                yield text
+        elapsed = time.time() - start_time
+        logging.info(f"Gemini API 스트리밍 완료. 소요 시간: {elapsed:.2f}초")
+        gemini_caller.breaker.record_success()
+        recorded = True
+        gemini_caller.latency.record(elapsed)
+        recommendation_cache.set(cache_key, ''.join(parts))
+    except Exception as e:
+        gemini_caller.breaker.record_failure()
+        recorded = True
+        logging.error(f"🔥🔥🔥 Gemini API 스트리밍 중 오류 발생: {e} 🔥🔥🔥")
+        if not parts:
+            yield fallback_recommendation(predicted_emotion, user_diary)
+        else:
+            raise RecommendationStreamInterrupted(str(e)) from e
+    finally:
+        # 클라이언트가 연결을 끊으면 GeneratorExit(Exception이 아님)로 여기까지 옵니다.
+        # Gemini의 성공 / 실패로 셀 수 없으므로 기록하지 않고, half-open 시험 호출 자리만 반납합니다.
+        if not recorded:
+            gemini_caller.breaker.release_probe()
+
+
+def build_recommendation_prompt(user_diary, predicted_emotion):
+    return f"""
         사용자의 일기 내용과 감정을 바탕으로 문화생활을 추천해줘.
         사용자는 현재 '{predicted_emotion}' 감정을 느끼고 있어.
 
@@ -65,14 +262,34 @@ def generate_recommendation(user_diary, predicted_emotion):
         ## [전환]
         현재 감정에서 벗어나 새로운 활력을 얻고 싶을 때.
         """
-        
-        response = model.generate_content(prompt)
-        end_time = time.time()
-        logging.info(f"Gemini API 호출 완료. 소요 시간: {end_time - start_time:.2f}초")
-        return response.text
-    except Exception as e:
-        logging.error(f"🔥🔥🔥 Gemini API 호출 중 오류 발생: {e} 🔥🔥🔥")
-        return default_recommendations.get(predicted_emotion, "오늘은 좋아하는 음악을 들으며 편안한 하루를 보내는 건 어떠세요?")
+
+
+def sse_event(event, data):
+    """Server-Sent Events 형식의 메시지 한 개를 만듭니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def build_emotion_candidates(emotion_results):
+    candidates = []
+    for result in emotion_results:
+        emotion_label = result['label']
+        candidates.append({
+            'emotion': emotion_label,
+            'score': result['score'],
+            'emoji': emotion_emoji_map.get(emotion_label, '🤔')
+        })
+    return candidates
+
+
+def model_unavailable_response():
+    """모델이 아직 준비되지 않았을 때의 503 응답 (클라이언트는 Retry-After 초 뒤에 다시 시도합니다)."""
+    model_loader.start()
+    retry_after = model_loader.retry_after()
+    return jsonify({
+        "error": "감정 분석 모델을 준비하는 중입니다. 잠시 후 다시 시도해주세요.",
+        "model_status": model_loader.state,
+        "retry_after": retry_after
+    }), 503, {'Retry-After': str(retry_after)}
 
 
 @bp.route("/")
@@ -83,9 +300,9 @@ def home():
     display_name = None
     if logged_in:
         user_id = session.get('user_id')
-        user = User.query.get(user_id)
-        if user:
-            display_name = user.nickname if user.nickname else user.username
+        identity = get_identity(user_id)
+        if identity:
+            display_name = identity['display_name']
         else:
             display_name = session.get('username') # Fallback if user not found
     logging.info(f"메인 페이지 접속: 로그인 상태: {logged_in}, 사용자: {display_name}")
@@ -100,6 +317,8 @@ def api_predict():
     user_diary = request.json.get("diary")
     if not user_diary:
         return jsonify({"error": "일기 내용이 없습니다."}), 400
+    if not model_loader.ready:
+        return model_unavailable_response()
 
     try:
         # 1. Predict top 3 emotions
@@ -115,14 +334,7 @@ def api_predict():
         top_emotion_score = top_emotion_data['score']
 
         # 3. Create candidates list
-        candidates = []
-        for result in emotion_results:
-            emotion_label = result['label']
-            candidates.append({
-                'emotion': emotion_label,
-                'score': result['score'],
-                'emoji': emotion_emoji_map.get(emotion_label, '🤔')
-            })
+        candidates = build_emotion_candidates(emotion_results)
 
         # 4. Generate recommendation ONLY for the top emotion initially
         recommendation_text = generate_recommendation(user_diary, top_emotion_label)
@@ -133,7 +345,8 @@ def api_predict():
             "top_emotion": top_emotion_label,
             "top_score": top_emotion_score,
             "candidates": candidates,
-            "recommendation": recommendation_text 
+            "recommendation": recommendation_text,
+            "recommendation_token": make_recommendation_token(user_diary, top_emotion_label, recommendation_text)
         })
     except Exception as e:
         logging.error(f"[/api/predict] 처리 중 오류 발생: {e}")
@@ -141,6 +354,60 @@ def api_predict():
         return jsonify({"error": "처리 중 오류가 발생했습니다."}), 500
 
 
+@bp.route("/api/predict/stream", methods=["POST"])
+def api_predict_stream():
+    """
+    /api/predict의 스트리밍 버전 (Server-Sent Events).
+    감정 분석 결과를 'emotion' 이벤트로 즉시 보내고, Gemini 추천은 'chunk' 이벤트로 나눠 보낸 뒤
+    'done' 이벤트에 전체 추천과 저장용 토큰을 담아 마무리합니다.
+    """
+    if 'user_id' not in session:
+        return jsonify({"error": "로그인이 필요합니다."}), 401
+
+    user_diary = request.json.get("diary")
+    if not user_diary:
+        return jsonify({"error": "일기 내용이 없습니다."}), 400
+    if not model_loader.ready:
+        return model_unavailable_response()
+
+    emotion_results = predict_emotion(user_diary, top_k=3)
+    if not emotion_results:
+        logging.error("[/api/predict/stream] 감정 분석 결과가 없습니다.")
+        return jsonify({"error": "감정을 분석할 수 없습니다."}), 500
+
+    top_emotion_label = emotion_results[0]['label']
+
+    def generate():
+        yield sse_event('emotion', {
+            "top_emotion": top_emotion_label,
+            "top_score": emotion_results[0]['score'],
+            "candidates": build_emotion_candidates(emotion_results)
+        })
+        parts = []
+        try:
+            for chunk in stream_recommendation(user_diary, top_emotion_label):
+                parts.append(chunk)
+                yield sse_event('chunk', {"text": chunk})
+        except RecommendationStreamInterrupted:
+            # 잘린 추천에는 토큰을 주지 않습니다. 대신 로컬 추천을 보여주고, 저장하면 백그라운드 작업이 다시 생성합니다.
+            yield sse_event('error', {
+                "error": "추천 생성이 중간에 끊겼습니다.",
+                "recommendation": fallback_recommendation(top_emotion_label, user_diary)
+            })
+            return
+        recommendation_text = ''.join(parts)
+        yield sse_event('done', {
+            "recommendation": recommendation_text,
+            "recommendation_token": make_recommendation_token(user_diary, top_emotion_label, recommendation_text)
+        })
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @bp.route("/api/recommend", methods=["POST"])
 def api_recommend():
     logging.info("[/api/recommend] 요청 수신됨.")
@@ -156,11 +423,39 @@ def api_recommend():
     response_data = {
         "emotion": predicted_emotion,
         "emoji": emotion_emoji_map.get(predicted_emotion, '🤔'),
-        "recommendation": recommendation_text
+        "recommendation": recommendation_text,
+        "recommendation_token": make_recommendation_token(user_diary, predicted_emotion, recommendation_text)
     }
     return jsonify(response_data)
 
 
+@bp.route('/api/ready')
+def api_ready():
+    # 모델 준비 상태 (워커 프로세스별). 준비되면 200, 로딩 중 / 실패면 503
+    status = model_loader.status()
+    return jsonify(status), 200 if model_loader.ready else 503
+
+
+# /api/cache/stats를 볼 수 있는 사용자 (쉼표로 구분한 username 목록, 비어 있으면 아무도 볼 수 없음)
+ADMIN_USERNAMES = {name.strip() for name in os.environ.get('ADMIN_USERNAMES', '').split(',') if name.strip()}
+
+
+@bp.route('/api/cache/stats')
+def api_cache_stats():
+    # 캐시 크기 조정을 위한 hit/miss/eviction 카운터 (워커 프로세스별 값). 관리자만 볼 수 있습니다.
+    if 'user_id' not in session:
+        return jsonify({"error": "로그인이 필요합니다."}), 401
+    if session.get('username') not in ADMIN_USERNAMES:
+        return jsonify({"error": "권한이 없습니다."}), 403
+    return jsonify({
+        "pid": os.getpid(),
+        "prediction": prediction_cache.stats(),
+        "recommendation": recommendation_cache.stats(),
+        "identity": identity_cache.stats(),
+        "gemini": gemini_caller.stats()
+    })
+
+
 @bp.route('/api/diaries')
 def api_diaries():
     if 'user_id' not in session:
@@ -216,6 +511,14 @@ def api_diaries():
     return jsonify(diaries_data)
 
 
+def year_range(year):
+    """
+    [year-01-01, (year+1)-01-01) UTC 반열림 구간.
+    Diary.created_at(timestamp without time zone, UTC 시각)과 비교하므로 타임존 정보 없이 만듭니다.
+    """
+    return datetime.datetime(year, 1, 1), datetime.datetime(year + 1, 1, 1)
+
+
 @bp.route('/api/diaries/counts')
 def api_diaries_counts():
     if 'user_id' not in session:
@@ -227,30 +530,47 @@ def api_diaries_counts():
     if not year:
         year = datetime.date.today().year
 
-    # PostgreSQL은 extract를 지원하므로 원래 로직으로 복원
-    counts = db.session.query(
-        extract('month', Diary.created_at).cast(String), # 월을 문자열로 캐스팅
-        db.func.count(Diary.id)
-    ).filter(
+    # created_at에 함수를 씌우지 않은 반열림 구간 조건이라 (user_id, created_at) 인덱스 범위 스캔으로 처리됩니다.
+    # 월별 집계는 DB에서 하고(GROUP BY), 월은 UTC 기준으로 묶습니다 (diary_monthly_count와 같은 기준).
+    start, end = year_range(year)
+    month = utc_month(Diary.created_at)
+    rows = db.session.query(month, db.func.count()).filter(
         Diary.user_id == user_id,
-        extract('year', Diary.created_at) == year
-    ).group_by(
-        extract('month', Diary.created_at)
-    ).all()
+        Diary.created_at >= start,
+        Diary.created_at < end
+    ).group_by(month).all()
 
-    counts_dict = {month: count for month, count in counts}
-    
+    counts_dict = {str(month): count for month, count in rows}
     return jsonify(counts_dict)
 
 
+@bp.route('/api/diaries/summary')
+def api_diaries_summary():
+    # diary_monthly_count에서 한 해의 월별 일기 수를 (user_id, year) 기본 키 조회 한 번으로 읽습니다.
+    if 'user_id' not in session:
+        return jsonify({"error": "로그인이 필요합니다."}), 401
+
+    year = request.args.get('year', type=int) or datetime.date.today().year
+    rows = DiaryMonthlyCount.query.filter_by(user_id=session['user_id'], year=year).all()
+
+    months = {str(month): 0 for month in range(1, 13)}
+    for row in rows:
+        months[str(row.month)] = row.count
+    return jsonify({
+        "year": year,
+        "total": sum(months.values()),
+        "months": months
+    })
+
+
 @bp.route('/my_diary')
 def my_diary():
     if 'user_id' not in session:
         return redirect(url_for('auth.login'))
     
     user_id = session.get('user_id')
-    user = User.query.get(user_id)
-    display_name = user.nickname if user.nickname else user.username
+    identity = get_identity(user_id)
+    display_name = identity['display_name'] if identity else session.get('username')
 
     return render_template('diary.html', display_name=display_name)
 
@@ -261,12 +581,14 @@ def mypage():
         return redirect(url_for('auth.login'))
     
     user_id = session['user_id']
-    user = User.query.get(user_id)
+    identity = get_identity(user_id)
+    if identity is None:
+        return redirect(url_for('auth.logout'))
     
     user_info = {
-        'username': user.username,
-        'nickname': user.nickname,
-        'display_name': user.nickname if user.nickname else user.username
+        'username': identity['username'],
+        'nickname': identity['nickname'],
+        'display_name': identity['display_name']
     }
     
     return render_template('page.html', user_info=user_info)
@@ -289,8 +611,8 @@ def update_nickname():
     
     db.session.commit()
     
-    # 세션 정보 업데이트 (선택 사항, 닉네임을 세션에 저장할 경우)
-    # session['nickname'] = user.nickname
+    # 이 프로세스의 사용자 이름 캐시와 세션 사본을 새 닉네임으로 갱신합니다.
+    remember_identity(user)
 
     return redirect(url_for('main.mypage'))
 
@@ -309,25 +631,16 @@ def diary_save():
         return jsonify({"error": "일기 내용이나 감정이 없습니다."}), 400
 
     try:
-        # 추천 생성
-        recommendation_text = generate_recommendation(diary_content, predicted_emotion)
+        # /api/predict 또는 /api/recommend에서 이미 받은 추천이면 그대로 재사용하고,
+        # 사용자가 감정을 바꿔 아직 추천이 없는 경우에만 백그라운드 작업으로 새로 생성합니다.
+        recommendation_text = request.form.get('recommendation')
+        recommendation_token = request.form.get('recommendation_token')
+        if verify_recommendation_token(recommendation_token, diary_content, predicted_emotion, recommendation_text):
+            logging.info("[/diary/save] 예측 단계에서 생성된 추천을 재사용합니다.")
+        else:
+            recommendation_text = None
 
-        # Gemini API 실패 시 Recommender 클래스로 대체
-        if recommendation_text is None:
-            logging.info("Gemini 추천 실패. Recommender 클래스로 대체합니다.")
-            su_yoong_recs = recommender.recommend(predicted_emotion, '수용')
-            jeon_hwan_recs = recommender.recommend(predicted_emotion, '전환')
-            
-            # diary_logic.js가 파싱할 수 있는 형식으로 만듭니다.
-            recommendation_text = f"## [수용]\n"
-            for rec in su_yoong_recs:
-                recommendation_text += f"* {rec}\n"
-            
-            recommendation_text += f"\n## [전환]\n"
-            for rec in jeon_hwan_recs:
-                recommendation_text += f"* {rec}\n"
-
-        # 일기 저장
+        # 일기 저장 (추천이 없으면 recommendation은 비워두고 작업 큐에 등록)
         new_diary = Diary(
             content=diary_content,
             emotion=predicted_emotion,
@@ -335,11 +648,20 @@ def diary_save():
             user_id=user_id
         )
         db.session.add(new_diary)
+        job = None
+        if recommendation_text is None:
+            job = enqueue_recommendation(new_diary)
         db.session.commit()
 
+        if job is not None:
+            current_app.recommendation_worker.notify()
+            logging.info(f"[/diary/save] 추천 생성 작업 등록: job={job.id}")
+
         return jsonify({
             "success": "일기가 성공적으로 저장되었습니다.",
-            "recommendation": recommendation_text # 클라이언트에서 바로 사용할 수 있도록 추천 내용 반환
+            "diary_id": new_diary.id,
+            "recommendation": recommendation_text, # 클라이언트에서 바로 사용할 수 있도록 추천 내용 반환
+            "job_id": job.id if job is not None else None
         }), 200
 
     except Exception as e:
@@ -347,6 +669,23 @@ def diary_save():
         logging.error(f"일기 저장 중 오류 발생: {e}")
         return jsonify({"error": "일기 저장 중 오류가 발생했습니다."}), 500
 
+@bp.route('/api/jobs/<string:job_id>')
+def api_job_status(job_id):
+    if 'user_id' not in session:
+        return jsonify({"error": "로그인이 필요합니다."}), 401
+
+    job = db.session.get(RecommendationJob, job_id)
+    if not job or job.diary.user_id != session['user_id']:
+        return jsonify({"error": "작업을 찾을 수 없습니다."}), 404
+
+    return jsonify({
+        "job_id": job.id,
+        "diary_id": job.diary_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "recommendation": job.diary.recommendation if job.status in ('done', 'failed') else None
+    })
+
 @bp.route('/diary/delete/<string:diary_id>', methods=['DELETE'])
 def delete_diary(diary_id):
     if 'user_id' not in session:
@@ -0,0 +1,116 @@
+# src/model_artifact.py
+# 오프라인 모델 아티팩트: 특정 revision으로 고정한 모델을 로컬 디렉터리 하나로 묶고,
+# 체크섬을 확인한 뒤 네트워크 없이 가중치를 mmap으로 읽습니다 (EMOTION_MODEL_DIR).
+#
+# 디렉터리 구조 (scripts/pack_model.py가 생성):
+#   config.json, tokenizer 파일 : save_pretrained 결과 (가중치 제외)
+#   weights.pt                  : state_dict + 비영속 버퍼 (torch.save, torch.load(mmap=True)로 읽음)
+#   manifest.json               : 원본 모델 id / revision, 파일별 크기와 sha256
+
+import os
+import json
+import time
+from contextlib import contextmanager
+
+MANIFEST_NAME = 'manifest.json'
+WEIGHTS_NAME = 'weights.pt'
+
+
+class PhaseTimer:
+    """시작 단계별 소요 시간을 기록합니다. phases: {단계 이름: 초}"""
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def summary(self):
+        parts = [f"{name} {seconds:.2f}s" for name, seconds in self.phases.items()]
+        return " | ".join(parts) + f" (합계 {sum(self.phases.values()):.2f}s)"
+
+
+def write_manifest(artifact_dir, source, revision):
+    from .corpus.cache import file_digest
+
+    files = {}
+    for name in sorted(os.listdir(artifact_dir)):
+        path = os.path.join(artifact_dir, name)
+        if name == MANIFEST_NAME or not os.path.isfile(path):
+            continue
+        files[name] = {'size': os.path.getsize(path), 'sha256': file_digest(path)}
+    manifest = {'source': source, 'revision': revision, 'files': files}
+    with open(os.path.join(artifact_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def verify_artifact(artifact_dir, full=True):
+    """
+    manifest.json에 적힌 파일이 모두 있고 크기(full=True면 sha256까지)가 일치하는지 확인합니다.
+    다르면 ValueError를 던집니다.
+    """
+    from .corpus.cache import file_digest
+
+    manifest_path = os.path.join(artifact_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        raise ValueError(f"{manifest_path}가 없습니다. scripts/pack_model.py로 만든 디렉터리인지 확인하세요.")
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    problems = []
+    for name, expected in manifest['files'].items():
+        path = os.path.join(artifact_dir, name)
+        if not os.path.exists(path):
+            problems.append(f"{name}: 파일 없음")
+        elif os.path.getsize(path) != expected['size']:
+            problems.append(f"{name}: 크기 불일치")
+        elif full and file_digest(path) != expected['sha256']:
+            problems.append(f"{name}: sha256 불일치")
+    if problems:
+        raise ValueError(f"모델 아티팩트 검증 실패 ({artifact_dir}): " + ", ".join(problems))
+    return manifest
+
+
+def save_weights(model, artifact_dir):
+    """state_dict와 state_dict에 들어가지 않는 버퍼(position_ids 등)를 weights.pt 하나로 저장합니다."""
+    import torch
+
+    state_dict = model.state_dict()
+    buffers = {name: buf for name, buf in model.named_buffers() if name not in state_dict}
+    torch.save({'state_dict': state_dict, 'buffers': buffers}, os.path.join(artifact_dir, WEIGHTS_NAME))
+
+
+def load_artifact(artifact_dir, timer=None, full_verify=True):
+    """
+    검증된 아티팩트에서 (tokenizer, model)을 로드합니다. Hub에는 접속하지 않습니다.
+    모델 골격은 meta 디바이스에 만들고(가중치 초기화 없음), 가중치는 weights.pt를 mmap한 텐서를 그대로 씁니다.
+    가중치 페이지는 파일의 페이지 캐시이므로 같은 노드의 모든 프로세스가 한 벌을 공유합니다.
+    """
+    import torch
+    from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
+
+    timer = timer or PhaseTimer()
+    with timer.phase('verify'):
+        verify_artifact(artifact_dir, full=full_verify)
+    with timer.phase('tokenizer'):
+        tokenizer = AutoTokenizer.from_pretrained(artifact_dir, local_files_only=True)
+    with timer.phase('model'):
+        config = AutoConfig.from_pretrained(artifact_dir, local_files_only=True)
+        with torch.device('meta'):
+            model = AutoModelForSequenceClassification.from_config(config)
+        weights = torch.load(os.path.join(artifact_dir, WEIGHTS_NAME), map_location='cpu', mmap=True, weights_only=True)
+        model.load_state_dict(weights['state_dict'], assign=True)
+        for name, buf in weights['buffers'].items():
+            module_name, _, buffer_name = name.rpartition('.')
+            setattr(model.get_submodule(module_name), buffer_name, buf)
+        missing = [name for name, t in list(model.named_parameters()) + list(model.named_buffers()) if t.is_meta]
+        if missing:
+            raise ValueError(f"weights.pt에 없는 텐서가 있습니다: {missing[:5]}")
+        model.eval().requires_grad_(False)
+    return tokenizer, model
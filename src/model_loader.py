@@ -0,0 +1,103 @@
+# src/model_loader.py
+# 감정 분류 모델을 백그라운드 스레드에서 로드하고 준비 상태(readiness)를 알려주는 로더
+# create_app은 로딩을 시작만 하고 바로 반환하므로, 로그인 / 달력 / 일기 API는 모델 로딩을 기다리지 않습니다.
+# 모델이 필요한 /api/predict 계열은 준비될 때까지 503 + Retry-After로 응답합니다 (main.model_unavailable_response).
+
+import os
+import logging
+import threading
+import time
+
+IDLE, LOADING, READY, FAILED = 'idle', 'loading', 'ready', 'failed'
+# 로딩에 실패한 뒤 이 시간(초)이 지나야 다음 start() 호출에서 다시 시도합니다.
+RETRY_INTERVAL = int(os.environ.get('EMOTION_MODEL_RETRY_INTERVAL', '60'))
+
+
+class ModelLoader:
+    """
+    load_emotion_classifier() + warm_up()을 데몬 스레드에서 한 번 실행합니다.
+    상태: idle -> loading -> ready / failed
+    """
+
+    def __init__(self):
+        self.state = IDLE
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def ready(self):
+        return self.state == READY
+
+    def _running(self, pid):
+        if self.state == READY or self._pid != pid:
+            return self.state == READY
+        if self.state == LOADING:
+            return True
+        return self.state == FAILED and time.time() - self.finished_at < RETRY_INTERVAL
+
+    def start(self):
+        """
+        로딩을 시작하고 바로 반환합니다. 이미 로딩 중이거나 준비되었으면 아무것도 하지 않고,
+        실패했다면 RETRY_INTERVAL이 지난 뒤에 다시 시도합니다.
+        로딩 도중 fork된 프로세스에는 로더 스레드가 없으므로, 준비되지 않았다면 프로세스마다 다시 시작합니다.
+        """
+        pid = os.getpid()
+        if self._running(pid):
+            return
+        with self._lock:
+            if self._running(pid):
+                return
+            self._pid = pid
+            self.state = LOADING
+            self.error = None
+            self.started_at = time.time()
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name='emotion-model-loader', daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout=None):
+        """로딩이 끝날 때까지(ready / failed) 기다립니다. 준비되었으면 True."""
+        self._ready.wait(timeout)
+        return self.ready
+
+    def _run(self):
+        from .emotion_engine import load_emotion_classifier, warm_up
+
+        try:
+            if load_emotion_classifier() is None:
+                raise RuntimeError("모델 로딩 실패 (자세한 내용은 로그 참고)")
+            warm_up()
+            self.state = READY
+            logging.info(f"감정 분석 모델 준비 완료 (pid={os.getpid()}, {time.time() - self.started_at:.2f}s)")
+        except Exception as e:
+            self.state = FAILED
+            self.error = str(e)
+            logging.error(f"감정 분석 모델 백그라운드 로딩 실패: {e}")
+        finally:
+            self.finished_at = time.time()
+            self._ready.set()
+
+    def retry_after(self):
+        """503 응답의 Retry-After(초). 로딩 중이면 짧게, 실패했으면 길게."""
+        return 5 if self.state in (IDLE, LOADING) else RETRY_INTERVAL
+
+    def status(self):
+        from .emotion_engine import BACKEND, MODEL_DIR, startup_timer
+
+        return {
+            'status': self.state,
+            'pid': os.getpid(),
+            'backend': BACKEND,
+            'source': MODEL_DIR or 'hub',
+            'error': self.error,
+            'elapsed_sec': round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+            'phases': {name: round(seconds, 3) for name, seconds in startup_timer.phases.items()},
+        }
+
+
+model_loader = ModelLoader()
@@ -1,6 +1,7 @@
 from . import db
 from werkzeug.security import generate_password_hash, check_password_hash
 import uuid
+from sqlalchemy import event
 from sqlalchemy.sql import func
 import datetime
 from datetime import timezone, timedelta
@@ -26,6 +27,106 @@ class Diary(db.Model):
     content = db.Column(db.Text, nullable=False)
     emotion = db.Column(db.String(20), nullable=False)
     recommendation = db.Column(db.Text, nullable=True)
+    # 운영 DB(supabase/migrations/20250918153724_remote_schema.sql)와 같은 timestamp without time zone. UTC 시각을 저장합니다.
+    created_at = db.Column(db.DateTime(), default=func.now())
+
+    recommendation_jobs = db.relationship('RecommendationJob', backref='diary', lazy=True, cascade="all, delete-orphan")
+
+    __table_args__ = (db.Index('idx_diary_user_id_created_at', "user_id", "created_at"),)
+
+class RecommendationJob(db.Model):
+    """Diary.recommendation을 백그라운드에서 채우기 위한 작업 큐 (재시작 후에도 유지됩니다)"""
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    diary_id = db.Column(db.String(36), db.ForeignKey('diary.id', ondelete='CASCADE'), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default='pending')  # pending / running / done / failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime(timezone=True), default=func.now())
+    updated_at = db.Column(db.DateTime(timezone=True), default=func.now(), onupdate=func.now())
+
+    __table_args__ = (db.Index('idx_recommendation_job_status_created_at', "status", "created_at"),)
+
+class DiaryMonthlyCount(db.Model):
+    """
+    사용자별 월간 일기 수 (UTC 기준 연/월). Diary를 추가 / 삭제할 때 같은 flush 안에서 갱신됩니다.
+    /api/diaries/summary는 이 테이블의 (user_id, year) 기본 키 앞부분만으로 한 해를 읽습니다.
+    갱신은 ORM의 before_insert / before_delete 이벤트에서만 일어납니다. Diary.query.filter(...).delete() 같은
+    대량 삭제나 SQL을 직접 실행한 변경은 반영되지 않으므로, 그 뒤에는 scripts/rebuild_monthly_counts.py를 실행하세요.
+    """
+    __tablename__ = 'diary_monthly_count'
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+def utc_year_month(created_at):
+    """created_at의 UTC 기준 (연, 월). 타임존 정보가 없으면 UTC로 간주합니다 (SQLite)."""
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.year, created_at.month
+
+
+def utc_month(column, dialect_name=None):
+    """
+    utc_year_month와 같은 기준의 월(1~12)을 DB에서 계산하는 SQL 식.
+    timestamp without time zone 열(UTC 시각)은 그대로 추출합니다. 여기에 timezone('UTC', ...)을 씌우면
+    timestamptz가 되어 EXTRACT가 오히려 세션 시간대를 따릅니다.
+    PostgreSQL의 timestamptz 열만 timezone('UTC', ...)으로 UTC 시각(timestamp)으로 바꾼 뒤 추출합니다.
+    """
+    dialect_name = dialect_name or db.session.get_bind().dialect.name
+    if dialect_name == 'postgresql' and getattr(column.type, 'timezone', False):
+        column = func.timezone('UTC', column)
+    return db.cast(func.extract('month', column), db.Integer)
+
+
+def _bump_monthly_count(connection, user_id, created_at, delta):
+    year, month = utc_year_month(created_at)
+    table = DiaryMonthlyCount.__table__
+    if connection.dialect.name in ('postgresql', 'sqlite'):
+        if connection.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(user_id=user_id, year=year, month=month, count=max(delta, 0))
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=['user_id', 'year', 'month'],
+            set_={'count': table.c.count + delta}
+        ))
+        return
+    updated = connection.execute(table.update().where(
+        table.c.user_id == user_id, table.c.year == year, table.c.month == month
+    ).values(count=table.c.count + delta)).rowcount
+    if not updated and delta > 0:
+        connection.execute(table.insert().values(user_id=user_id, year=year, month=month, count=delta))
+
+
+@event.listens_for(Diary, 'before_insert')
+def _diary_before_insert(mapper, connection, target):
+    # 집계할 월을 알아야 하므로 created_at을 DB 기본값(now()) 대신 여기서 채웁니다.
+    # timestamp without time zone 열이므로 UTC 시각을 타임존 정보 없이 넣습니다
+    # (타임존이 붙은 값은 timestamptz로 전달되어 세션 시간대 기준으로 변환된 뒤 저장됩니다).
+    if target.created_at is None:
+        target.created_at = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
+    _bump_monthly_count(connection, target.user_id, target.created_at, 1)
+
+
+@event.listens_for(Diary, 'before_delete')
+def _diary_before_delete(mapper, connection, target):
+    _bump_monthly_count(connection, target.user_id, target.created_at, -1)
+
+
+def rebuild_monthly_counts():
+    """diary 테이블에서 diary_monthly_count를 다시 만듭니다 (집계 테이블을 처음 만들었을 때 한 번). 커밋은 호출한 쪽에서 합니다."""
+    from collections import Counter
 
-    __table_args__ = (db.Index('idx_diary_user_id_created_at', "user_id", "created_at"),)
\ No newline at end of file
+    counts = Counter()
+    for user_id, created_at in db.session.query(Diary.user_id, Diary.created_at).yield_per(1000):
+        if created_at is not None:
+            counts[(user_id, *utc_year_month(created_at))] += 1
+    db.session.query(DiaryMonthlyCount).delete()
+    db.session.add_all(
+        DiaryMonthlyCount(user_id=user_id, year=year, month=month, count=count)
+        for (user_id, year, month), count in counts.items()
+    )
+    return len(counts)
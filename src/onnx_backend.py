@@ -0,0 +1,74 @@
+# src/onnx_backend.py
+# ONNX Runtime 기반 감정 분류기 (fp32 / INT8 동적 양자화 모델 공용)
+# transformers pipeline("text-classification")과 같은 입출력 형식을 제공하여
+# emotion_engine.predict_emotion에서 그대로 바꿔 끼울 수 있습니다.
+
+import os
+import logging
+import numpy as np
+
+MAX_LENGTH = 128
+
+
+class OnnxEmotionClassifier:
+    def __init__(self, onnx_path, tokenizer, id2label, max_length=MAX_LENGTH, intra_op_threads=None):
+        self.onnx_path = onnx_path
+        self.reset_session(intra_op_threads)
+        self.tokenizer = tokenizer
+        self.id2label = {int(k): v for k, v in id2label.items()}
+        self.max_length = max_length
+        logging.info(f"ONNX 모델 로딩 완료: {onnx_path}")
+
+    def reset_session(self, intra_op_threads=None):
+        """
+        InferenceSession을 새로 만듭니다.
+        세션의 스레드 풀은 fork 후 자식 프로세스에 남지 않으므로, gunicorn 워커에서는 fork 이후 다시 호출해야 합니다.
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = int(intra_op_threads)
+        self.session = ort.InferenceSession(self.onnx_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def logits(self, texts):
+        encodings = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np")
+        feeds = {name: encodings[name].astype(np.int64) for name in self.input_names if name in encodings}
+        return self.session.run(None, feeds)[0]
+
+    def logits_from_input_ids(self, input_ids):
+        """이미 토큰화된(특수 토큰 포함) input_ids 리스트를 패딩하여 logits를 계산합니다."""
+        encodings = self.tokenizer.pad({'input_ids': input_ids}, padding=True, return_tensors="np")
+        feeds = {name: encodings[name].astype(np.int64) for name in self.input_names if name in encodings}
+        return self.session.run(None, feeds)[0]
+
+    def __call__(self, inputs, top_k=1, batch_size=None, **kwargs):
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+        batch_size = batch_size or len(texts) or 1
+
+        results = []
+        for start in range(0, len(texts), batch_size):
+            logits = self.logits(texts[start:start + batch_size])
+            results.extend(_to_top_k(logits, self.id2label, top_k))
+        return results[0] if single else results
+
+
+def _to_top_k(logits, id2label, top_k):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    probs = np.exp(logits)
+    probs /= probs.sum(axis=-1, keepdims=True)
+    order = np.argsort(-probs, axis=-1)[:, :top_k]
+    return [
+        [{'label': id2label[int(i)], 'score': float(row[i])} for i in idx]
+        for row, idx in zip(probs, order)
+    ]
+
+
+def default_onnx_path(backend):
+    """EMOTION_ONNX_DIR 아래의 기본 파일 이름 (export_onnx.py가 생성하는 이름과 동일)"""
+    onnx_dir = os.environ.get('EMOTION_ONNX_DIR', './models/onnx')
+    file_name = 'model.int8.onnx' if backend == 'onnx-int8' else 'model.onnx'
+    return os.path.join(onnx_dir, file_name)
@@ -1,31 +1,112 @@
+# src/recommender.py
+# 로컬 추천 카탈로그: 파일(JSON Lines 또는 SQLite)에서 추천 항목을 읽어 (감정, 시나리오)별 인덱스를 만들고
+# Gemini 없이 [수용]/[전환] 추천을 바로 만들어 줍니다.
+# 함께 배포하는 src/data/recommendation_catalog.jsonl은 96개 항목의 예시용입니다. 운영에서는
+# scripts/build_recommendation_catalog.py로 만든 수천 개 규모의 카탈로그를 RECOMMENDATION_CATALOG_PATH로 지정합니다 (README 참고).
+
+import os
+import json
+import random
+import hashlib
+import sqlite3
+import logging
+from contextlib import closing
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'recommendation_catalog.jsonl')
+EMPTY_MESSAGE = "😥 아쉽지만, 아직 준비된 추천이 없어요."
+
+
+def load_catalog_items(path):
+    """
+    카탈로그 파일을 읽어 (emotion, strategy, media, title) 튜플 리스트를 반환합니다.
+    - .jsonl / .json : 한 줄에 {"emotion", "strategy", "media", "title"} 객체 하나 (.json은 객체 배열도 허용)
+    - .sqlite / .db  : recommendation_item(emotion, strategy, media, title) 테이블
+    """
+    if path.endswith(('.sqlite', '.db')):
+        # sqlite3 연결의 with 블록은 트랜잭션만 끝내고 연결은 닫지 않으므로 closing으로 감쌉니다.
+        with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+            return [tuple(row) for row in conn.execute(
+                "SELECT emotion, strategy, media, title FROM recommendation_item"
+            )]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            records = json.load(f)
+        else:
+            records = [json.loads(line) for line in f if line.strip()]
+    return [(r['emotion'], r['strategy'], r['media'], r['title']) for r in records]
+
+
 class Recommender:
-    def __init__(self):
-        self.recommendation_db = {
-            '기쁨': { # 기쁨
-                '수용': ["음악: Pharrell Williams - Happy", "영화: 월터의 상상은 현실이 된다"],
-                '전환': ["음악: 이루마 - River Flows In You", "영화: 쇼생크 탈출"]
-            },
-            '슬픔': { # 슬픔
-                '수용': ["음악: 박효신 - 눈의 꽃", "영화: 이터널 선샤인"],
-                '전환': ["음악: 거북이 - 비행기", "영화: 월-E"]
-            },
-            '분노': { # 분노
-                '수용': ["음악: 람슈타인 - Du Hast", "영화: 존 윅"],
-                '전환': ["음악: 노라 존스 - Don't Know Why", "영화: 리틀 포레스트"]
-            },
-            '불안': { # 불안
-                '수용': ["음악: 위로가 되는 연주곡 플레이리스트", "영화: 인사이드 아웃"],
-                '전환': ["음악: Maroon 5 - Moves Like Jagger", "영화: 극한직업"]
-            },
-            '놀람': { # 놀람
-                '수용': ["영화: 식스 센스", "음악: 박진영 - 어머님이 누구니"],
-                '전환': ["음악: Bach - Air on G String", "책: 고요할수록 밝아지는 것들"]
-            },
-            '당황': { # 당황
-                '수용': ["음악: 잔잔한 Lo-fi 플레이리스트", "영화: 패터슨"],
-                '전환': ["음악: Queen - Don't Stop Me Now", "영화: 스파이더맨: 뉴 유니버스"]
-            },
-        }
-
-    def recommend(self, emotion: str, choice: str) -> list:
-        return self.recommendation_db.get(emotion, {}).get(choice, ["😥 아쉽지만, 아직 준비된 추천이 없어요."])
\ No newline at end of file
+    def __init__(self, catalog_path=None, items=None):
+        if items is None:
+            catalog_path = catalog_path or os.environ.get('RECOMMENDATION_CATALOG_PATH', DEFAULT_CATALOG_PATH)
+            try:
+                items = load_catalog_items(catalog_path)
+                logging.info(f"추천 카탈로그 로딩 완료: {catalog_path} ({len(items)}개 항목)")
+            except Exception as e:
+                logging.error(f"추천 카탈로그 로딩 중 오류: {e}")
+                items = []
+        self._build_index(items)
+
+    def _build_index(self, items):
+        # (감정, 시나리오) -> 매체 종류별 항목 리스트. 조회는 dict 한 번으로 끝납니다.
+        self.recommendation_db = {}
+        self.size = 0
+        seen = set()
+        for emotion, strategy, media, title in items:
+            if (emotion, strategy, media, title) in seen:
+                continue
+            seen.add((emotion, strategy, media, title))
+            by_media = self.recommendation_db.setdefault(emotion, {}).setdefault(strategy, {})
+            by_media.setdefault(media, []).append(f"{media}: {title}")
+            self.size += 1
+
+    def recommend(self, emotion: str, choice: str, k: int = 2, seed=None) -> list:
+        """
+        (감정, 시나리오)에서 k개를 뽑습니다. 같은 seed면 같은 결과가 나오고,
+        매체(음악/영화/도서)가 겹치지 않도록 매체별로 돌아가며 고릅니다.
+        """
+        by_media = self.recommendation_db.get(emotion, {}).get(choice)
+        if not by_media:
+            return [EMPTY_MESSAGE]
+
+        rng = random.Random(_stable_seed(seed, emotion, choice))
+        # 매체마다 최대 k개만 뽑으면 되므로, 카탈로그 전체를 섞지 않고 k개만 샘플링합니다 (O(k)).
+        pools = [rng.sample(entries, min(k, len(entries))) for entries in by_media.values()]
+        rng.shuffle(pools)
+
+        picked = []
+        while len(picked) < k and any(pools):
+            for pool in pools:
+                if pool and len(picked) < k:
+                    picked.append(pool.pop())
+        return picked
+
+    def has_emotion(self, emotion: str) -> bool:
+        return emotion in self.recommendation_db
+
+    def recommend_markdown(self, emotion: str, seed=None, k: int = 2) -> str:
+        return format_markdown(
+            self.recommend(emotion, '수용', k=k, seed=seed),
+            self.recommend(emotion, '전환', k=k, seed=seed),
+        )
+
+
+def format_markdown(acceptance: list, diversion: list) -> str:
+    """diary_logic.js / main_logic.js가 파싱하는 '## [수용]' / '## [전환]' 형식의 추천 문자열"""
+    text = "## [수용]\n"
+    for rec in acceptance:
+        text += f"* {rec}\n"
+    text += "\n## [전환]\n"
+    for rec in diversion:
+        text += f"* {rec}\n"
+    return text
+
+
+def _stable_seed(seed, emotion, choice):
+    # 프로세스마다 달라지는 hash() 대신 고정된 해시를 써서 워커가 달라도 같은 결과가 나오게 합니다.
+    if seed is None:
+        return None
+    key = f"{seed}:{emotion}:{choice}".encode('utf-8')
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], 'big')
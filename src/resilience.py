@@ -0,0 +1,162 @@
+# src/resilience.py
+# 외부 API(Gemini) 호출용 타임아웃 / hedged 재요청 / 서킷 브레이커
+
+import threading
+import time
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출을 시도하지 않았을 때 발생합니다."""
+
+
+class CircuitBreaker:
+    """
+    연속 failure_threshold회 실패하면 서킷을 열고(open) recovery_timeout초 동안 호출을 막습니다.
+    그 이후에는 한 번의 시험 호출(half-open)만 허용하여, 성공하면 다시 닫고(closed) 실패하면 다시 엽니다.
+    """
+
+    def __init__(self, name, failure_threshold=5, recovery_timeout=30.0):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.recovery_timeout = float(recovery_timeout)
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = 'half_open'
+                self._probe_in_flight = False
+            if self.state == 'half_open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                logging.info(f"[{self.name}] 서킷 half-open: 복구 여부 확인을 위한 시험 호출을 보냅니다.")
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logging.info(f"[{self.name}] 서킷 closed: 호출이 정상화되었습니다.")
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+                if self.state != 'open':
+                    logging.warning(f"[{self.name}] 서킷 open: 연속 {self.consecutive_failures}회 실패. "
+                                    f"{self.recovery_timeout:.0f}초 동안 호출을 차단합니다.")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def release_probe(self):
+        """
+        성공도 실패도 아닌 채로 끝난 호출(예: 클라이언트가 스트리밍 도중 연결을 끊음)의 시험 호출 자리를 반납합니다.
+        반납하지 않으면 half-open 상태에서 다음 시험 호출이 영원히 허용되지 않습니다.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {'state': self.state, 'consecutive_failures': self.consecutive_failures}
+
+
+class LatencyTracker:
+    """최근 성공 호출의 소요 시간을 보관하고 백분위수를 계산합니다."""
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q, min_samples=20):
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class ResilientCaller:
+    """
+    fn()을 별도 스레드에서 실행하고 deadline초 안에 끝나지 않으면 TimeoutError를 냅니다.
+    hedge=True이면 p95 지연 시간이 지나도 응답이 없을 때 같은 요청을 한 번 더 보내 먼저 끝난 결과를 사용합니다.
+    """
+
+    def __init__(self, name, deadline=15.0, hedge=False, hedge_min_delay=1.0,
+                 failure_threshold=5, recovery_timeout=30.0, max_workers=8):
+        self.name = name
+        self.deadline = float(deadline)
+        self.hedge = hedge
+        self.hedge_min_delay = float(hedge_min_delay)
+        self.breaker = CircuitBreaker(name, failure_threshold, recovery_timeout)
+        self.latency = LatencyTracker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'{name}-call')
+
+    def hedge_delay(self):
+        if not self.hedge:
+            return None
+        p95 = self.latency.percentile(95)
+        if p95 is None:
+            return None
+        return max(self.hedge_min_delay, p95)
+
+    def call(self, fn):
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"{self.name} 서킷이 열려 있습니다.")
+
+        start = time.monotonic()
+        deadline_at = start + self.deadline
+        futures = [self._executor.submit(fn)]
+        try:
+            delay = self.hedge_delay()
+            if delay is not None and delay < self.deadline:
+                done, _ = wait(futures, timeout=delay)
+                if not done:
+                    logging.info(f"[{self.name}] {delay:.2f}초 동안 응답이 없어 hedged 요청을 보냅니다.")
+                    futures.append(self._executor.submit(fn))
+
+            error = None
+            pending = list(futures)
+            while pending:
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, not_done = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                pending = list(not_done)
+                for future in done:
+                    if future.exception() is None:
+                        self.breaker.record_success()
+                        self.latency.record(time.monotonic() - start)
+                        return future.result()
+                    error = future.exception()
+            if error is None:
+                error = TimeoutError(f"{self.name} 호출이 {self.deadline:.1f}초 안에 끝나지 않았습니다.")
+            raise error
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def stats(self):
+        stats = self.breaker.stats()
+        stats['p95_latency'] = self.latency.percentile(95)
+        return stats
@@ -0,0 +1,81 @@
+# src/semantic_recommender.py
+# 감정 분류기의 인코더 임베딩으로 추천 카탈로그를 최근접 이웃 검색하는 의미 기반 추천
+# 카탈로그 임베딩은 scripts/build_catalog_embeddings.py로 미리 계산해 둡니다.
+#   <prefix>.npy  : (N, hidden) float32, L2 정규화된 임베딩 (mmap으로 읽습니다)
+#   <prefix>.json : 같은 순서의 [emotion, strategy, media, title] 목록
+
+import os
+import json
+import logging
+import numpy as np
+from .recommender import format_markdown
+
+
+class SemanticIndex:
+    def __init__(self, embeddings, items):
+        if len(embeddings) != len(items):
+            raise ValueError(f"임베딩 개수({len(embeddings)})와 항목 개수({len(items)})가 다릅니다.")
+        self.embeddings = embeddings
+        self.items = [tuple(item) for item in items]
+        # (감정, 시나리오) -> 행 번호 배열. 검색은 해당 행들에 대해서만 내적을 계산합니다.
+        groups = {}
+        for row, (emotion, strategy, _, _) in enumerate(self.items):
+            groups.setdefault((emotion, strategy), []).append(row)
+        self.groups = {key: np.asarray(rows, dtype=np.int64) for key, rows in groups.items()}
+
+    @classmethod
+    def load(cls, prefix):
+        embeddings = np.load(f"{prefix}.npy", mmap_mode='r')
+        with open(f"{prefix}.json", 'r', encoding='utf-8') as f:
+            items = json.load(f)
+        logging.info(f"의미 기반 추천 인덱스 로딩 완료: {prefix} ({len(items)}개 항목, 차원 {embeddings.shape[1]})")
+        return cls(embeddings, items)
+
+    def has_emotion(self, emotion):
+        return any(key[0] == emotion for key in self.groups)
+
+    def search(self, query, emotion, strategy, k=2):
+        """query(L2 정규화된 1차원 벡터)와 코사인 유사도가 가장 높은 k개 항목을 media 중복 없이 고릅니다."""
+        rows = self.groups.get((emotion, strategy))
+        if rows is None or len(rows) == 0:
+            return []
+        scores = np.asarray(self.embeddings[rows], dtype=np.float32) @ np.asarray(query, dtype=np.float32)
+        ranked = rows[np.argsort(-scores)]
+
+        picked, used_media = [], set()
+        for row in ranked:
+            _, _, media, title = self.items[row]
+            if media in used_media:
+                continue
+            picked.append(f"{media}: {title}")
+            used_media.add(media)
+            if len(picked) == k:
+                return picked
+        # 매체 종류가 k개보다 적으면 점수 순으로 나머지를 채웁니다.
+        for row in ranked:
+            _, _, media, title = self.items[row]
+            entry = f"{media}: {title}"
+            if entry not in picked:
+                picked.append(entry)
+                if len(picked) == k:
+                    break
+        return picked
+
+    def recommend_markdown(self, emotion, query, k=2):
+        acceptance = self.search(query, emotion, '수용', k)
+        diversion = self.search(query, emotion, '전환', k)
+        if not acceptance and not diversion:
+            return None
+        return format_markdown(acceptance, diversion)
+
+
+def load_semantic_index():
+    """RECOMMENDATION_EMBEDDINGS 경로가 지정되어 있으면 인덱스를 로드합니다. 없거나 실패하면 None."""
+    prefix = os.environ.get('RECOMMENDATION_EMBEDDINGS')
+    if not prefix:
+        return None
+    try:
+        return SemanticIndex.load(prefix)
+    except Exception as e:
+        logging.error(f"의미 기반 추천 인덱스 로딩 중 오류: {e}")
+        return None
@@ -17,6 +17,8 @@ document.addEventListener('DOMContentLoaded', function () {
     let currentCandidates = [];
     let progressInterval = null;
     let diaryText = ''; // 일기 내용을 저장할 변수
+    let currentRecommendation = null; // 현재 화면에 표시된 추천 (저장 시 재사용)
+    let currentRecommendationToken = null;
 
     // --- [유틸리티] 추천 내용 파싱 함수 ---
     function parseRecommendation(text) {
@@ -73,6 +75,7 @@ document.addEventListener('DOMContentLoaded', function () {
             currentEmotion = candidates[0].emotion;
         }
         const { acceptance, diversion } = parseRecommendation(recommendation);
+        const placeholder = data.placeholder || '추천 내용을 불러오지 못했습니다.';
         let chipsHTML = '';
         const showChips = (data.top_score < 0.8) || (candidates.length > 0); 
         if (showChips) {
@@ -95,10 +98,10 @@ document.addEventListener('DOMContentLoaded', function () {
                 <button class="rec-tab-btn" data-tab="diversion">전환</button>
             </div>
             <div id="rec-acceptance" class="rec-content active">
-                ${marked.parse(acceptance || '추천 내용을 불러오지 못했습니다.')}
+                ${marked.parse(acceptance || placeholder)}
             </div>
             <div id="rec-diversion" class="rec-content">
-                ${marked.parse(diversion || '추천 내용을 불러오지 못했습니다.')}
+                ${marked.parse(diversion || placeholder)}
             </div>
         `;
         resultDiv.innerHTML = contentHTML;
@@ -119,6 +122,40 @@ document.addEventListener('DOMContentLoaded', function () {
         });
     }
     
+    // --- [스트리밍] 도착한 추천 조각으로 탭 내용만 갱신 ---
+    function updateRecommendationContent(text, isFinal = false) {
+        const { acceptance, diversion } = parseRecommendation(text);
+        const fallback = isFinal ? '추천 내용을 불러오지 못했습니다.' : '';
+        const acceptanceDiv = resultDiv.querySelector('#rec-acceptance');
+        const diversionDiv = resultDiv.querySelector('#rec-diversion');
+        if (acceptanceDiv && (acceptance || fallback)) acceptanceDiv.innerHTML = marked.parse(acceptance || fallback);
+        if (diversionDiv && (diversion || fallback)) diversionDiv.innerHTML = marked.parse(diversion || fallback);
+    }
+
+    // --- [스트리밍] fetch 응답 본문을 Server-Sent Events 단위로 읽기 ---
+    async function readEventStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                let eventName = 'message';
+                let dataText = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                    else if (line.startsWith('data:')) dataText += line.slice(5).trim();
+                });
+                if (dataText) onEvent(eventName, JSON.parse(dataText));
+            }
+        }
+    }
+
     // --- [이벤트 핸들러] ---
     function updateButtonState() {
         if(diaryTextarea && submitBtn) {
@@ -149,6 +186,8 @@ document.addEventListener('DOMContentLoaded', function () {
                 stopLoader();
                 resultDiv.innerHTML = `<p style="color: red;">오류: ${data.error}</p>`;
             } else {
+                currentRecommendation = data.recommendation;
+                currentRecommendationToken = data.recommendation_token;
                 renderFullResult({
                     recommendation: data.recommendation,
                     candidates: currentCandidates, 
@@ -171,20 +210,49 @@ document.addEventListener('DOMContentLoaded', function () {
         saveStatus.textContent = '';
         showLoader('감정을 분석하고 추천을 생성하는 중입니다...');
         try {
-            const response = await fetch('/api/predict', {
+            let response = await fetch('/api/predict/stream', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ diary: diaryText })
             });
-            const data = await response.json();
-            if (data.error) {
+            // 서버가 막 시작되어 모델을 불러오는 중이면 503 + Retry-After를 돌려줍니다. 몇 번만 기다렸다가 다시 요청합니다.
+            for (let attempt = 0; response.status === 503 && attempt < 5; attempt++) {
+                const retryAfter = parseInt(response.headers.get('Retry-After') || '5', 10);
+                showLoader('감정 분석 모델을 준비하는 중입니다. 잠시만 기다려주세요...');
+                await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+                response = await fetch('/api/predict/stream', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ diary: diaryText })
+                });
+            }
+            if (!response.ok) {
+                const data = await response.json();
                 stopLoader();
                 resultDiv.innerHTML = `<p style="color: red;">오류: ${data.error}</p>`;
                 return;
             }
-            currentEmotion = data.top_emotion;
-            currentCandidates = data.candidates;
-            renderFullResult(data);
+            let streamedText = '';
+            await readEventStream(response, (eventName, data) => {
+                if (eventName === 'emotion') {
+                    // 감정 결과는 즉시 표시하고, 추천은 도착하는 대로 채웁니다.
+                    currentEmotion = data.top_emotion;
+                    currentCandidates = data.candidates;
+                    renderFullResult({ ...data, recommendation: '', placeholder: '추천을 생성하는 중입니다...' });
+                } else if (eventName === 'chunk') {
+                    streamedText += data.text;
+                    updateRecommendationContent(streamedText);
+                } else if (eventName === 'done') {
+                    currentRecommendation = data.recommendation;
+                    currentRecommendationToken = data.recommendation_token;
+                    updateRecommendationContent(data.recommendation, true);
+                } else if (eventName === 'error') {
+                    // 추천이 중간에 끊긴 경우: 대체 추천을 보여주되 토큰이 없으므로 저장 시 서버에서 다시 생성합니다.
+                    currentRecommendation = null;
+                    currentRecommendationToken = null;
+                    updateRecommendationContent(data.recommendation, true);
+                }
+            });
         } catch (error) {
             console.error('Error:', error);
             stopLoader();
@@ -228,6 +296,10 @@ document.addEventListener('DOMContentLoaded', function () {
         const formData = new FormData();
         formData.append('diary', diaryText);
         formData.append('emotion', currentEmotion);
+        if (currentRecommendation && currentRecommendationToken) {
+            formData.append('recommendation', currentRecommendation);
+            formData.append('recommendation_token', currentRecommendationToken);
+        }
         fetch('/diary/save', {
             method: 'POST',
             body: formData
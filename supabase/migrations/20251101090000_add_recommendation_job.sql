@@ -0,0 +1,21 @@
+-- Background job queue for filling diary.recommendation
+CREATE TABLE IF NOT EXISTS "public"."recommendation_job" (
+    "id" character varying(36) NOT NULL,
+    "diary_id" character varying(36) NOT NULL,
+    "status" character varying(16) NOT NULL DEFAULT 'pending',
+    "attempts" integer NOT NULL DEFAULT 0,
+    "last_error" "text",
+    "created_at" timestamp with time zone DEFAULT "now"(),
+    "updated_at" timestamp with time zone DEFAULT "now"(),
+    CONSTRAINT "recommendation_job_pkey" PRIMARY KEY ("id"),
+    CONSTRAINT "recommendation_job_diary_id_fkey" FOREIGN KEY ("diary_id") REFERENCES "public"."diary"("id") ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS "idx_recommendation_job_status_created_at" ON "public"."recommendation_job" ("status", "created_at");
+
+
+ALTER TABLE "public"."recommendation_job" OWNER TO "postgres";
+
+GRANT ALL ON TABLE "public"."recommendation_job" TO "anon";
+GRANT ALL ON TABLE "public"."recommendation_job" TO "authenticated";
+GRANT ALL ON TABLE "public"."recommendation_job" TO "service_role";
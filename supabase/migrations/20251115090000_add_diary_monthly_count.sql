@@ -0,0 +1,28 @@
+-- Per-user monthly diary counts (UTC year/month), kept up to date by the app on diary insert/delete
+CREATE TABLE IF NOT EXISTS "public"."diary_monthly_count" (
+    "user_id" character varying(36) NOT NULL,
+    "year" integer NOT NULL,
+    "month" integer NOT NULL,
+    "count" integer NOT NULL DEFAULT 0,
+    CONSTRAINT "diary_monthly_count_pkey" PRIMARY KEY ("user_id", "year", "month"),
+    CONSTRAINT "diary_monthly_count_user_id_fkey" FOREIGN KEY ("user_id") REFERENCES "public"."user"("id") ON DELETE CASCADE
+);
+
+ALTER TABLE "public"."diary_monthly_count" OWNER TO "postgres";
+
+GRANT ALL ON TABLE "public"."diary_monthly_count" TO "anon";
+GRANT ALL ON TABLE "public"."diary_monthly_count" TO "authenticated";
+GRANT ALL ON TABLE "public"."diary_monthly_count" TO "service_role";
+
+-- Backfill from existing diaries.
+-- diary.created_at is timestamp without time zone holding UTC wall-clock time, so extract from it directly:
+-- "created_at" AT TIME ZONE 'UTC' would turn it into timestamptz and EXTRACT would follow the session TimeZone.
+INSERT INTO "public"."diary_monthly_count" ("user_id", "year", "month", "count")
+SELECT "user_id",
+       EXTRACT(YEAR FROM "created_at")::integer,
+       EXTRACT(MONTH FROM "created_at")::integer,
+       COUNT(*)
+FROM "public"."diary"
+WHERE "created_at" IS NOT NULL
+GROUP BY 1, 2, 3
+ON CONFLICT ("user_id", "year", "month") DO UPDATE SET "count" = EXCLUDED."count";
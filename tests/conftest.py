@@ -0,0 +1,58 @@
+# tests/conftest.py
+# Flask 앱 테스트 공용 fixture: 임시 SQLite DB, 모델 로딩 / 추천 백그라운드 워커 없이 앱을 만듭니다.
+
+import os
+import sys
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    pytest.importorskip('flask')
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+
+    from src import create_app, db
+    from src.models import User
+
+    app = create_app(load_model=False)
+    app.config['TESTING'] = True
+    app.config['SESSION_COOKIE_SECURE'] = False
+    # 테스트에서는 추천 작업 폴링 스레드를 띄우지 않습니다.
+    monkeypatch.setattr(app.recommendation_worker, 'ensure_started', lambda: None)
+    monkeypatch.setattr(app.recommendation_worker, 'notify', lambda: None)
+
+    with app.app_context():
+        user = User(id='user-1', username='tester')
+        user.set_password('password')
+        db.session.add(user)
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 'user-1'
+        session['username'] = 'tester'
+    return client
+
+
+@pytest.fixture
+def model_ready(monkeypatch):
+    """모델이 준비된 것처럼 만들고, 감정 분석 결과를 고정합니다."""
+    from src import main
+    from src.model_loader import model_loader, READY
+
+    monkeypatch.setattr(model_loader, 'state', READY)
+    monkeypatch.setattr(main, 'predict_emotion', lambda text, top_k=3: [
+        {'label': '슬픔', 'score': 0.8}, {'label': '불안', 'score': 0.15}, {'label': '상처', 'score': 0.05},
+    ][:top_k])
@@ -0,0 +1,35 @@
+# tests/test_corpus_text.py
+# 학습 / 서빙 공용 텍스트 정제 규칙 (src/corpus/text.py, src/corpus/preprocess.py)
+
+import unicodedata
+
+import pytest
+
+from src.corpus.text import clean_text
+
+
+def test_clean_text_keeps_word_boundaries_across_lines():
+    diary = "오늘은 비가 왔다.\n하루 종일\t슬펐다!\r\n내일은 괜찮겠지"
+    assert clean_text(diary) == "오늘은 비가 왔다 하루 종일 슬펐다  내일은 괜찮겠지"
+    assert "왔다하루" not in clean_text(diary)
+
+
+def test_clean_text_composes_nfd_hangul():
+    assert clean_text(unicodedata.normalize('NFD', "슬픔\n기쁨")) == "슬픔 기쁨"
+
+
+def test_clean_text_column_matches_clean_text():
+    pd = pytest.importorskip('pandas')
+    from src.corpus.preprocess import clean_text_column
+
+    texts = ["오늘은 비가 왔다.\n하루 종일 슬펐다", "탭\t구분", "ㅋㅋ 좋아!! ^^", None]
+    assert clean_text_column(pd.Series(texts)).tolist() == [clean_text(text) for text in texts]
+
+
+def test_whitespace_pattern_covers_all_unicode_whitespace():
+    import re
+    import sys
+    from src.corpus.text import WHITESPACE_PATTERN
+
+    whitespace = ''.join(re.findall(r'\s', ''.join(map(chr, range(sys.maxunicode + 1)))))
+    assert WHITESPACE_PATTERN.sub(' ', whitespace) == ' ' * len(whitespace)
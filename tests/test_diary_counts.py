@@ -0,0 +1,85 @@
+# tests/test_diary_counts.py
+# 월별 일기 수: /api/diaries/counts(DB GROUP BY), diary_monthly_count 재생성 스크립트
+
+import datetime
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip('flask')
+
+from src import db  # noqa: E402
+from src.models import Diary, DiaryMonthlyCount  # noqa: E402
+
+UTC = datetime.timezone.utc
+
+
+def add_diaries(app, *created_ats):
+    with app.app_context():
+        for created_at in created_ats:
+            db.session.add(Diary(content="일기", emotion='기쁨', user_id='user-1', created_at=created_at))
+        db.session.commit()
+
+
+def test_counts_are_grouped_by_utc_month(app, client):
+    add_diaries(
+        app,
+        datetime.datetime(2025, 1, 5, tzinfo=UTC),
+        datetime.datetime(2025, 1, 31, 23, 59, tzinfo=UTC),
+        datetime.datetime(2025, 1, 31, 23, 59, 59, tzinfo=UTC),
+        datetime.datetime(2025, 12, 31, 23, 59, 59, tzinfo=UTC),
+        datetime.datetime(2026, 1, 1, tzinfo=UTC),
+    )
+    assert client.get('/api/diaries/counts?year=2025').get_json() == {'1': 3, '12': 1}
+    assert client.get('/api/diaries/counts?year=2026').get_json() == {'1': 1}
+
+    summary = client.get('/api/diaries/summary?year=2025').get_json()
+    assert summary['total'] == 4
+    assert summary['months']['1'] == 3
+
+
+def test_rebuild_script_restores_rollup(app):
+    spec = importlib.util.spec_from_file_location(
+        'rebuild_monthly_counts',
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'scripts', 'rebuild_monthly_counts.py'))
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+
+    add_diaries(app, datetime.datetime(2025, 3, 1, tzinfo=UTC), datetime.datetime(2025, 3, 2, tzinfo=UTC))
+    with app.app_context():
+        DiaryMonthlyCount.query.delete()
+        db.session.commit()
+
+    assert script.rebuild(app, if_empty=True) == 1
+    assert script.rebuild(app, if_empty=True) is None
+    with app.app_context():
+        row = db.session.get(DiaryMonthlyCount, ('user-1', 2025, 3))
+        assert row.count == 2
+
+
+def test_utc_month_does_not_wrap_naive_postgres_column():
+    from sqlalchemy.dialects import postgresql
+    from src.models import utc_month
+
+    naive = str(utc_month(Diary.created_at, 'postgresql').compile(dialect=postgresql.dialect()))
+    assert 'timezone' not in naive
+    aware = db.cast(Diary.created_at, db.DateTime(timezone=True))
+    assert 'timezone(' in str(utc_month(aware, 'postgresql').compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.skipif(not os.environ.get('TEST_POSTGRES_URL'), reason="TEST_POSTGRES_URL이 없으면 PostgreSQL 테스트를 건너뜁니다.")
+def test_utc_month_ignores_postgres_session_time_zone():
+    pytest.importorskip('psycopg2')
+    import sqlalchemy
+    from src.models import utc_month
+
+    engine = sqlalchemy.create_engine(os.environ['TEST_POSTGRES_URL'])
+    naive = db.cast(db.literal('2025-01-31 23:30:00'), db.DateTime())
+    aware = db.cast(db.literal('2025-01-31 23:30:00+00'), db.DateTime(timezone=True))
+    with engine.connect() as conn:
+        conn.execute(sqlalchemy.text("SET TIME ZONE 'Asia/Seoul'"))  # UTC 1월 31일 23:30 = KST 2월 1일
+        months = conn.execute(sqlalchemy.select(
+            utc_month(naive, 'postgresql'), utc_month(aware, 'postgresql'))).one()
+    engine.dispose()
+    assert tuple(months) == (1, 1)
@@ -0,0 +1,52 @@
+# tests/test_imports.py
+# import 비용 회귀 검사
+# - 전처리 스크립트 / 노트북이 쓰는 src.corpus는 Flask 없이 import 되어야 합니다.
+# - src.main은 torch / transformers / google.generativeai 없이 예산(scripts/check_import_time.py) 안에 import 되어야 합니다.
+
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_check_import_time():
+    spec = importlib.util.spec_from_file_location(
+        'check_import_time', os.path.join(project_root, 'scripts', 'check_import_time.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def imported_modules(statement, importtime=False):
+    """새 인터프리터에서 statement를 실행한 뒤의 sys.modules (importtime=True면 -X importtime 출력도 함께)"""
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    flags = ['-X', 'importtime'] if importtime else []
+    result = subprocess.run([sys.executable, *flags, '-c', code], cwd=project_root,
+                            capture_output=True, text=True, check=True)
+    modules = set(result.stdout.split())
+    return (modules, result.stderr) if importtime else modules
+
+
+def test_corpus_import_does_not_pull_in_flask():
+    modules = imported_modules('import src.corpus.text, src.corpus.jsonstream')
+    assert not {'flask', 'flask_sqlalchemy', 'flask_login', 'sqlalchemy'} & modules
+
+
+def test_main_import_skips_heavy_modules_within_budget():
+    pytest.importorskip('flask')
+    check_import_time = load_check_import_time()
+    budget_ms = check_import_time.DEFAULT_BUDGETS['src.main']
+
+    # 첫 실행은 .pyc 생성 / 디스크 캐시 영향을 받으므로 check_import_time.py처럼 여러 번 재서 가장 빠른 값을 씁니다.
+    timings = []
+    for _ in range(3):
+        modules, stderr = imported_modules('import src.main', importtime=True)
+        heavy = [name for name in check_import_time.FORBIDDEN_MODULES if name in modules]
+        assert not heavy, f"src.main import에 무거운 모듈이 딸려 왔습니다: {heavy}"
+        rows = check_import_time.parse_importtime(stderr)
+        timings.append(next(cumulative for name, _, cumulative in rows if name == 'src.main') / 1000)
+    assert min(timings) <= budget_ms, f"import src.main: {min(timings):.0f}ms (예산 {budget_ms:.0f}ms)"
@@ -0,0 +1,69 @@
+# tests/test_jobs.py
+# 추천 백그라운드 작업: Gemini 실패 시 재시도 / 최종 실패 처리
+
+import pytest
+
+pytest.importorskip('flask')
+
+from src import db, jobs, main  # noqa: E402
+from src.models import Diary, RecommendationJob  # noqa: E402
+
+
+@pytest.fixture
+def job_id(app, monkeypatch):
+    monkeypatch.setattr(main, 'RECOMMENDATION_STRATEGY', 'llm_first')
+    monkeypatch.setattr(jobs, 'RETRY_DELAY', 0)
+    with app.app_context():
+        diary = Diary(content="오늘은 슬펐다", emotion='슬픔', user_id='user-1')
+        db.session.add(diary)
+        job = jobs.enqueue_recommendation(diary)
+        db.session.commit()
+        return job.id
+
+
+def run_job(app):
+    with app.app_context():
+        job = jobs.claim_next_job()
+        assert job is not None
+        jobs.process_job(job)
+
+
+def job_state(app, job_id):
+    with app.app_context():
+        job = db.session.get(RecommendationJob, job_id)
+        return job.status, job.attempts, job.diary.recommendation
+
+
+def test_gemini_failure_is_retried_then_succeeds(app, job_id, monkeypatch):
+    results = iter([None, "## [수용]\n영화: 이터널 선샤인"])
+    monkeypatch.setattr(main, 'generate_llm_recommendation', lambda diary, emotion: next(results))
+
+    run_job(app)
+    assert job_state(app, job_id) == ('pending', 1, None)
+
+    run_job(app)
+    assert job_state(app, job_id) == ('done', 2, "## [수용]\n영화: 이터널 선샤인")
+
+
+def test_job_fails_after_max_attempts_with_local_fallback(app, job_id, monkeypatch):
+    def fail(diary, emotion):
+        raise RuntimeError("quota exceeded")
+    monkeypatch.setattr(main, 'generate_llm_recommendation', fail)
+
+    for _ in range(jobs.MAX_ATTEMPTS):
+        run_job(app)
+
+    status, attempts, recommendation = job_state(app, job_id)
+    assert (status, attempts) == ('failed', jobs.MAX_ATTEMPTS)
+    assert recommendation == main.fallback_recommendation('슬픔', "오늘은 슬펐다")
+    with app.app_context():
+        assert jobs.claim_next_job() is None
+
+
+def test_failed_attempt_waits_for_retry_delay(app, job_id, monkeypatch):
+    monkeypatch.setattr(main, 'generate_llm_recommendation', lambda diary, emotion: None)
+    monkeypatch.setattr(jobs, 'RETRY_DELAY', 3600)
+
+    run_job(app)
+    with app.app_context():
+        assert jobs.claim_next_job() is None
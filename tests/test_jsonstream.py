@@ -0,0 +1,32 @@
+# tests/test_jsonstream.py
+# 큰 JSON 배열 증분 파서: 어떤 청크 크기로 읽어도 json.load와 같은 결과가 나와야 합니다.
+
+import json
+
+import pytest
+
+from src.corpus.jsonstream import iter_json_array
+
+DOCUMENTS = [
+    '[12.5, 3e5, -7]',
+    '[12.5,3e5,-7,0.25,1E-3,-0.0,100]',
+    '[ 1.5e+10 ,\n\t-2.75E-2 , 0 ]',
+    '[{"text": "오늘은 슬펐다", "score": 0.875}, [1, 2.5], "12.5", true, null, 42]',
+    '[]',
+]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 4, 9, 1 << 16])
+@pytest.mark.parametrize('document', DOCUMENTS)
+def test_any_chunk_size_matches_json_load(tmp_path, document, chunk_size):
+    path = tmp_path / 'data.json'
+    path.write_text(document, encoding='utf-8')
+    assert list(iter_json_array(str(path), chunk_size=chunk_size)) == json.loads(document)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1 << 16])
+def test_malformed_element_separator_is_rejected(tmp_path, chunk_size):
+    path = tmp_path / 'data.json'
+    path.write_text('[12.5x, 3]', encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(path), chunk_size=chunk_size))
@@ -0,0 +1,17 @@
+# tests/test_model_input.py
+# 모델 입력 문자열과 예측 / 임베딩 캐시 키 (src/emotion_engine.py)
+
+from src.emotion_engine import embedding_cache_key, model_input_text, prediction_cache_key
+
+JSON_DIARY = "오늘은 비가 왔다.\n하루 종일 슬펐다."
+FORM_DIARY = JSON_DIARY.replace('\n', '\r\n')
+
+
+def test_line_endings_do_not_change_model_input():
+    assert model_input_text(FORM_DIARY) == model_input_text(JSON_DIARY) == "오늘은 비가 왔다 하루 종일 슬펐다"
+    assert model_input_text("첫 줄\r둘째 줄") == "첫 줄 둘째 줄"
+
+
+def test_form_and_json_diaries_share_cache_keys():
+    assert prediction_cache_key(FORM_DIARY, 3) == prediction_cache_key(JSON_DIARY, 3)
+    assert embedding_cache_key(FORM_DIARY) == embedding_cache_key(JSON_DIARY)
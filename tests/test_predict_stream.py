@@ -0,0 +1,82 @@
+# tests/test_predict_stream.py
+# /api/predict/stream (Server-Sent Events)의 추천 스트리밍 경로
+
+import json
+
+import pytest
+
+pytest.importorskip('flask')
+
+from src import main  # noqa: E402
+from src.resilience import ResilientCaller  # noqa: E402
+
+
+def read_events(response):
+    events = []
+    for block in response.get_data(as_text=True).strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+@pytest.fixture
+def gemini_stream(monkeypatch):
+    """gemini.stream을 주어진 조각 목록(예외 포함)을 차례로 내보내는 가짜로 바꿉니다."""
+    monkeypatch.setattr(main, 'RECOMMENDATION_STRATEGY', 'llm_first')
+    monkeypatch.setattr(main, 'gemini_caller', ResilientCaller('gemini-test', deadline=5))
+    main.recommendation_cache.clear()
+
+    def install(items):
+        def stream(prompt, timeout):
+            for item in items:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        monkeypatch.setattr(main.gemini, 'stream', stream)
+
+    return install
+
+
+def test_stream_success_signs_full_text(client, model_ready, gemini_stream):
+    gemini_stream(["## [수용]\n영화: 이터널 선샤인\n", "## [전환]\n음악: 좋은 날"])
+    events = read_events(client.post('/api/predict/stream', json={'diary': '오늘은 슬펐다'}))
+
+    assert [name for name, _ in events] == ['emotion', 'chunk', 'chunk', 'done']
+    done = events[-1][1]
+    assert done['recommendation'] == "## [수용]\n영화: 이터널 선샤인\n## [전환]\n음악: 좋은 날"
+    assert done['recommendation_token']
+
+
+def test_stream_failure_after_chunks_is_not_signed(client, model_ready, gemini_stream):
+    gemini_stream(["## [수용]\n영화: 이터", RuntimeError("connection reset")])
+    events = read_events(client.post('/api/predict/stream', json={'diary': '오늘은 슬펐다'}))
+
+    names = [name for name, _ in events]
+    assert names == ['emotion', 'chunk', 'error']
+    error = events[-1][1]
+    assert 'recommendation_token' not in error
+    assert error['recommendation'] == main.fallback_recommendation('슬픔', '오늘은 슬펐다')
+    # 잘린 텍스트는 캐시에도 남지 않습니다.
+    assert main.recommendation_cache.get((main.content_hash('오늘은 슬펐다'), '슬픔')) is None
+
+
+def test_stream_failure_before_first_chunk_falls_back(client, model_ready, gemini_stream):
+    gemini_stream([RuntimeError("timeout")])
+    events = read_events(client.post('/api/predict/stream', json={'diary': '오늘은 슬펐다'}))
+
+    assert [name for name, _ in events] == ['emotion', 'chunk', 'done']
+    assert events[-1][1]['recommendation'] == main.fallback_recommendation('슬픔', '오늘은 슬펐다')
+
+
+def test_client_disconnect_releases_half_open_probe(gemini_stream):
+    gemini_stream(["## [수용]\n", "영화: 이터널 선샤인"])
+    breaker = main.gemini_caller.breaker
+    breaker.state, breaker.opened_at = 'open', -breaker.recovery_timeout
+
+    stream = main.stream_recommendation('오늘은 슬펐다', '슬픔')
+    assert next(stream) == "## [수용]\n"
+    assert breaker.stats()['state'] == 'half_open'
+    stream.close()  # 클라이언트가 연결을 끊으면 Flask가 응답 제너레이터를 닫습니다.
+
+    assert breaker.stats()['state'] == 'half_open'
+    assert breaker.allow_request()
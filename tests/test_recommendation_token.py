@@ -0,0 +1,33 @@
+# tests/test_recommendation_token.py
+# /api/predict에서 받은 추천 토큰을 /diary/save(FormData)에서 재사용하는 경로
+
+import pytest
+
+pytest.importorskip('flask')
+
+from src import main  # noqa: E402
+
+
+def test_content_hash_ignores_line_ending_style():
+    assert main.content_hash("첫 줄\r\n둘째 줄\r셋째 줄") == main.content_hash("첫 줄\n둘째 줄\n셋째 줄")
+
+
+def test_form_save_reuses_token_for_multiline_diary(client, model_ready, monkeypatch):
+    recommendation = "## [수용]\n영화: 이터널 선샤인\n\n## [전환]\n음악: 아이유 - 좋은 날"
+    monkeypatch.setattr(main, 'generate_recommendation', lambda diary, emotion, strategy=None: recommendation)
+
+    diary = "오늘은 비가 왔다.\n하루 종일 슬펐다."
+    predicted = client.post('/api/predict', json={'diary': diary}).get_json()
+    assert predicted['recommendation'] == recommendation
+
+    # 브라우저 FormData는 textarea / 숨은 필드 값의 줄바꿈을 \r\n으로 보냅니다.
+    response = client.post('/diary/save', data={
+        'diary': diary.replace('\n', '\r\n'),
+        'emotion': predicted['top_emotion'],
+        'recommendation': predicted['recommendation'].replace('\n', '\r\n'),
+        'recommendation_token': predicted['recommendation_token'],
+    })
+    saved = response.get_json()
+    assert response.status_code == 200
+    assert saved['job_id'] is None
+    assert saved['recommendation'] is not None
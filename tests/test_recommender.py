@@ -0,0 +1,33 @@
+# tests/test_recommender.py
+# 로컬 추천 카탈로그: SQLite 로딩, 매체별 샘플링
+
+import sqlite3
+from contextlib import closing
+
+from src.recommender import Recommender, load_catalog_items
+
+
+def test_recommend_is_seeded_and_alternates_media():
+    items = [('슬픔', '수용', media, f'{media}{i}') for media in ('음악', '영화', '도서') for i in range(1000)]
+    recommender = Recommender(items=items)
+
+    picked = recommender.recommend('슬픔', '수용', k=3, seed='diary-1')
+    assert picked == recommender.recommend('슬픔', '수용', k=3, seed='diary-1')
+    assert len({item.split(':')[0] for item in picked}) == 3
+
+
+def test_recommend_fills_k_from_remaining_media():
+    recommender = Recommender(items=[('슬픔', '수용', '음악', 'a'), ('슬픔', '수용', '음악', 'b'),
+                                     ('슬픔', '수용', '영화', 'c')])
+    assert sorted(recommender.recommend('슬픔', '수용', k=3, seed=1)) == ['영화: c', '음악: a', '음악: b']
+
+
+def test_load_sqlite_catalog_closes_connection(tmp_path):
+    path = str(tmp_path / 'catalog.sqlite')
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute("CREATE TABLE recommendation_item (emotion, strategy, media, title)")
+        conn.execute("INSERT INTO recommendation_item VALUES ('슬픔', '수용', '영화', '이터널 선샤인')")
+        conn.commit()
+
+    assert load_catalog_items(path) == [('슬픔', '수용', '영화', '이터널 선샤인')]
+    (tmp_path / 'catalog.sqlite').unlink()  # 열린 연결이 남아 있으면 Windows에서는 지울 수 없습니다.